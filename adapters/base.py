@@ -1,17 +1,30 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
-from core.models import ScrapingResult, TenderUnit
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from core.models import RawRecord, ScrapingResult, TenderUnit
 
 class BaseAdapter(ABC):
     def __init__(self, source_id: str, config: Optional[Dict[str, Any]] = None) -> None:
         self.source_id = source_id
         self.config = config or {}
+        # external_id → otisk řádku seznamu; v daemonu sdílený mezi běhy (viz core/daemon.py)
+        self.known_rows: Dict[str, str] = {}
+        # otisky řádků posledního běhu; do known_rows až po úspěšném zápisu (commit_known)
+        self.pending_known: Dict[str, str] = {}
+
+    def commit_known(self) -> None:
+        """Běh zapsal vše do DB → jeho řádky považovat za známé (volá daemon po úspěšném run_source)."""
+        self.known_rows.update(self.pending_known)
+        self.pending_known.clear()
 
     @abstractmethod
     def fetch_tenders(self) -> ScrapingResult:
         raise NotImplementedError
 
+    def iter_results(self) -> Iterator[ScrapingResult]:
+        """Výsledky po dávkách; default = jedna dávka z fetch_tenders(). Bulk adaptéry přepisují."""
+        yield self.fetch_tenders()
+
     @abstractmethod
     def parse_tender_list(self, html: str) -> List[Dict[str, Any]]:
         raise NotImplementedError
@@ -25,3 +38,12 @@ class BaseAdapter(ABC):
 
     def fetch_tender_detail(self, tender_url: str) -> Dict[str, Any]:
         return {}
+
+    # --- fronta crawl_jobs (core/worker.py) ---
+    def iter_list_rows(self) -> Iterator[List[Dict[str, Any]]]:
+        """Řádky seznamu po stránkách bez detailů (producent fronty)."""
+        raise NotImplementedError(f"{type(self).__name__} does not support the crawl queue")
+
+    def fetch_record(self, row: Dict[str, Any]) -> Tuple[RawRecord, TenderUnit]:
+        """Detail + RawRecord/TenderUnit pro jeden řádek seznamu (worker); chyba se propaguje."""
+        raise NotImplementedError(f"{type(self).__name__} does not support the crawl queue")
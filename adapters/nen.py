@@ -4,7 +4,7 @@ from __future__ import annotations
 import hashlib
 import re
 from itertools import zip_longest
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from urllib.parse import urljoin
 from datetime import datetime, date
 
@@ -15,6 +15,7 @@ from bs4.element import Tag, NavigableString
 from adapters.base import BaseAdapter
 from core.models import RawRecord, TenderUnit, ScrapingResult
 from core.fetcher import HttpFetcher
+from core.metrics import metrics
 from core.normalize import normalize_money, normalize_status, detect_currency, parse_decimal
 
 BASE = "https://nen.nipez.cz"
@@ -38,6 +39,11 @@ def parse_deadline_to_date(text: Optional[str]) -> Optional[date]:
             continue
     return None
 
+def _row_fingerprint(row: Dict[str, Any]) -> str:
+    """Otisk řádku seznamu (název, zadavatel, lhůta, …) – změna = zakázku je třeba zpracovat znovu."""
+    s = "|".join(f"{k}={row.get(k) or ''}" for k in sorted(row))
+    return hashlib.sha1(s.encode("utf-8")).hexdigest()
+
 def _first_match(kv: Dict[str, str], patterns: List[str]) -> Optional[str]:
     for pat in patterns:
         r = re.compile(pat, re.I)
@@ -129,25 +135,29 @@ def extract_label_values(soup: BeautifulSoup) -> Dict[str, str]:
 class NENAdapter(BaseAdapter):
     def __init__(self, config: Optional[Dict[str, Any]] = None) -> None:
         super().__init__("NEN", config)
-        self.start_url: str = self.config.get("start_url") or f"{BASE}/verejne-zakazky"
+        self.base_url: str = (self.config.get("base_url") or BASE).rstrip("/")
+        self.start_url: str = self.config.get("start_url") or f"{self.base_url}/verejne-zakazky"
         self.max_pages: int = int(self.config.get("max_pages", 5))
         self.delay_min: float = float(self.config.get("delay_min", 0.5))
         self.delay_max: float = float(self.config.get("delay_max", 1.0))
         self.user_agent: str = self.config.get("user_agent", "vz-aggregator/0.1 (+contact@example.com)")
         self.max_detail_per_run: int = int(self.config.get("max_detail_per_run", 150))
         self.detail_log_every: int = int(self.config.get("detail_log_every", 10))
+        # inkrementální poll: přeskočit řádky se stejným otiskem jako minule a skončit na plně známé stránce
+        self.skip_known: bool = bool(self.config.get("skip_known", False))
         self.fetcher = HttpFetcher(
             delay_min=self.delay_min,
             delay_max=self.delay_max,
             user_agent=self.user_agent,
             max_retries=int(self.config.get("max_retries", 3)),
             backoff_base=float(self.config.get("backoff_base", 0.6)),
+            source=self.source_id,
         )
 
     # --- list helpers ---------------------------------------------------------
 
     def _page_url(self, n: int) -> str:
-        return f"{BASE}/verejne-zakazky" if n == 1 else f"{BASE}/verejne-zakazky/p:vz:page={n}"
+        return f"{self.base_url}/verejne-zakazky" if n == 1 else f"{self.base_url}/verejne-zakazky/p:vz:page={n}"
 
     def _extract_notice_url_from_row(self, tr: Tag) -> Optional[str]:
         a = (
@@ -156,19 +166,19 @@ class NENAdapter(BaseAdapter):
             or tr.select_one('a[href*="detail-zakazky"]')
         )
         if a and a.get("href"):
-            return urljoin(BASE, a["href"])
+            return urljoin(self.base_url, a["href"])
         data_href = tr.get("data-href") or tr.get("data-url")
         if data_href:
-            return urljoin(BASE, data_href)
+            return urljoin(self.base_url, data_href)
         onclick = (tr.get("onclick") or "").strip()
         m = re.search(r"['\"](/verejne-zakazky/detail-zakazky/[^'\"]+)['\"]", onclick)
         if m:
-            return urljoin(BASE, m.group(1))
+            return urljoin(self.base_url, m.group(1))
         a_any = tr.select_one("a[href]")
         if a_any and "href" in a_any.attrs:
             href = a_any["href"]
             if "detail-zakazky" in href:
-                return urljoin(BASE, href)
+                return urljoin(self.base_url, href)
         return None
 
     # --- list parsing ---------------------------------------------------------
@@ -189,7 +199,7 @@ class NENAdapter(BaseAdapter):
             buyer = (tds[4].get_text(strip=True) or "") or None
             deadline_tx = (tds[-2].get_text(strip=True) or "") or None
             if not notice_url and external_id and re.match(r"^N\d{3}/\d{2}/V\d{8}$", external_id):
-                notice_url = f"{BASE}/verejne-zakazky/detail-zakazky/{external_id.replace('/', '-')}"
+                notice_url = f"{self.base_url}/verejne-zakazky/detail-zakazky/{external_id.replace('/', '-')}"
             if not notice_url:
                 logger.warning(f"[NEN] missing notice_url (ext_id={external_id}, title={title[:80]!r})")
             rows.append({
@@ -225,7 +235,12 @@ class NENAdapter(BaseAdapter):
     def fetch_tender_detail(self, url: str) -> Dict[str, Any]:
         if not url:
             return {}
-        html = self.fetcher.get_text(url)
+        html = self.fetcher.get_text(url, kind="detail")
+        with metrics.timer("parse_seconds", source=self.source_id, stage="detail"):
+            return self.parse_tender_detail(html)
+
+    def parse_tender_detail(self, html: str) -> Dict[str, Any]:
+        """Rozparsuje HTML detailu zakázky (bez HTTP)."""
         soup = BeautifulSoup(html, "lxml")
 
         out: Dict[str, Any] = {
@@ -236,6 +251,7 @@ class NENAdapter(BaseAdapter):
             "attachments": [],
             "region": None,
             "status": None,
+            "status_norm": None,
             "description": None,
         }
 
@@ -251,7 +267,8 @@ class NENAdapter(BaseAdapter):
         status_raw = _first_match(kv, ["Aktuální stav ZP", r"\bStav zakázky\b", r"^\s*Stav\s*$"]) \
                      or _val_after_label(soup, ["Aktuální stav ZP", r"\bStav zakázky\b", r"^\s*Stav\s*$"])
         norm_status, orig_status = normalize_status(status_raw)
-        out["status"] = orig_status or status_raw  # ukládáme původní label; norm můžeme doplnit později do schématu
+        out["status"] = orig_status or status_raw  # původní label (UI, audit)
+        out["status_norm"] = norm_status            # řízený slovník → tenders.status_norm
 
         # description
         descr = _first_match(kv, ["Popis předmětu", "Předmět zakázky", "Stručný popis", r"^\s*Popis\s*$"]) \
@@ -306,7 +323,7 @@ class NENAdapter(BaseAdapter):
             href = a.get("href")
             if not href:
                 continue
-            atts.append({"name": a.get_text(strip=True)[:200], "url": urljoin(BASE, href)})
+            atts.append({"name": a.get_text(strip=True)[:200], "url": urljoin(self.base_url, href)})
         if atts:
             out["attachments"] = atts
 
@@ -319,7 +336,7 @@ class NENAdapter(BaseAdapter):
         notice = raw.get("notice_url")
         ext = str(raw.get("external_id") or "")
         if not notice and re.match(r"^N\d{3}/\d{2}/V\d{8}$", ext):
-            notice = f"{BASE}/verejne-zakazky/detail-zakazky/{ext.replace('/', '-')}"
+            notice = f"{self.base_url}/verejne-zakazky/detail-zakazky/{ext.replace('/', '-')}"
         s = f"{raw.get('title','')}|{raw.get('buyer','') or ''}|{raw.get('deadline','') or ''}|{ext}"
         hash_id = hashlib.sha256(s.encode("utf-8")).hexdigest()
         return TenderUnit(
@@ -341,6 +358,58 @@ class NENAdapter(BaseAdapter):
             hash_id=hash_id,
         )
 
+    def build_records(self, row: Dict[str, Any], detail: Dict[str, Any]) -> Tuple[RawRecord, TenderUnit]:
+        """Spojí řádek seznamu a (případný) detail do RawRecord + TenderUnit."""
+        with metrics.timer("normalize_seconds", source=self.source_id):
+            raw_payload = dict(row)
+            if detail and any([
+                detail.get("cpv"),
+                detail.get("procedure_type"),
+                detail.get("budget_value") is not None,
+                detail.get("currency"),
+                detail.get("attachments"),
+                detail.get("region"),
+                detail.get("status"),
+                detail.get("description"),
+            ]):
+                raw_payload["detail"] = detail
+
+            raw = RawRecord(
+                source_id=self.source_id,
+                external_id=str(row.get("external_id") or row.get("notice_url") or ""),
+                payload=raw_payload,
+            )
+
+            unit = self.normalize_tender(row)
+            if detail:
+                if detail.get("cpv"):              unit.cpv = detail["cpv"]
+                if detail.get("procedure_type"):   unit.procedure_type = detail["procedure_type"]
+                if detail.get("budget_value") is not None: unit.budget_value = detail["budget_value"]
+                if detail.get("currency"):         unit.currency = detail["currency"]
+                if detail.get("attachments"):      unit.attachments = detail["attachments"]
+                if detail.get("region"):           unit.region = detail["region"]
+                if detail.get("status"):           unit.status = detail["status"]
+                if detail.get("status_norm"):      unit.status_norm = detail["status_norm"]
+                if detail.get("description"):      unit.description = detail["description"]
+        return raw, unit
+
+    # --- crawl queue (core/worker.py) ----------------------------------------
+
+    def iter_list_rows(self) -> Iterator[List[Dict[str, Any]]]:
+        for page in range(1, self.max_pages + 1):
+            url = self._page_url(page)
+            logger.info(f"[NEN] Page {page} → {url}")
+            html = self.fetcher.get_text(url, kind="list")
+            with metrics.timer("parse_seconds", source=self.source_id, stage="list"):
+                rows = self.parse_tender_list(html)
+            if not rows:
+                break
+            yield rows
+
+    def fetch_record(self, row: Dict[str, Any]) -> Tuple[RawRecord, TenderUnit]:
+        detail = self.fetch_tender_detail(row["notice_url"]) if row.get("notice_url") else {}
+        return self.build_records(row, detail)
+
     # --- main fetch -----------------------------------------------------------
 
     def fetch_tenders(self) -> ScrapingResult:
@@ -352,17 +421,27 @@ class NENAdapter(BaseAdapter):
         raw_records: List[RawRecord] = []
         tender_units: List[TenderUnit] = []
         details_fetched = 0
+        rows_known = 0
+        self.pending_known = {}
 
         logger.info(f"[NEN] Start scraping: pages up to {self.max_pages}, detail cap {self.max_detail_per_run}")
 
         while url and page <= self.max_pages:
             try:
                 logger.info(f"[NEN] Page {page} → {url}")
-                html = self.fetcher.get_text(url)
-                rows = self.parse_tender_list(html)
+                html = self.fetcher.get_text(url, kind="list")
+                with metrics.timer("parse_seconds", source=self.source_id, stage="list"):
+                    rows = self.parse_tender_list(html)
                 logger.info(f"[NEN] Page {page}: parsed {len(rows)} rows")
 
+                page_known = 0
                 for r in rows:
+                    ext_id = r.get("external_id")
+                    fp = _row_fingerprint(r)
+                    if self.skip_known and ext_id and self.known_rows.get(ext_id) == fp:
+                        page_known += 1
+                        continue
+
                     detail: Dict[str, Any] = {}
                     if r.get("notice_url") and details_fetched < self.max_detail_per_run:
                         try:
@@ -375,54 +454,34 @@ class NENAdapter(BaseAdapter):
                             logger.warning(f"[NEN] Detail error for {r.get('external_id')}: {type(e).__name__}: {e}")
                             errors.append(f"detail error: {e}")
 
-                    raw_payload = dict(r)
-                    if detail and any([
-                        detail.get("cpv"),
-                        detail.get("procedure_type"),
-                        detail.get("budget_value") is not None,
-                        detail.get("currency"),
-                        detail.get("attachments"),
-                        detail.get("region"),
-                        detail.get("status"),
-                        detail.get("description"),
-                    ]):
-                        raw_payload["detail"] = detail
-
-                    raw_records.append(
-                        RawRecord(
-                            source_id=self.source_id,
-                            external_id=str(r.get("external_id") or r.get("notice_url") or ""),
-                            payload=raw_payload,
-                        )
-                    )
-
-                    unit = self.normalize_tender(r)
-                    if detail:
-                        if detail.get("cpv"):              unit.cpv = detail["cpv"]
-                        if detail.get("procedure_type"):   unit.procedure_type = detail["procedure_type"]
-                        if detail.get("budget_value") is not None: unit.budget_value = detail["budget_value"]
-                        if detail.get("currency"):         unit.currency = detail["currency"]
-                        if detail.get("attachments"):      unit.attachments = detail["attachments"]
-                        if detail.get("region"):           unit.region = detail["region"]
-                        if detail.get("status"):           unit.status = detail["status"]
-                        if detail.get("description"):      unit.description = detail["description"]
+                    raw, unit = self.build_records(r, detail)
+                    raw_records.append(raw)
                     tender_units.append(unit)
+                    # známý = zpracovaný i s detailem (bez detailu se řádek příště zkusí znovu);
+                    # do known_rows až po úspěšném zápisu běhu (BaseAdapter.commit_known)
+                    if ext_id and (detail or not r.get("notice_url")):
+                        self.pending_known[ext_id] = fp
 
+                rows_known += page_known
                 pages_scraped += 1
                 page += 1
                 url = self._page_url(page) if page <= self.max_pages else None
+                if self.skip_known and rows and page_known == len(rows):
+                    logger.info(f"[NEN] Page {page-1}: all {len(rows)} rows known → stop")
+                    url = None
                 logger.info(f"[NEN] Page {page-1} done. Next: {url or 'END'}")
 
             except Exception as e:
                 logger.error(f"[NEN] Page {page} failed: {type(e).__name__}: {e}")
                 break
 
-        logger.info(f"[NEN] Finished: pages_scraped={pages_scraped}, details_fetched={details_fetched}")
+        logger.info(f"[NEN] Finished: pages_scraped={pages_scraped}, details_fetched={details_fetched}, "
+                    f"rows_known={rows_known}")
 
         return ScrapingResult(
             source_id=self.source_id,
             raw_records=raw_records,
             tender_units=tender_units,
-            stats={"pages_scraped": pages_scraped, "details_fetched": details_fetched},
+            stats={"pages_scraped": pages_scraped, "details_fetched": details_fetched, "rows_known": rows_known},
             errors=errors,
         )
@@ -0,0 +1,55 @@
+# adapters/registry.py
+"""Registr adaptérů: mapuje klíč zdroje ze sources.yaml na třídu adaptéru.
+
+Pořadí vyhledání:
+  1. `adapter:` v konfiguraci zdroje – dotted path `modul:Trida` nebo `modul.Trida`
+  2. vestavěné adaptéry (_BUILTIN)
+  3. entry point ve skupině `vz_aggregator.adapters` se jménem = klíč zdroje (externí balíčky)
+
+Adaptér se konstruuje jako `cls(config=cfg)`.
+"""
+from __future__ import annotations
+
+import importlib
+from importlib.metadata import entry_points
+from typing import Any, Dict, Type
+
+from adapters.base import BaseAdapter
+
+ENTRY_POINT_GROUP = "vz_aggregator.adapters"
+
+_BUILTIN: Dict[str, str] = {
+    "nen": "adapters.nen:NENAdapter",
+    "vvz": "adapters.vvz:VVZAdapter",
+}
+
+
+def _import_dotted(spec: str) -> Any:
+    module_name, sep, attr = spec.partition(":")
+    if not sep:
+        module_name, _, attr = spec.rpartition(".")
+    if not module_name or not attr:
+        raise ValueError(f"invalid adapter path {spec!r} (expected 'module:Class')")
+    obj: Any = importlib.import_module(module_name)
+    for part in attr.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def resolve_adapter(source_key: str, cfg: Dict[str, Any]) -> Type[BaseAdapter]:
+    """Najde třídu adaptéru pro zdroj `source_key`; při neúspěchu vyhodí LookupError."""
+    spec = cfg.get("adapter") or _BUILTIN.get(source_key)
+    if spec:
+        cls = _import_dotted(spec)
+    else:
+        matches = [ep for ep in entry_points(group=ENTRY_POINT_GROUP) if ep.name == source_key]
+        if not matches:
+            raise LookupError(f"no adapter registered for source {source_key!r}")
+        cls = matches[0].load()
+    if not (isinstance(cls, type) and issubclass(cls, BaseAdapter)):
+        raise TypeError(f"adapter for {source_key!r} is not a BaseAdapter subclass: {cls!r}")
+    return cls
+
+
+def create_adapter(source_key: str, cfg: Dict[str, Any]) -> BaseAdapter:
+    return resolve_adapter(source_key, cfg)(config=cfg)
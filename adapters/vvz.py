@@ -0,0 +1,357 @@
+# adapters/vvz.py
+"""Adaptér pro Věstník veřejných zakázek (VVZ) nad bulk exporty (XML / JSON / JSON Lines).
+
+Místo scrapování HTML stránku po stránce čte hromadné dumpy streamovaně s konstantní
+pamětí (lxml.etree.iterparse + čištění elementů, resp. inkrementální JSON dekodér)
+a vydává RawRecord/TenderUnit po dávkách (iter_results).
+"""
+from __future__ import annotations
+
+import glob
+import gzip
+import io
+import json
+import re
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+from lxml import etree
+
+from adapters.base import BaseAdapter
+from core.fetcher import HttpFetcher
+from core.metrics import metrics
+from core.models import RawRecord, ScrapingResult, TenderUnit
+from core.normalize import detect_currency, normalize_money, normalize_status, parse_date
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# naše pole → kandidátní názvy elementů/klíčů v exportu (porovnává se case-insensitive, bez namespace)
+_DEFAULT_FIELDS: Dict[str, List[str]] = {
+    "external_id": ["evidencni_cislo", "EvidencniCisloZakazky", "EvCisloZakazkyVVZ", "id", "notice_id"],
+    "title": ["nazev", "NazevZakazky", "NazevVZ", "title"],
+    "buyer": ["zadavatel", "NazevZadavatele", "ZadavatelNazev", "buyer", "buyer_name"],
+    "deadline": ["lhuta_nabidek", "LhutaProPodaniNabidek", "LhutaNabidky", "deadline"],
+    "cpv": ["cpv", "HlavniCPV", "KodCPV", "DalsiCPV", "cpv_code"],
+    "budget_value": ["predpokladana_hodnota", "PredpokladanaHodnota", "estimated_value", "value"],
+    "currency": ["mena", "Mena", "currency"],
+    "region": ["misto_plneni", "HlavniMistoPlneni", "NUTS", "region"],
+    "procedure_type": ["druh_rizeni", "DruhRizeni", "procedure_type"],
+    "status": ["stav", "StavZakazky", "status"],
+    "description": ["popis", "PopisPredmetu", "StrucnyPopis", "description"],
+    "notice_url": ["url", "odkaz", "OdkazNaFormular", "notice_url"],
+}
+
+_PLAIN_DECIMAL = re.compile(r"^-?\d+(\.\d+)?$")
+
+
+def _local(tag: Any) -> str:
+    """'{ns}Nazev' → 'nazev' (komentáře/PI mají tag funkci → '')."""
+    if not isinstance(tag, str):
+        return ""
+    return tag.rsplit("}", 1)[-1].lower()
+
+
+def _flatten(elem: etree._Element) -> Dict[str, Any]:
+    """Listové elementy záznamu → {localname: text}; opakované názvy → list."""
+    out: Dict[str, Any] = {}
+    for el in elem.iter():
+        if el is elem or len(el):
+            continue
+        key = _local(el.tag)
+        text = (el.text or "").strip()
+        if not key or not text:
+            continue
+        if key in out:
+            prev = out[key]
+            out[key] = prev + [text] if isinstance(prev, list) else [prev, text]
+        else:
+            out[key] = text
+    for k, v in elem.attrib.items():
+        out.setdefault(_local(k), v)
+    return out
+
+
+def _open_feed(path: Path) -> IO[bytes]:
+    return gzip.open(path, "rb") if path.suffix == ".gz" else open(path, "rb")
+
+
+def _feed_format(path: Path, configured: str) -> str:
+    if configured != "auto":
+        return configured
+    suffixes = [s.lower() for s in path.suffixes if s.lower() != ".gz"]
+    ext = suffixes[-1] if suffixes else ""
+    return {".xml": "xml", ".json": "json", ".jsonl": "jsonl", ".ndjson": "jsonl"}.get(ext, "xml")
+
+
+def iter_xml_records(fh: IO[bytes], record_tag: str) -> Iterator[Dict[str, Any]]:
+    """Streamovaně projde XML a pro každý `record_tag` vrátí plochý dict; zpracované elementy uvolní."""
+    tag = record_tag if record_tag.startswith("{") else f"{{*}}{record_tag}"
+    for _, elem in etree.iterparse(fh, events=("end",), tag=tag, huge_tree=True, recover=True):
+        yield _flatten(elem)
+        # uvolni element i již zpracované sourozence, jinak strom roste s velikostí souboru
+        elem.clear(keep_tail=False)
+        parent = elem.getparent()
+        if parent is not None:
+            while elem.getprevious() is not None:
+                del parent[0]
+
+
+def iter_json_records(fh: IO[bytes], chunk_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    """
+    JSON pole objektů (`[ {...}, {...} ]`) nebo JSON Lines – inkrementálně, bez načtení celého souboru.
+    Paměť je úměrná největšímu záznamu, ne velikosti dumpu.
+    """
+    decoder = json.JSONDecoder()
+    reader = io.TextIOWrapper(fh, encoding="utf-8")
+    buf = ""
+    pos = 0
+    in_array: Optional[bool] = None
+    eof = False
+    while True:
+        # přeskoč oddělovače mezi záznamy
+        while pos < len(buf) and (buf[pos].isspace() or buf[pos] == ","):
+            pos += 1
+        if in_array is None and pos < len(buf):
+            in_array = buf[pos] == "["
+            if in_array:
+                pos += 1
+            continue
+        if pos < len(buf) and buf[pos] == "]" and in_array:
+            return
+        if pos < len(buf):
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                pos = end
+                if isinstance(obj, dict):
+                    yield obj
+                continue
+        if eof:
+            return
+        chunk = reader.read(chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+
+
+class VVZAdapter(BaseAdapter):
+    def __init__(self, config: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__("VVZ", config)
+        self.feed_paths: List[str] = list(self.config.get("feed_paths") or [])
+        self.feed_url: Optional[str] = self.config.get("feed_url")
+        self.download_dir = PROJECT_ROOT / self.config.get("download_dir", "data/vvz")
+        self.format: str = self.config.get("format", "auto")
+        self.record_tag: str = self.config.get("record_tag", "zakazka")
+        self.batch_size: int = int(self.config.get("batch_size", 1000))
+        self.max_records: int = int(self.config.get("max_records", 0))  # 0 = bez limitu
+        self.country: str = self.config.get("country", "CZ")
+        self.fields: Dict[str, List[str]] = {**_DEFAULT_FIELDS, **(self.config.get("fields") or {})}
+        self._field_keys = {k: [c.lower() for c in v] for k, v in self.fields.items()}
+        self.fetcher = HttpFetcher(
+            delay_min=float(self.config.get("delay_min", 0.0)),
+            delay_max=float(self.config.get("delay_max", 0.0)),
+            user_agent=self.config.get("user_agent"),
+            source=self.source_id,
+        )
+
+    # --- feed soubory ---------------------------------------------------------
+
+    def _download_feed(self) -> Path:
+        """Stáhne feed_url streamovaně (po 1 MB) do download_dir a vrátí cestu."""
+        self.download_dir.mkdir(parents=True, exist_ok=True)
+        name = self.feed_url.rstrip("/").rsplit("/", 1)[-1] or "feed.xml"
+        dest = self.download_dir / name
+        tmp = dest.with_name(dest.name + ".part")
+        logger.info(f"[VVZ] Downloading {self.feed_url} → {dest}")
+        with self.fetcher.session.get(self.feed_url, stream=True, timeout=60) as r:
+            r.raise_for_status()
+            with open(tmp, "wb") as f:
+                for chunk in r.iter_content(chunk_size=1 << 20):
+                    f.write(chunk)
+                    metrics.inc("http_bytes_total", len(chunk), source=self.source_id)
+        tmp.replace(dest)
+        return dest
+
+    def feed_files(self) -> List[Path]:
+        files: List[Path] = []
+        for pattern in self.feed_paths:
+            p = pattern if Path(pattern).is_absolute() else str(PROJECT_ROOT / pattern)
+            files.extend(Path(x) for x in sorted(glob.glob(p)))
+        if self.feed_url:
+            files.append(self._download_feed())
+        return files
+
+    def iter_feed_records(self, path: Path) -> Iterator[Dict[str, Any]]:
+        fmt = _feed_format(path, self.format)
+        with _open_feed(path) as fh:
+            if fmt == "xml":
+                yield from iter_xml_records(fh, self.record_tag)
+            else:
+                yield from iter_json_records(fh)
+
+    # --- parsing / normalizace ------------------------------------------------
+
+    def parse_tender_list(self, html: str) -> List[Dict[str, Any]]:
+        """Rozparsuje celý (malý) dokument exportu – XML nebo JSON – na seznam záznamů."""
+        data = html.encode("utf-8")
+        text = html.lstrip()
+        if text.startswith("[") or text.startswith("{"):
+            return list(iter_json_records(io.BytesIO(data)))
+        return list(iter_xml_records(io.BytesIO(data), self.record_tag))
+
+    def normalize_tender(self, raw_data: Dict[str, Any]) -> TenderUnit:
+        rec = {str(k).lower(): v for k, v in raw_data.items()}
+
+        def pick(field: str) -> Any:
+            for cand in self._field_keys.get(field, []):
+                v = rec.get(cand)
+                if v not in (None, "", []):
+                    return v
+            return None
+
+        def text(field: str) -> Optional[str]:
+            v = pick(field)
+            if isinstance(v, list):
+                v = v[0]
+            return str(v).strip() if v is not None else None
+
+        # CPV sbíráme ze všech kandidátních klíčů (hlavní + další kódy)
+        cpv_items: List[Any] = []
+        for cand in self._field_keys.get("cpv", []):
+            v = rec.get(cand)
+            cpv_items.extend(v if isinstance(v, list) else [v] if v else [])
+        cpv = sorted({m for item in cpv_items for m in re.findall(r"\d{8}", str(item))})
+
+        budget, currency = _parse_budget(pick("budget_value"), text("currency"))
+        status_norm, status = normalize_status(text("status"))
+
+        return TenderUnit(
+            source_id=self.source_id,
+            external_id=text("external_id") or "",
+            title=text("title") or "(bez názvu)",
+            buyer=text("buyer"),
+            country=self.country,
+            region=text("region"),
+            cpv=cpv,
+            budget_value=float(budget) if budget is not None else None,
+            currency=currency,
+            deadline=parse_date(text("deadline")),
+            notice_url=text("notice_url"),
+            procedure_type=text("procedure_type"),
+            status=status,
+            status_norm=status_norm,
+            description=text("description"),
+        )
+
+    # --- main fetch -----------------------------------------------------------
+
+    def iter_results(self) -> Iterator[ScrapingResult]:
+        """Projde všechny feedy a vydává ScrapingResult po `batch_size` záznamech."""
+        files = self.feed_files()
+        logger.info(f"[VVZ] Start bulk import: {len(files)} feed file(s), batch {self.batch_size}")
+        total = 0
+        raw_records: List[RawRecord] = []
+        tender_units: List[TenderUnit] = []
+        errors: List[str] = []
+        files_done = 0
+        files_flushed = 0
+
+        def flush() -> ScrapingResult:
+            nonlocal files_flushed
+            res = ScrapingResult(
+                source_id=self.source_id,
+                raw_records=list(raw_records),
+                tender_units=list(tender_units),
+                errors=list(errors),
+                # statistiky jsou přírůstkové za dávku (runner je sčítá)
+                stats={"pages_scraped": files_done - files_flushed, "details_fetched": len(tender_units)},
+            )
+            files_flushed = files_done
+            raw_records.clear()
+            tender_units.clear()
+            errors.clear()
+            return res
+
+        for path in files:
+            records = self.iter_feed_records(path)
+            while True:
+                try:
+                    with metrics.timer("parse_seconds", source=self.source_id, stage="feed"):
+                        rec = next(records, None)
+                except Exception as e:  # poškozený soubor: zaloguj a pokračuj dalším
+                    logger.error(f"[VVZ] Feed {path.name} failed: {type(e).__name__}: {e}")
+                    errors.append(f"feed error {path.name}: {e}")
+                    break
+                if rec is None:
+                    break
+                try:
+                    with metrics.timer("normalize_seconds", source=self.source_id):
+                        unit = self.normalize_tender(rec)
+                except Exception as e:
+                    errors.append(f"normalize error: {e}")
+                    continue
+                if not unit.external_id:
+                    errors.append("record without external_id")
+                    continue
+                # payload = jen záznam: název denního dumpu by měnil payload_hash a každý
+                # nezměněný záznam by se přepsal znovu (soubor je vidět v logu výše/níže)
+                raw_records.append(RawRecord(
+                    source_id=self.source_id,
+                    external_id=unit.external_id,
+                    payload=rec,
+                ))
+                tender_units.append(unit)
+                total += 1
+                if len(tender_units) >= self.batch_size:
+                    yield flush()
+                if self.max_records and total >= self.max_records:
+                    break
+            files_done += 1
+            logger.info(f"[VVZ] Feed {path.name} done, records so far: {total}")
+            if self.max_records and total >= self.max_records:
+                break
+
+        if tender_units or errors or files_done > files_flushed:
+            yield flush()
+        logger.info(f"[VVZ] Finished: files={files_done}, records={total}")
+
+    def fetch_tenders(self) -> ScrapingResult:
+        """Vše v jedné dávce (kvůli BaseAdapter kontraktu); runner používá iter_results."""
+        raw_records: List[RawRecord] = []
+        tender_units: List[TenderUnit] = []
+        errors: List[str] = []
+        files = 0
+        for chunk in self.iter_results():
+            raw_records.extend(chunk.raw_records)
+            tender_units.extend(chunk.tender_units)
+            errors.extend(chunk.errors)
+            files += chunk.stats.get("pages_scraped", 0)
+        return ScrapingResult(
+            source_id=self.source_id,
+            raw_records=raw_records,
+            tender_units=tender_units,
+            errors=errors,
+            stats={"pages_scraped": files, "details_fetched": len(tender_units)},
+        )
+
+
+def _parse_budget(value: Any, currency_text: Optional[str]) -> Tuple[Optional[Decimal], Optional[str]]:
+    """Strojová čísla z exportu ('1234567.89') bere přímo, jinak jako text přes normalize_money."""
+    if isinstance(value, list):
+        value = value[0]
+    cur = detect_currency(currency_text or "") or ((currency_text or "").strip().upper() or None)
+    if value is None:
+        return None, cur
+    s = str(value).strip()
+    if _PLAIN_DECIMAL.match(s):
+        try:
+            return Decimal(s), cur
+        except InvalidOperation:
+            pass
+    val, detected = normalize_money(s, currency_text)
+    return val, detected or cur
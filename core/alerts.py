@@ -0,0 +1,244 @@
+# core/alerts.py
+"""Hlídací psi: nové/změněné zakázky proti uloženým hledáním (alert_subscriptions).
+
+Místo jednoho SQL dotazu na každé hledání se odběry zkompilují do invertovaných indexů v paměti:
+  - CPV: prefix → odběry (zakázka nese všechny své prefixy, viz core/cpv.py → lookup je průchod trií)
+  - region: region → odběry
+  - rozpočet: intervalový strom nad unikátními pásmy [budget_min, budget_max] v CZK (core/fx.py)
+  - klíčová slova: kmen slova → posting list unikátních frází; slovo zakázky matchuje prefixem jako fulltext
+
+Odběr matchuje, když zakázka splní všechna jeho vyplněná kritéria (v rámci kritéria stačí
+jedna hodnota; fráze o více slovech = všechna slova). Dávka zakázek se projde jednou,
+shody se zapíšou hromadně do alert_matches (dvojice odběr–zakázka jen jednou).
+"""
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from core.cpv import cpv_prefixes
+from core.dedup import fold
+from core.fx import to_czk
+from core.metrics import metrics
+from core.models import TenderUnit
+
+MIN_STEM = 3
+MIN_PREFIX = 4  # kratší kmen (zkratky "it", "čov") musí odpovídat celému slovu zakázky
+# zrcadlo search_tender_query (sql/2026-10-04-search.sql): lehký ořez pádových koncovek
+_SUFFIX = re.compile(r"(ovych|ovymi|ovemu|ove|ovy|ich|ech|ami|emi|ach|um|ou|em|mi|a|e|i|o|u|y)$")
+
+MatchRow = Tuple[int, str, str]  # (subscription_id, source_id, external_id)
+
+CRITERIA = ("cpv", "region", "budget", "keywords")
+
+
+def stem(word: str) -> str:
+    if len(word) <= 4:
+        return word
+    s = _SUFFIX.sub("", word)
+    return s if len(s) >= 2 else word  # celé slovo je koncovka ("ovych") → nechat
+
+
+def _cpv_key(code: str) -> Optional[str]:
+    """'45000000' / '45000000-7' → '45' (oddíl), '4523' → '4523'; prefix ve tvaru tenders.cpv_prefixes."""
+    digits = re.sub(r"-\d$", "", (code or "").strip())
+    if not digits.isdigit() or len(digits) < 2:
+        return None
+    if len(digits) == 8:
+        digits = digits.rstrip("0").ljust(2, "0")  # 80000000 → "80", ne "8"
+        if digits == "00":
+            return None
+    return digits
+
+
+@dataclass
+class Subscription:
+    id: int
+    cpv: List[str] = field(default_factory=list)
+    regions: List[str] = field(default_factory=list)
+    budget_min: Optional[float] = None
+    budget_max: Optional[float] = None
+    keywords: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "Subscription":
+        return cls(
+            id=int(row["id"]),
+            cpv=list(row.get("cpv") or []),
+            regions=list(row.get("regions") or []),
+            budget_min=float(row["budget_min"]) if row.get("budget_min") is not None else None,
+            budget_max=float(row["budget_max"]) if row.get("budget_max") is not None else None,
+            keywords=list(row.get("keywords") or []),
+        )
+
+
+class _IntervalTree:
+    """Statický centrovaný intervalový strom: stabbing query (které intervaly obsahují x) v O(log n + k).
+    Interval = (od, do, id); vrací id."""
+
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, intervals: List[Tuple[float, float, int]]) -> None:
+        points = sorted(p for lo, hi, _ in intervals for p in (lo, hi))
+        self.center = points[len(points) // 2]
+        here = [iv for iv in intervals if iv[0] <= self.center <= iv[1]]
+        self.by_start = sorted(here, key=lambda iv: iv[0])
+        self.by_end = sorted(here, key=lambda iv: iv[1], reverse=True)
+        left = [iv for iv in intervals if iv[1] < self.center]
+        right = [iv for iv in intervals if iv[0] > self.center]
+        self.left = _IntervalTree(left) if left else None
+        self.right = _IntervalTree(right) if right else None
+
+    def stab(self, x: float, out: Set[int]) -> None:
+        node: Optional[_IntervalTree] = self
+        while node is not None:
+            if x < node.center:
+                for lo, _, sid in node.by_start:
+                    if lo > x:
+                        break
+                    out.add(sid)
+                node = node.left
+            else:
+                for _, hi, sid in node.by_end:
+                    if hi < x:
+                        break
+                    out.add(sid)
+                node = node.right if x > node.center else None
+
+
+class AlertIndex:
+    """Zkompilované odběry; `match(unit)` → id odběrů, které zakázka splňuje.
+
+    Odběry jsou seskupené podle množiny vyplněných kritérií (nejvýš 15 skupin); shoda skupiny
+    = průnik množin zásahů jejích kritérií (od nejmenší) – bez počítání přes jednotlivé odběry.
+    """
+
+    def __init__(self, subscriptions: Iterable[Subscription]) -> None:
+        self.cpv: Dict[str, Set[int]] = {}
+        self.regions: Dict[str, Set[int]] = {}
+        # stejné fráze / rozpočtová pásma sdílí víc odběrů → index nad unikátními, odběry jako množiny
+        self.postings: Dict[str, List[int]] = {}                # kmen → [id fráze]
+        self.phrases: List[Tuple[int, Set[int]]] = []           # id fráze → (počet kmenů, odběry)
+        self.groups: Dict[Tuple[str, ...], Set[int]] = {}       # vyplněná kritéria → odběry
+        self.ranges: List[Set[int]] = []                        # id pásma → odběry
+        phrase_ids: Dict[frozenset, int] = {}
+        range_ids: Dict[Tuple[float, float], int] = {}
+
+        for sub in subscriptions:
+            cpv = {k for k in (_cpv_key(c) for c in sub.cpv) if k}
+            regions = {r.strip().lower() for r in sub.regions if r and r.strip()}
+            phrases = [ws for ws in ({stem(w) for w in fold(k).split()} for k in sub.keywords) if ws]
+            has_budget = sub.budget_min is not None or sub.budget_max is not None
+            crit = tuple(c for c, on in zip(CRITERIA, (cpv, regions, has_budget, phrases)) if on)
+            if not crit:
+                continue  # prázdné hledání by matchovalo vše
+            self.groups.setdefault(crit, set()).add(sub.id)
+            for c in cpv:
+                self.cpv.setdefault(c, set()).add(sub.id)
+            for r in regions:
+                self.regions.setdefault(r, set()).add(sub.id)
+            if has_budget:
+                lo = sub.budget_min if sub.budget_min is not None else float("-inf")
+                hi = sub.budget_max if sub.budget_max is not None else float("inf")
+                if (lo, hi) not in range_ids:
+                    range_ids[(lo, hi)] = len(self.ranges)
+                    self.ranges.append(set())
+                self.ranges[range_ids[(lo, hi)]].add(sub.id)
+            for stems in phrases:
+                key = frozenset(s for s in stems if len(s) >= MIN_STEM) or frozenset(stems)
+                if key not in phrase_ids:
+                    phrase_ids[key] = len(self.phrases)
+                    self.phrases.append((len(key), set()))
+                    for st in key:
+                        self.postings.setdefault(st, []).append(phrase_ids[key])
+                self.phrases[phrase_ids[key]][1].add(sub.id)
+        self.budget = _IntervalTree([(lo, hi, rid) for (lo, hi), rid in range_ids.items()]) if range_ids else None
+
+    def __len__(self) -> int:
+        return sum(len(m) for m in self.groups.values())
+
+    def _keyword_hits(self, text: str) -> Set[int]:
+        hit_stems: Dict[int, Set[str]] = {}
+        for token in set(text.split()):
+            # slovo zakázky splní kmen, který je jeho prefixem ("mostu" ⊇ "most"); krátký kmen
+            # jen celé slovo – jinak by "it" matchovalo "itinerář" a "čov" "covid"
+            for n in range(1, len(token) + 1):
+                if n < MIN_PREFIX and n != len(token):
+                    continue
+                for pid in self.postings.get(token[:n], ()):
+                    hit_stems.setdefault(pid, set()).add(token[:n])
+        return set().union(*(self.phrases[pid][1] for pid, stems in hit_stems.items()
+                             if len(stems) >= self.phrases[pid][0]))
+
+    def match(self, unit: TenderUnit) -> List[int]:
+        # zásahy počítáme líně – jen pro kritéria, na která se některá skupina ptá
+        hits: Dict[str, Set[int]] = {}
+
+        def hit(c: str) -> Set[int]:
+            if c not in hits:
+                hits[c] = self._hits(c, unit)
+            return hits[c]
+
+        out: List[int] = []
+        for crit, members in self.groups.items():
+            sets = []
+            for c in crit:
+                h = hit(c)
+                if not h:
+                    break
+                sets.append(h)
+            else:
+                sets.sort(key=len)
+                out.extend(sets[0].intersection(members, *sets[1:]))
+        return out
+
+    def _hits(self, criterion: str, unit: TenderUnit) -> Set[int]:
+        if criterion == "cpv":
+            return set().union(*(self.cpv.get(p, ()) for p in cpv_prefixes(unit.cpv)))
+        if criterion == "region":
+            return self.regions.get((unit.region or "").strip().lower(), set())
+        if criterion == "budget":
+            range_ids: Set[int] = set()
+            czk = to_czk(unit.budget_value, unit.currency)
+            if czk is not None and self.budget is not None:
+                self.budget.stab(czk, range_ids)
+            return set().union(*(self.ranges[rid] for rid in range_ids))
+        return self._keyword_hits(fold(f"{unit.title} {unit.description or ''}"))
+
+
+class AlertMatcher:
+    """Drží AlertIndex a přestaví ho, když se změní odběry (verze = počet + poslední změna)."""
+
+    def __init__(self, storage: Any) -> None:
+        self.storage = storage
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self.index = AlertIndex([])
+
+    def refresh(self) -> AlertIndex:
+        version = self.storage.alert_subscriptions_version()
+        with self._lock:
+            if version != self._version:
+                subs = [Subscription.from_row(r) for r in self.storage.load_alert_subscriptions()]
+                self.index = AlertIndex(subs)
+                self._version = version
+                logger.info(f"Alert index compiled: {len(self.index)} subscriptions")
+            return self.index
+
+    def process(self, units: List[TenderUnit]) -> int:
+        """Projde dávku nových/změněných zakázek a zapíše shody; vrací počet nových shod."""
+        if not units:
+            return 0
+        index = self.refresh()
+        if not len(index):
+            return 0
+        rows: List[MatchRow] = [(sid, u.source_id, u.external_id) for u in units for sid in index.match(u)]
+        inserted = self.storage.save_alert_matches(rows) if rows else 0
+        metrics.inc("alert_matches_total", inserted, source=units[0].source_id)
+        if inserted:
+            logger.info(f"Alerts: {inserted} new matches for {len(units)} changed tenders")
+        return inserted
@@ -0,0 +1,386 @@
+# core/api.py
+"""Read API pro frontend nad DatabaseStorage s cache odpovědí v paměti procesu.
+
+    GET /api/tenders?status=open&region=Praha&cpv=45&budget_min=&budget_max=
+                    &deadline_from=2026-10-01&deadline_to=&sort=deadline&dir=asc&limit=30&cursor=…&count=1
+    GET /api/tenders?q=oprava mostu&limit=30&cursor=…      (fulltext, řazení podle relevance)
+    GET /api/tenders/<source_id>/<external_id>               (hot i archiv, se štítky)
+    GET /api/facets
+    GET /health, GET /metrics
+
+Odpovědi (JSON) jdou přes ResponseCache: TTL + LRU, klíč = cesta + seřazené parametry.
+Cache se zahodí celá, když ingest commitne (NOTIFY tenders_changed z finish_ingest_run,
+workeru fronty a tieringu) – LISTEN běží ve vlastním vlákně, po výpadku spojení se cache
+zahodí preventivně. Odpověď nese ETag (If-None-Match → 304) a gzip, obojí předpočítané
+v cache; souběžné misse stejného klíče čekají na jeden dotaz do DB.
+
+    python -m core.api [--host 0.0.0.0] [--port 8080] [--ttl 60] [--cache-size 1000] [--pool-size 8]
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import gzip
+import hashlib
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+
+from dotenv import load_dotenv
+from loguru import logger
+
+from core.metrics import metrics
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+ENV_PATH = PROJECT_ROOT / ".env"
+
+MIN_GZIP_BYTES = 1024
+LOCK_STRIPES = 64
+SORT_FIELDS = ("created_at", "deadline", "budget_value")
+# list_tenders řadí budget_value podle budget_czk (sql/2026-10-09-budget-czk.sql) → kurzor nese budget_czk
+SORT_COLUMN = {"budget_value": "budget_czk"}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _json_default(v: Any) -> Any:
+    if isinstance(v, Decimal):
+        return float(v)
+    if isinstance(v, (date, datetime)):
+        return v.isoformat()
+    return str(v)
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    status: int
+    body: bytes
+    gz: Optional[bytes]
+    etag: str
+    expires: float
+
+    @classmethod
+    def build(cls, status: int, payload: Any, ttl: float) -> "CachedResponse":
+        body = json.dumps(payload, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode()
+        gz = gzip.compress(body, compresslevel=6) if len(body) >= MIN_GZIP_BYTES else None
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        return cls(status, body, gz, etag, time.monotonic() + ttl)
+
+
+class ResponseCache:
+    """TTL + LRU; `invalidate()` zvedne generaci – výsledky dotazů rozjetých před ní se neuloží."""
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 60.0) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.generation = 0
+        self._data: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self.hits = self.misses = self.invalidations = 0
+
+    def get(self, key: str, count: bool = True) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry.expires <= time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += count
+                return None
+            self._data.move_to_end(key)
+            self.hits += count
+            return entry
+
+    def put(self, key: str, entry: CachedResponse, generation: int) -> None:
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def invalidate(self, reason: str = "") -> None:
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            n = len(self._data)
+            self._data.clear()
+        logger.info(f"[api] cache invalidated ({reason or 'manual'}): {n} entries dropped")
+
+    def key_lock(self, key: str) -> threading.Lock:
+        """Zámek pro single-flight misse (pruhovaný – pevný počet zámků pro libovolný počet klíčů)."""
+        return self._stripes[hash(key) % LOCK_STRIPES]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._data), "generation": self.generation, "hits": self.hits,
+                    "misses": self.misses, "invalidations": self.invalidations}
+
+
+# ---------------------------------------------------------------- query params
+def _list(params: Dict[str, List[str]], name: str) -> Optional[List[str]]:
+    out = [v.strip() for raw in params.get(name, []) for v in raw.split(",") if v.strip()]
+    return out or None
+
+
+def _one(params: Dict[str, List[str]], name: str) -> Optional[str]:
+    vals = params.get(name)
+    return vals[-1].strip() if vals and vals[-1].strip() else None
+
+
+def _parse(params: Dict[str, List[str]], name: str, conv: Any) -> Any:
+    raw = _one(params, name)
+    if raw is None:
+        return None
+    try:
+        return conv(raw)
+    except (ValueError, ArithmeticError) as e:
+        raise BadRequest(f"invalid {name}: {raw!r}") from e
+
+
+def _encode_cursor(value: Any) -> str:
+    raw = json.dumps(value, default=_json_default, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Any:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise BadRequest("invalid cursor") from e
+
+
+class ReadAPI:
+    """Routování a dotazy; bez HTTP (testovatelné přímo)."""
+
+    def __init__(self, storage: Any, cache: ResponseCache) -> None:
+        self.storage = storage
+        self.cache = cache
+
+    def handle(self, path: str, params: Dict[str, List[str]]) -> Tuple[int, Any]:
+        parts = [unquote(p) for p in path.strip("/").split("/") if p]
+        if parts == ["api", "tenders"]:
+            return 200, self.tenders(params)
+        if len(parts) == 4 and parts[:2] == ["api", "tenders"]:
+            row = self.storage.get_tender(parts[2], parts[3])
+            return (200, row) if row else (404, {"error": "tender not found"})
+        if parts == ["api", "facets"]:
+            return 200, self.facets()
+        return 404, {"error": "not found"}
+
+    def tenders(self, params: Dict[str, List[str]]) -> Dict[str, Any]:
+        limit = min(max(_parse(params, "limit", int) or 30, 1), 200)
+        cursor = _one(params, "cursor")
+        q = _one(params, "q")
+        if q:
+            offset = _decode_cursor(cursor) if cursor else 0
+            if not isinstance(offset, int) or offset < 0:
+                raise BadRequest("invalid cursor")
+            rows = self.storage.search_tenders(q, limit=limit, offset=offset)
+            more = len(rows) == limit
+            return {"data": rows, "next_cursor": _encode_cursor(offset + limit) if more else None,
+                    "has_more": more}
+
+        filters = {
+            "statuses": _list(params, "status"),
+            "regions": _list(params, "region"),
+            "cpv": _list(params, "cpv"),
+            "budget_min": _parse(params, "budget_min", Decimal),
+            "budget_max": _parse(params, "budget_max", Decimal),
+            "deadline_from": _parse(params, "deadline_from", date.fromisoformat),
+            "deadline_to": _parse(params, "deadline_to", date.fromisoformat),
+        }
+        sort = _one(params, "sort") or "created_at"
+        if sort not in SORT_FIELDS:
+            raise BadRequest(f"invalid sort: {sort!r}")
+        sort_dir = "asc" if (_one(params, "dir") or "desc").lower() == "asc" else "desc"
+        after = None
+        if cursor:
+            try:
+                value, ext_id, in_null = _decode_cursor(cursor)
+            except (TypeError, ValueError) as e:
+                raise BadRequest("invalid cursor") from e
+            after = (None if value is None else str(value), str(ext_id), bool(in_null))
+
+        rows = self.storage.list_tenders(sort, sort_dir, after=after, limit=limit, filters=filters)
+        more = len(rows) == limit
+        next_cursor = None
+        if more:
+            last = rows[-1]
+            value = last.get(SORT_COLUMN.get(sort, sort))
+            next_cursor = _encode_cursor([value, last["external_id"], value is None])
+        out: Dict[str, Any] = {"data": rows, "next_cursor": next_cursor, "has_more": more}
+        if _one(params, "count") in ("1", "true"):
+            out["total_estimate"] = self.storage.count_tenders_estimate(filters)
+        return out
+
+    def facets(self) -> Dict[str, List[Dict[str, Any]]]:
+        out: Dict[str, List[Dict[str, Any]]] = {}
+        for r in self.storage.load_tender_facets():
+            out.setdefault(r["facet"], []).append({"value": r["value"], "n": int(r["n"])})
+        return out
+
+    def cached(self, path: str, params: Dict[str, List[str]], key: str) -> Tuple[CachedResponse, str]:
+        """Odpověď z cache, nebo jeden dotaz na klíč (ostatní souběžné misse počkají na jeho výsledek)."""
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry, "hit"
+        with self.cache.key_lock(key):
+            entry = self.cache.get(key, count=False)
+            if entry is not None:
+                return entry, "hit"
+            generation = self.cache.generation
+            status, payload = self.handle(path, params)
+            entry = CachedResponse.build(status, payload, self.cache.ttl)
+            if status == 200:
+                self.cache.put(key, entry, generation)
+            return entry, "miss"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "APIServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt: str, *args: Any) -> None:  # access log přes loguru jen na DEBUG
+        logger.debug(f"[api] {self.address_string()} {fmt % args}")
+
+    def do_GET(self) -> None:  # noqa: N802
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        route = url.path.rstrip("/") or "/"
+        if route == "/health":
+            self._send_json(200, {"ok": True, "cache": self.server.api.cache.stats()})
+            return
+        if route == "/metrics":
+            self._send(200, metrics.render().encode(), "text/plain; version=0.0.4")
+            return
+
+        params: Dict[str, List[str]] = {}
+        for k, v in parse_qsl(url.query, keep_blank_values=False):
+            params.setdefault(k, []).append(v)
+        key = route + "?" + urlencode(sorted(parse_qsl(url.query)))
+        try:
+            entry, outcome = self.server.api.cached(route, params, key)
+        except BadRequest as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            logger.exception(f"[api] {self.path}: {type(e).__name__}: {e}")
+            self._send_json(500, {"error": "internal error"})
+            return
+
+        headers = {"ETag": entry.etag, "Cache-Control": f"public, max-age={int(self.server.api.cache.ttl)}",
+                   "Vary": "Accept-Encoding"}
+        if entry.status == 200 and self.headers.get("If-None-Match") == entry.etag:
+            outcome = "not_modified"
+            self._send(304, b"", None, headers)
+        elif entry.gz is not None and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            self._send(entry.status, entry.gz, "application/json", {**headers, "Content-Encoding": "gzip"})
+        else:
+            self._send(entry.status, entry.body, "application/json", headers)
+        api_route = route.split("/")[2] if route.startswith("/api/") else "other"
+        metrics.inc("api_requests_total", route=api_route, cache=outcome)
+        metrics.observe("api_request_seconds", time.perf_counter() - started, route=api_route)
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        self._send(status, json.dumps(payload, default=_json_default).encode(), "application/json")
+
+    def _send(self, status: int, body: bytes, content_type: Optional[str],
+              headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        if self.server.cors_origin:
+            self.send_header("Access-Control-Allow-Origin", self.server.cors_origin)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+
+class APIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], api: ReadAPI, cors_origin: Optional[str] = "*") -> None:
+        super().__init__(address, _Handler)
+        self.api = api
+        self.cors_origin = cors_origin
+        self.stop = threading.Event()
+
+    def start_invalidation_listener(self) -> threading.Thread:
+        storage, cache = self.api.storage, self.api.cache
+
+        def loop() -> None:
+            backoff = 1.0
+            while not self.stop.is_set():
+                try:
+                    storage.listen(storage.CHANGE_CHANNEL, lambda p: cache.invalidate(f"commit {p}".strip()),
+                                   self.stop)
+                except Exception as e:
+                    logger.warning(f"[api] LISTEN failed: {type(e).__name__}: {e} – retry in {backoff:.0f}s")
+                    cache.invalidate("listener reconnect")  # notifikace mezitím mohly propadnout
+                    self.stop.wait(backoff)
+                    backoff = min(backoff * 2, 60.0)
+                else:
+                    backoff = 1.0
+
+        t = threading.Thread(target=loop, name="api-listen", daemon=True)
+        t.start()
+        return t
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from core.storage import DatabaseStorage
+
+    p = argparse.ArgumentParser(description="Read API pro frontend (cache + ETag + gzip)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8080)
+    p.add_argument("--ttl", type=float, default=60.0, help="max. stáří odpovědi v cache [s]")
+    p.add_argument("--cache-size", type=int, default=1000, help="max. počet odpovědí v cache (LRU)")
+    p.add_argument("--pool-size", type=int, default=8)
+    p.add_argument("--cors-origin", default="*", help="Access-Control-Allow-Origin ('' = neposílat)")
+    args = p.parse_args(argv)
+
+    load_dotenv(ENV_PATH)
+    dsn = os.getenv("SUPABASE_DSN") or os.getenv("SUPABASE_DSN_POOLER")
+    if not dsn:
+        logger.error("SUPABASE_DSN environment variable not set")
+        return 2
+    storage = DatabaseStorage.pooled(dsn, max_size=args.pool_size)
+    server = APIServer((args.host, args.port), ReadAPI(storage, ResponseCache(args.cache_size, args.ttl)),
+                       cors_origin=args.cors_origin or None)
+    server.start_invalidation_listener()
+
+    def stop(*_: Any) -> None:
+        server.stop.set()
+        threading.Thread(target=server.shutdown, daemon=True).start()  # shutdown() z vlákna serve_forever zamrzne
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    logger.info(f"[api] listening on http://{args.host}:{args.port} (ttl {args.ttl}s, cache {args.cache_size})")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        storage.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+# core/archive.py
+"""Archiv stažených stránek (WARC-like): append-only segmenty + index podle URL a času.
+
+Segment `<SOURCE>/<ts>-<pid>-<n>.seg.gz` je řetězec gzip memberů, jeden na stránku
+(`zcat` ho přečte celý). Member = JSON hlavička na prvním řádku + tělo (UTF-8).
+Vedle leží `.idx` (JSON Lines): url, kind, fetched_at, status, offset, length – díky tomu
+lze konkrétní stránku přečíst bez dekomprese celého segmentu.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import threading
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    segment: str          # cesta k .seg.gz
+    offset: int
+    length: int
+    url: str
+    kind: str             # list | detail | page
+    fetched_at: str       # ISO 8601 UTC
+    status: int
+
+
+class ArchiveWriter:
+    """Thread-safe zápis stránek do segmentů; nový segment po `max_segment_mb` a pro každý writer."""
+
+    def __init__(self, root: Path, source_id: str, max_segment_mb: int = 256, compresslevel: int = 6) -> None:
+        self.dir = Path(root) / source_id
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.max_segment_bytes = max_segment_mb * 1024 * 1024
+        self.compresslevel = compresslevel
+        self._lock = threading.Lock()
+        self._stem = f"{datetime.now(timezone.utc):%Y%m%d-%H%M%S}-{os.getpid()}"
+        self._n = 0
+        self._seg = None
+        self._idx = None
+        self._seg_path: Optional[Path] = None
+        self.records = 0
+
+    def _roll(self) -> None:
+        self._close_files()
+        self._n += 1
+        self._seg_path = self.dir / f"{self._stem}-{self._n:03d}.seg.gz"
+        self._seg = open(self._seg_path, "ab")
+        self._idx = open(self._seg_path.with_suffix("").with_suffix(".idx"), "a", encoding="utf-8")
+
+    def append(self, url: str, body: str, kind: str = "page", status: int = 200,
+               content_type: Optional[str] = None) -> None:
+        fetched_at = datetime.now(timezone.utc).isoformat()
+        head = {"url": url, "kind": kind, "fetched_at": fetched_at, "status": status, "content_type": content_type}
+        member = gzip.compress(
+            json.dumps(head, ensure_ascii=False).encode("utf-8") + b"\n" + body.encode("utf-8"),
+            compresslevel=self.compresslevel,
+        )
+        with self._lock:
+            if self._seg is None or self._seg.tell() >= self.max_segment_bytes:
+                self._roll()
+            offset = self._seg.tell()
+            self._seg.write(member)
+            self._seg.flush()
+            head.update({"segment": self._seg_path.name, "offset": offset, "length": len(member)})
+            self._idx.write(json.dumps(head, ensure_ascii=False) + "\n")
+            self._idx.flush()
+            self.records += 1
+
+    def _close_files(self) -> None:
+        for f in (self._seg, self._idx):
+            if f is not None:
+                f.close()
+        self._seg = self._idx = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_files()
+
+
+def iter_index(root: Path, source_id: str, since: Optional[datetime] = None,
+               until: Optional[datetime] = None, kind: Optional[str] = None) -> Iterator[ArchiveEntry]:
+    """Projde indexy segmentů zdroje (chronologicky podle jména) a vydá záznamy v intervalu [since, until)."""
+    base = Path(root) / source_id
+    for idx_path in sorted(base.glob("*.idx")):
+        seg = idx_path.with_suffix(".seg.gz")
+        with open(idx_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    e = json.loads(line)
+                except ValueError:
+                    continue  # nedopsaný řádek po pádu
+                if kind and e.get("kind") != kind:
+                    continue
+                ts = datetime.fromisoformat(e["fetched_at"])
+                if (since and ts < since) or (until and ts >= until):
+                    continue
+                yield ArchiveEntry(str(seg), int(e["offset"]), int(e["length"]), e["url"],
+                                   e.get("kind") or "page", e["fetched_at"], int(e.get("status") or 200))
+
+
+def read_entry(segment: str, offset: int, length: int) -> Tuple[dict, str]:
+    """Přečte jeden member segmentu → (hlavička, tělo)."""
+    with open(segment, "rb") as f:
+        f.seek(offset)
+        data = f.read(length)
+    raw = zlib.decompress(data, wbits=31)  # 31 = gzip hlavička
+    head, _, body = raw.partition(b"\n")
+    return json.loads(head), body.decode("utf-8")
@@ -0,0 +1,202 @@
+# core/attachments.py
+"""Stahování příloh zakázek do content-addressed úložiště.
+
+- omezená paralelita (ThreadPoolExecutor) přes rate limiter fetcheru adaptéru
+- streamování na disk po blocích, hash se počítá průběžně (nic se nebufferuje celé)
+- deduplikace podle SHA-256 obsahu: data/attachments/ab/cd/<sha256>
+- navázání přerušeného stahování přes Range/If-Range (.partial/<hash url>.part)
+- přeskočení nezměněných souborů (ETag / Last-Modified / velikost z minulého běhu)
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from core.fetcher import HttpFetcher
+from core.metrics import metrics
+from core.models import TenderUnit
+
+
+@dataclass
+class AttachmentJob:
+    url: str
+    name: Optional[str]
+    source_id: str
+    external_id: str
+
+
+class AttachmentStore:
+    """Content-addressed úložiště souborů (cesta = SHA-256 obsahu)."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.partial_dir = self.root / ".partial"
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    def has(self, sha256: Optional[str]) -> bool:
+        return bool(sha256) and self.path_for(sha256).exists()
+
+    def partial_for(self, url: str) -> Path:
+        return self.partial_dir / (hashlib.sha256(url.encode("utf-8")).hexdigest() + ".part")
+
+    def commit(self, part: Path, sha256: str) -> bool:
+        """Přesune hotový .part na místo podle hashe. Vrací False, pokud obsah už existoval (dedup)."""
+        dest = self.path_for(sha256)
+        if dest.exists():
+            part.unlink(missing_ok=True)
+            return False
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(part, dest)
+        return True
+
+
+def _meta_path(part: Path) -> Path:
+    return part.with_suffix(".json")
+
+
+class AttachmentPipeline:
+    """Stáhne přílohy z TenderUnit.attachments; stav (ETag, velikost, hash) drží v DB (attachment_files)."""
+
+    def __init__(self, fetcher: HttpFetcher, storage: Any, root: Path,
+                 concurrency: int = 4, chunk_size: int = 1 << 16) -> None:
+        self.fetcher = fetcher
+        self.storage = storage
+        self.store = AttachmentStore(root)
+        self.concurrency = max(1, concurrency)
+        self.chunk_size = chunk_size
+
+    # ------------------------------------------------------------ public
+    def run(self, units: Iterable[TenderUnit]) -> Dict[str, int]:
+        jobs: Dict[str, AttachmentJob] = {}
+        for u in units:
+            for att in u.attachments or []:
+                url = (att or {}).get("url")
+                if url and url not in jobs:
+                    jobs[url] = AttachmentJob(url, att.get("name"), u.source_id, u.external_id)
+        stats = {"attachments_total": len(jobs), "attachments_downloaded": 0, "attachments_unchanged": 0,
+                 "attachments_deduplicated": 0, "attachments_failed": 0, "attachments_bytes": 0}
+        if not jobs:
+            return stats
+
+        known = self.storage.load_attachment_index(list(jobs))
+        rows: List[Dict[str, Any]] = []
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="attachment") as pool:
+            for job, outcome in zip(jobs.values(), pool.map(lambda j: self._safe_process(j, known.get(j.url)), jobs.values())):
+                status, row, nbytes = outcome
+                stats[f"attachments_{status}"] += 1
+                stats["attachments_bytes"] += nbytes
+                if row:
+                    rows.append(row)
+                metrics.inc("attachments_total", source=job.source_id, result=status)
+
+        self.storage.upsert_attachment_files(rows)
+        logger.info(f"Attachments: {stats}")
+        return stats
+
+    # ------------------------------------------------------------ per soubor
+    def _safe_process(self, job: AttachmentJob, prev: Optional[Dict[str, Any]]):
+        try:
+            return self._process(job, prev)
+        except Exception as e:
+            logger.warning(f"Attachment {job.url} failed: {type(e).__name__}: {e}")
+            return "failed", None, 0
+
+    def _process(self, job: AttachmentJob, prev: Optional[Dict[str, Any]]):
+        part = self.store.partial_for(job.url)
+        meta_path = _meta_path(part)
+        offset = part.stat().st_size if part.exists() else 0
+        part_meta = json.loads(meta_path.read_text()) if offset and meta_path.exists() else {}
+
+        headers: Dict[str, str] = {}
+        have_prev = prev is not None and self.store.has(prev.get("sha256"))
+        if offset and (part_meta.get("etag") or part_meta.get("last_modified")):
+            # navázání: If-Range zajistí, že při změně souboru server pošle celý nový obsah (200)
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = part_meta.get("etag") or part_meta["last_modified"]
+        elif have_prev:
+            if prev.get("etag"):
+                headers["If-None-Match"] = prev["etag"]
+            if prev.get("last_modified"):
+                headers["If-Modified-Since"] = prev["last_modified"]
+
+        r = self.fetcher.open_stream(job.url, headers=headers)
+        try:
+            etag = r.headers.get("ETag")
+            last_modified = r.headers.get("Last-Modified")
+            length = r.headers.get("Content-Length")
+
+            if r.status_code == 304:
+                return "unchanged", self._touch_row(job, prev), 0
+            if r.status_code == 200 and have_prev and not offset and self._same_as_prev(prev, etag, length):
+                # server ignoruje podmíněný GET, ale ETag/velikost sedí → tělo nečteme
+                return "unchanged", self._touch_row(job, prev), 0
+            if r.status_code == 416:
+                # .part je delší než soubor (změnil se) – začni znovu příště
+                part.unlink(missing_ok=True)
+                meta_path.unlink(missing_ok=True)
+                raise RuntimeError("range not satisfiable, partial discarded")
+
+            hasher = hashlib.sha256()
+            if r.status_code == 206 and offset:
+                with open(part, "rb") as f:
+                    for block in iter(lambda: f.read(1 << 20), b""):
+                        hasher.update(block)
+                mode = "ab"
+            else:
+                offset = 0
+                mode = "wb"
+            meta_path.write_text(json.dumps({"url": job.url, "etag": etag, "last_modified": last_modified}))
+
+            written = 0
+            with open(part, mode) as f:
+                for chunk in r.iter_content(chunk_size=self.chunk_size):
+                    if not chunk:
+                        continue
+                    f.write(chunk)
+                    hasher.update(chunk)
+                    written += len(chunk)
+            metrics.inc("http_bytes_total", written, source=self.fetcher.source)
+        finally:
+            r.close()
+
+        size = offset + written
+        sha = hasher.hexdigest()
+        is_new = self.store.commit(part, sha)
+        meta_path.unlink(missing_ok=True)
+        row = {
+            "url": job.url,
+            "source_id": job.source_id,
+            "external_id": job.external_id,
+            "name": job.name,
+            "sha256": sha,
+            "size_bytes": size,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": r.headers.get("Content-Type"),
+            "fetched_at": datetime.now(timezone.utc),
+        }
+        return ("downloaded" if is_new else "deduplicated"), row, written
+
+    @staticmethod
+    def _same_as_prev(prev: Dict[str, Any], etag: Optional[str], length: Optional[str]) -> bool:
+        if etag and prev.get("etag"):
+            return etag == prev["etag"]
+        return bool(length) and prev.get("size_bytes") is not None and int(length) == int(prev["size_bytes"])
+
+    @staticmethod
+    def _touch_row(job: AttachmentJob, prev: Dict[str, Any]) -> Dict[str, Any]:
+        row = dict(prev)
+        row.update({"url": job.url, "source_id": job.source_id, "external_id": job.external_id,
+                    "name": job.name or prev.get("name")})
+        return row
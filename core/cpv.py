@@ -0,0 +1,49 @@
+# core/cpv.py
+"""CPV hierarchie: z 8místného kódu odvodí všechny nadřazené prefixy (oddíl → skupina → třída → kategorie …).
+
+    cpv_ancestors("45233140-2") → ["45", "452", "4523", "45233", "452331", "4523314", "45233140"]
+
+Úroveň kódu je dána nenulovými číslicemi zleva (45000000 = oddíl 45, 45230000 = třída 4523).
+Oddíly se validují proti přibalené tabulce config/cpv_divisions.yaml (načte se jednou za proces).
+"""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import yaml
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DIVISIONS_PATH = PROJECT_ROOT / "config" / "cpv_divisions.yaml"
+
+_CODE_PAT = re.compile(r"^(\d{8})(?:-\d)?$")
+
+
+@lru_cache(maxsize=1)
+def divisions() -> Dict[str, str]:
+    """Oddíl (2 číslice) → název."""
+    with open(DIVISIONS_PATH, "r", encoding="utf-8") as f:
+        return {str(k).zfill(2): v for k, v in (yaml.safe_load(f) or {}).items()}
+
+
+def cpv_ancestors(code: str) -> List[str]:
+    """Prefixy kódu od oddílu po celý kód; neplatný kód nebo neznámý oddíl → []."""
+    m = _CODE_PAT.match((code or "").strip())
+    if not m:
+        return []
+    full = m.group(1)
+    if full[:2] not in divisions():
+        return []
+    # oddíl zůstává dvoumístný i když končí nulou (80000000 → "80", ne "8")
+    significant = full.rstrip("0").ljust(2, "0")
+    out = [significant[:n] for n in range(2, len(significant) + 1)]
+    if out[-1] != full:
+        out.append(full)
+    return out
+
+
+def cpv_prefixes(codes: Iterable[str]) -> List[str]:
+    """Sjednocení prefixů všech kódů zakázky (seřazené, bez duplicit) – hodnota sloupce tenders.cpv_prefixes."""
+    return sorted({p for c in codes or [] for p in cpv_ancestors(c)})
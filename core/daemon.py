@@ -0,0 +1,235 @@
+# core/daemon.py
+"""Trvale běžící ingest (`python -m core.runner --daemon`).
+
+Místo jednorázového běhu z cronu drží proces "teplý" stav mezi běhy:
+  - adaptéry (HTTP session, rate limiter) – jeden na zdroj a režim
+  - DatabaseStorage nad poolem spojení (psycopg_pool)
+  - known_rows: otisky řádků seznamu, které už prošly ingestem → poll stahuje jen nové/změněné
+
+Plán per zdroj (`schedule:` v sources.yaml):
+
+    schedule:
+      full_interval: 86400     # plný běh s konfigurací zdroje
+      poll_interval: 300       # malý inkrementální poll (prvních pár stránek)
+      poll:                    # přepis konfigurace zdroje pro poll
+        max_pages: 2
+        skip_known: true
+
+Bez `schedule:` běží zdroj jen plně po `daemon.default_interval`. SIGTERM/SIGINT = doběhnout
+rozjeté běhy a skončit; SIGHUP nebo změna sources.yaml (mtime) = načíst konfiguraci znovu.
+"""
+from __future__ import annotations
+
+import json
+import os
+import signal
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from loguru import logger
+
+from adapters.registry import create_adapter
+from core.metrics import metrics
+from core.storage import DatabaseStorage
+
+if TYPE_CHECKING:
+    from core.runner import TenderRunner
+
+FULL = "full"
+POLL = "poll"
+
+
+@dataclass
+class _SourceJob:
+    key: str
+    cfg: Dict[str, Any]
+    intervals: Dict[str, float]                                  # režim → perioda [s]
+    next_run: Dict[str, float] = field(default_factory=dict)    # režim → time.monotonic()
+    adapters: Dict[str, Any] = field(default_factory=dict)      # režim → teplý adaptér
+    known: Dict[str, str] = field(default_factory=dict)         # sdílené known_rows adaptérů
+    running: bool = False
+
+    def mode_cfg(self, mode: str) -> Dict[str, Any]:
+        if mode == POLL:
+            return {**self.cfg, **((self.cfg.get("schedule") or {}).get("poll") or {})}
+        return self.cfg
+
+
+def _intervals(cfg: Dict[str, Any], default_interval: float) -> Dict[str, float]:
+    sched = cfg.get("schedule") or {}
+    out = {FULL: float(sched.get("full_interval") or default_interval)}
+    if sched.get("poll_interval"):
+        out[POLL] = float(sched["poll_interval"])
+    return out
+
+
+class IngestDaemon:
+    """Plánovač nad TenderRunner.run_source: každý zdroj nejvýš jeden běh najednou."""
+
+    def __init__(self, runner: "TenderRunner") -> None:
+        self.runner = runner
+        self._stop = threading.Event()
+        self._reload = threading.Event()
+        self._lock = threading.Lock()
+        self.jobs: Dict[str, _SourceJob] = {}
+        self._config_mtime = self._mtime()
+        self._dedup_future: Optional[Future] = None
+        self._dedup_next = 0.0
+        self._dirty = False  # od posledního dedupu proběhl úspěšný ingest
+        self._apply_config()
+
+    # ------------------------------------------------------------ config
+    @property
+    def settings(self) -> Dict[str, Any]:
+        return self.runner.config.get("daemon") or {}
+
+    def _mtime(self) -> float:
+        try:
+            return os.stat(self.runner.config_path).st_mtime
+        except OSError:
+            return 0.0
+
+    def _apply_config(self) -> None:
+        """Srovná joby s konfigurací; teplé adaptéry se zahodí jen zdrojům se změněnou konfigurací."""
+        default_interval = float(self.settings.get("default_interval", 86400))
+        enabled = {k: v for k, v in (self.runner.config.get("sources") or {}).items()
+                   if (v or {}).get("enabled", False)}
+        now = time.monotonic()
+        with self._lock:
+            for key in list(self.jobs):
+                if key not in enabled:
+                    logger.info(f"[daemon] {key.upper()} removed/disabled")
+                    del self.jobs[key]
+            for key, cfg in enabled.items():
+                intervals = _intervals(cfg, default_interval)
+                job = self.jobs.get(key)
+                if job is None:
+                    job = self.jobs[key] = _SourceJob(key, cfg, intervals)
+                    # po startu nejdřív levný poll; plný běh až po periodě (restart nespouští plný crawl)
+                    job.next_run = {m: now if (m == POLL or len(intervals) == 1) else now + iv
+                                    for m, iv in intervals.items()}
+                    logger.info(f"[daemon] {key.upper()} scheduled: {intervals}")
+                    continue
+                if _fingerprint(job.cfg) != _fingerprint(cfg):
+                    job.cfg = cfg
+                    job.adapters = {}  # běžící běh si drží svůj adaptér; další běh vytvoří nový
+                    logger.info(f"[daemon] {key.upper()} config changed → adapters will be recreated")
+                job.intervals = intervals
+                job.next_run = {m: min(job.next_run.get(m, now), now + iv) for m, iv in intervals.items()}
+
+    def _maybe_reload(self) -> None:
+        mtime = self._mtime()
+        if not self._reload.is_set() and mtime == self._config_mtime:
+            return
+        self._reload.clear()
+        self._config_mtime = mtime
+        if self.runner.reload_config():
+            self._apply_config()
+
+    # ------------------------------------------------------------ signals
+    def _install_signals(self) -> None:
+        if threading.current_thread() is not threading.main_thread():
+            return
+
+        def stop(signum: int, _frame: Any) -> None:
+            if self._stop.is_set():
+                logger.warning("[daemon] second signal → exiting without waiting for running ingests")
+                os._exit(1)
+            logger.info(f"[daemon] {signal.Signals(signum).name} → finishing running ingests and stopping")
+            self._stop.set()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, lambda *_: self._reload.set())
+
+    # ------------------------------------------------------------ jobs
+    def _run_job(self, job: _SourceJob, mode: str) -> bool:
+        cfg = job.mode_cfg(mode)
+        adapter = job.adapters.get(mode)
+        if adapter is None:
+            try:
+                adapter = create_adapter(job.key, cfg)
+            except Exception as e:
+                logger.exception(f"[daemon] {job.key.upper()}: adapter init failed: {type(e).__name__}: {e}")
+                return False
+            adapter.known_rows = job.known
+            job.adapters[mode] = adapter
+        ok = self.runner.run_source(job.key, cfg, adapter=adapter, mode=mode)
+        if ok:
+            adapter.commit_known()  # neúspěšný běh nechá řádky neznámé → příští poll je zapíše
+        return ok
+
+    def _finish_job(self, job: _SourceJob, mode: str, fut: Future) -> None:
+        ok = not fut.exception() and bool(fut.result())
+        metrics.inc("daemon_runs_total", source=job.key.upper(), mode=mode, result="ok" if ok else "failed")
+        now = time.monotonic()
+        with self._lock:
+            job.running = False
+            interval = job.intervals.get(mode, 0.0)
+            if not ok:
+                interval = min(interval, float(self.settings.get("retry_seconds", 120)))
+            job.next_run[mode] = now + interval
+            if mode == FULL and POLL in job.intervals:
+                job.next_run[POLL] = now + job.intervals[POLL]  # plný běh pokryl i první stránky
+            self._dirty = self._dirty or ok
+        self.runner._write_metrics()
+
+    def _submit_due(self, pool: ThreadPoolExecutor) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for job in self.jobs.values():
+                if job.running:
+                    continue
+                due = [m for m, t in job.next_run.items() if t <= now]
+                if not due:
+                    continue
+                mode = FULL if FULL in due else due[0]
+                job.running = True
+                logger.info(f"[daemon] {job.key.upper()}: {mode} run")
+                fut = pool.submit(self._run_job, job, mode)
+                fut.add_done_callback(lambda f, j=job, m=mode: self._finish_job(j, m, f))
+
+            # dedup + štítkování napříč zdroji: po úspěšných bězích, nejvýš jednou za dedup_interval
+            idle = self._dedup_future is None or self._dedup_future.done()
+            if self._dirty and idle and now >= self._dedup_next:
+                self._dirty = False
+                self._dedup_next = now + float(self.settings.get("dedup_interval", 600))
+                self._dedup_future = pool.submit(self._run_derived)
+
+    def _run_derived(self) -> None:
+        self.runner._run_dedup()
+        self.runner._run_labeling()
+        self.runner._run_tiering()
+
+    # ------------------------------------------------------------ main loop
+    def run(self) -> int:
+        self._install_signals()
+        old_storage = self.runner.storage
+        self.runner.storage = DatabaseStorage.pooled(
+            old_storage.dsn, max_size=int(self.settings.get("db_pool_size", 8)))
+        tick = float(self.settings.get("tick_seconds", 5))
+        workers = int(self.settings.get("max_workers") or len(self.runner.config.get("sources") or {}) + 1)
+        logger.info(f"=== Tender Aggregator Daemon Started (tick {tick}s, {len(self.jobs)} sources) ===")
+
+        pool = ThreadPoolExecutor(max_workers=max(workers, 2), thread_name_prefix="daemon")
+        try:
+            while not self._stop.is_set():
+                self._maybe_reload()
+                self._submit_due(pool)
+                self._stop.wait(tick)
+        finally:
+            logger.info("[daemon] waiting for running ingests…")
+            pool.shutdown(wait=True)
+            self.runner._write_metrics()
+            self.runner.storage.close()
+            self.runner.storage = old_storage
+            logger.info("=== Tender Aggregator Daemon Stopped ===")
+        return 0
+
+
+def _fingerprint(cfg: Dict[str, Any]) -> str:
+    return json.dumps(cfg, sort_keys=True, default=str)
@@ -0,0 +1,234 @@
+# core/dedup.py
+"""Detekce téměř-duplicitních zakázek napříč zdroji (MinHash + LSH banding).
+
+- normalizace: bez diakritiky, lowercase, bez interpunkce a právních forem kupujícího
+- příznaky: znakové 5-gramy názvu + slova kupujícího → MinHash podpis (NUM_PERM hodnot)
+- LSH: podpis se rozdělí na BANDS pásů; zakázky se stejným pásem jsou kandidáti
+  (tabulka tender_lsh_bands), kandidáti se ověří odhadem Jaccardovy podobnosti
+- inkrementálně: zpracují se jen nové/změněné zakázky (tender_signatures.computed_at < updated_at),
+  clustery se spojují union-find; výsledek je tenders.dedup_cluster_id
+
+    python -m core.dedup [--limit 50000] [--threshold 0.8]
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import random
+import re
+import sys
+import unicodedata
+import zlib
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+from loguru import logger
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+ENV_PATH = PROJECT_ROOT / ".env"
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE = 5
+
+_PRIME = (1 << 61) - 1
+# pevný seed → podpisy jsou stabilní mezi běhy (v DB se porovnávají se starými)
+_rng = random.Random(0x5EED)
+_PERMS: List[Tuple[int, int]] = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+_LEGAL_FORMS = {"s", "r", "o", "sro", "a", "as", "spol", "se", "vos", "ks", "z", "u", "p", "zs", "ops"}
+
+TenderKey = Tuple[str, str]  # (source_id, external_id)
+
+
+def fold(text: Optional[str]) -> str:
+    """'Oprava mostu ev.č. 1-2 ' → 'oprava mostu ev c 1 2'."""
+    if not text:
+        return ""
+    t = unicodedata.normalize("NFKD", text)
+    t = "".join(ch for ch in t if not unicodedata.combining(ch)).lower()
+    return _NON_ALNUM.sub(" ", t).strip()
+
+
+def normalize_buyer(text: Optional[str]) -> str:
+    return " ".join(w for w in fold(text).split() if w not in _LEGAL_FORMS)
+
+
+def features(title: Optional[str], buyer: Optional[str]) -> Set[str]:
+    t = fold(title)
+    feats = {t[i:i + SHINGLE] for i in range(max(1, len(t) - SHINGLE + 1))} if t else set()
+    feats.update("b:" + w for w in normalize_buyer(buyer).split())
+    return feats
+
+
+def text_fingerprint(title: Optional[str], buyer: Optional[str]) -> str:
+    return hashlib.sha1(f"{fold(title)}|{normalize_buyer(buyer)}".encode("utf-8")).hexdigest()
+
+
+def minhash(feats: Iterable[str]) -> List[int]:
+    hs = [zlib.crc32(f.encode("utf-8")) for f in feats]
+    if not hs:
+        return [_PRIME] * NUM_PERM
+    return [min((a * h + b) % _PRIME for h in hs) for a, b in _PERMS]
+
+
+def band_keys(sig: List[int]) -> List[int]:
+    """Klíč bucketu pro každý pás (signed 64-bit kvůli BIGINT)."""
+    out = []
+    for i in range(BANDS):
+        chunk = ",".join(map(str, sig[i * ROWS:(i + 1) * ROWS])).encode("ascii")
+        out.append(int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "big", signed=True))
+    return out
+
+
+def similarity(a: List[int], b: List[int]) -> float:
+    """Odhad Jaccardovy podobnosti ze dvou podpisů."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+class _UnionFind:
+    def __init__(self) -> None:
+        self.parent: Dict[TenderKey, TenderKey] = {}
+
+    def find(self, x: TenderKey) -> TenderKey:
+        self.parent.setdefault(x, x)
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: TenderKey, b: TenderKey) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+@dataclass
+class _Item:
+    key: TenderKey
+    hash_id: str
+    deadline: Optional[date]
+    sig: List[int]
+    cluster_id: Optional[str] = None
+
+
+class DedupEngine:
+    """Inkrementální přiřazení dedup_cluster_id pro nové/změněné zakázky."""
+
+    def __init__(self, storage: Any, threshold: float = 0.8, max_deadline_days: int = 14,
+                 batch_size: int = 5000) -> None:
+        self.storage = storage
+        self.threshold = threshold
+        self.max_deadline_days = max_deadline_days
+        self.batch_size = batch_size
+
+    def _compatible(self, a: _Item, b: _Item) -> bool:
+        if a.deadline and b.deadline and abs((a.deadline - b.deadline).days) > self.max_deadline_days:
+            return False
+        return similarity(a.sig, b.sig) >= self.threshold
+
+    def run(self, limit: Optional[int] = None) -> Dict[str, int]:
+        stats = {"processed": 0, "matched": 0, "clusters_merged": 0}
+        while limit is None or stats["processed"] < limit:
+            size = self.batch_size if limit is None else min(self.batch_size, limit - stats["processed"])
+            pending = self.storage.load_dedup_pending(size)
+            if not pending:
+                break
+            batch = self._process(pending)
+            for k in stats:
+                stats[k] += batch[k]
+            if len(pending) < size:
+                break
+        logger.info(f"Dedup: {stats}")
+        return stats
+
+    def _process(self, pending: List[dict]) -> Dict[str, int]:
+        new: Dict[TenderKey, _Item] = {}
+        signatures: List[dict] = []
+        bands: List[Tuple[int, int, str, str]] = []
+        for r in pending:
+            key = (r["source_id"], r["external_id"])
+            feats = features(r["title"], r["buyer"])
+            sig = minhash(feats)
+            new[key] = _Item(key, r["hash_id"], r.get("deadline"), sig)
+            signatures.append({"source_id": key[0], "external_id": key[1], "minhash": sig,
+                               "text_fp": text_fingerprint(r["title"], r["buyer"])})
+            if feats:  # prázdný název by padl do společných bucketů se všemi prázdnými
+                bands.extend((i, bk, key[0], key[1]) for i, bk in enumerate(band_keys(sig)))
+
+        # kandidáti: stejné (pás, bucket) v DB i uvnitř dávky
+        buckets: Dict[Tuple[int, int], List[TenderKey]] = {}
+        for band, bucket, s, e in bands:
+            buckets.setdefault((band, bucket), []).append((s, e))
+        existing: Dict[TenderKey, _Item] = {}
+        for row in self.storage.load_lsh_candidates(list(buckets)):
+            key = (row["source_id"], row["external_id"])
+            if key in new:
+                continue
+            if key not in existing:
+                existing[key] = _Item(key, row["hash_id"], row.get("deadline"), list(row["minhash"]),
+                                      row.get("dedup_cluster_id"))
+            buckets[(row["band"], row["bucket"])].append(key)
+
+        items = {**existing, **new}
+        uf = _UnionFind()
+        matched: Set[TenderKey] = set()
+        checked: Set[Tuple[TenderKey, TenderKey]] = set()
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            for a in members:
+                if a not in new:
+                    continue
+                for b in members:
+                    pair = (min(a, b), max(a, b))
+                    if a == b or pair in checked:
+                        continue
+                    checked.add(pair)
+                    if self._compatible(items[a], items[b]):
+                        uf.union(a, b)
+                        matched.update(k for k in (a, b) if k in new)
+
+        # cluster id: nejmenší existující id v komponentě, jinak hash_id kořene
+        groups: Dict[TenderKey, List[TenderKey]] = {}
+        for key in list(new) + [k for k in existing if k in uf.parent]:
+            groups.setdefault(uf.find(key), []).append(key)
+        assign: List[Tuple[str, str, str]] = []
+        merges: List[Tuple[str, str]] = []  # (staré id, nové id)
+        for root, members in groups.items():
+            old_ids = sorted({items[k].cluster_id for k in members if items[k].cluster_id})
+            cid = old_ids[0] if old_ids else items[root].hash_id
+            merges.extend((o, cid) for o in old_ids[1:])
+            assign.extend((k[0], k[1], cid) for k in members if k in new or items[k].cluster_id is None)
+
+        self.storage.save_dedup(signatures, bands, assign, merges)
+        return {"processed": len(new), "matched": len(matched), "clusters_merged": len(merges)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from core.storage import DatabaseStorage
+
+    p = argparse.ArgumentParser(description="Inkrementální detekce téměř-duplicitních zakázek (MinHash/LSH)")
+    p.add_argument("--limit", type=int, default=None, help="max. počet zpracovaných zakázek")
+    p.add_argument("--threshold", type=float, default=0.8, help="min. odhad Jaccardovy podobnosti")
+    p.add_argument("--max-deadline-days", type=int, default=14)
+    args = p.parse_args(argv)
+
+    load_dotenv(ENV_PATH)
+    dsn = os.getenv("SUPABASE_DSN") or os.getenv("SUPABASE_DSN_POOLER")
+    if not dsn:
+        logger.error("SUPABASE_DSN environment variable not set")
+        return 2
+    DedupEngine(DatabaseStorage(dsn), threshold=args.threshold,
+                max_deadline_days=args.max_deadline_days).run(limit=args.limit)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
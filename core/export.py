@@ -0,0 +1,204 @@
+# core/export.py
+"""Inkrementální snapshot zakázek do Parquetu (Arrow) pro analytiku nad lokálními soubory.
+
+Každý běh připíše jen zakázky (hot + archiv, view tenders_all) změněné od watermarku
+(updated_at, source_id, external_id) v `<out>/tenders/_watermark.json`. Soubory jsou
+rozdělené Hive partitions podle zdroje a měsíce změny:
+
+    <out>/tenders/source_id=NEN/updated_month=2026-10/part-20261019T040000-00000.parquet
+
+Změněná zakázka tak existuje ve více verzích – aktuální stav = poslední updated_at
+na (source_id, external_id), např. v DuckDB:
+
+    SELECT * FROM read_parquet('data/exports/tenders/**/*.parquet', hive_partitioning = true)
+    QUALIFY row_number() OVER (PARTITION BY source_id, external_id ORDER BY updated_at DESC) = 1;
+
+Exportují se jen řádky starší než `--lag` sekund: transakce ingestu, která ještě necommitla,
+má updated_at z doby svého startu a jinak by ji posunutý watermark přeskočil.
+
+    python -m core.export [--out data/exports] [--with-raw] [--batch-size 50000] [--full]
+
+Vyžaduje pyarrow (`pip install .[export]`).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from loguru import logger
+
+from core.metrics import metrics
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+ENV_PATH = PROJECT_ROOT / ".env"
+EXPORT_DIR = PROJECT_ROOT / "data" / "exports"
+DATASET = "tenders"
+
+# (sloupec, typ) – pořadí = pořadí ve schématu; typy jako jména továren pyarrow.
+# Jen sloupce, jejichž změna zvedá updated_at: dedup_cluster_id (DedupEngine) a vrstvu hot/archiv
+# (tier_tenders) mění odvozené kroky bez updated_at → v inkrementálním snapshotu by zůstaly
+# navždy ve stavu z prvního exportu (typicky NULL / 'hot'); aktuální hodnoty jsou v DB.
+COLUMNS: List[Tuple[str, str]] = [
+    ("hash_id", "string"), ("source_id", "string"), ("external_id", "string"),
+    ("title", "string"), ("buyer", "string"), ("cpv", "list_string"), ("country", "string"),
+    ("region", "string"), ("procedure_type", "string"), ("budget_value", "float64"),
+    ("currency", "string"), ("budget_czk", "float64"), ("deadline", "date32"),
+    ("notice_url", "string"), ("attachments", "json"), ("status", "string"),
+    ("status_norm", "string"), ("description", "string"),
+    ("created_at", "timestamp"), ("updated_at", "timestamp"),
+]
+RAW_COLUMN = ("raw_detail", "json")
+
+
+def _import_pyarrow() -> Tuple[Any, Any]:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet export requires pyarrow (pip install .[export])") from e
+    return pa, pq
+
+
+def _arrow_type(pa: Any, kind: str) -> Any:
+    return {
+        "string": pa.string(),
+        "json": pa.string(),  # JSON text; v DuckDB/Polars se parsuje až při dotazu
+        "list_string": pa.list_(pa.string()),
+        "float64": pa.float64(),
+        "date32": pa.date32(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }[kind]
+
+
+def _value(kind: str, v: Any) -> Any:
+    if v is None:
+        return None
+    if kind == "json":
+        return json.dumps(v, ensure_ascii=False, default=str)
+    if kind == "float64":
+        return float(v)  # NUMERIC → Decimal
+    if kind == "list_string":
+        return list(v)
+    return v
+
+
+def _partition(row: Dict[str, Any]) -> str:
+    return f"source_id={row['source_id']}/updated_month={row['updated_at']:%Y-%m}"
+
+
+class ParquetExporter:
+    """Připisuje dávky změněných zakázek do partitioned Parquet datasetu a posouvá watermark."""
+
+    def __init__(self, storage: Any, out_dir: Path = EXPORT_DIR, batch_size: int = 50000,
+                 with_raw: bool = False, lag_seconds: float = 300.0, compression: str = "zstd") -> None:
+        self.storage = storage
+        self.dataset_dir = Path(out_dir) / DATASET
+        self.batch_size = batch_size
+        self.with_raw = with_raw
+        self.lag_seconds = lag_seconds
+        self.compression = compression
+        self.columns = COLUMNS + ([RAW_COLUMN] if with_raw else [])
+
+    @property
+    def watermark_path(self) -> Path:
+        return self.dataset_dir / "_watermark.json"
+
+    def load_watermark(self) -> Tuple[Optional[datetime], str, str]:
+        try:
+            wm = json.loads(self.watermark_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None, "", ""
+        return datetime.fromisoformat(wm["updated_at"]), wm["source_id"], wm["external_id"]
+
+    def _save_watermark(self, after: Tuple[datetime, str, str], rows_run: int) -> None:
+        tmp = self.watermark_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "updated_at": after[0].isoformat(), "source_id": after[1], "external_id": after[2],
+            "exported_at": datetime.now(timezone.utc).isoformat(), "rows_last_run": rows_run,
+            "with_raw": self.with_raw,
+        }, indent=2), encoding="utf-8")
+        os.replace(tmp, self.watermark_path)  # atomicky – pád uprostřed nechá starý watermark
+
+    def _write_batch(self, rows: List[Dict[str, Any]], run_id: str, seq: int) -> int:
+        pa, pq = _import_pyarrow()
+        # source_id je klíč partition (adresář), v souboru se neopakuje – konvence Hive / pyarrow.dataset
+        columns = [(name, kind) for name, kind in self.columns if name != "source_id"]
+        schema = pa.schema([(name, _arrow_type(pa, kind)) for name, kind in columns])
+        parts: Dict[str, List[Dict[str, Any]]] = {}
+        for r in rows:
+            parts.setdefault(_partition(r), []).append(r)
+        files = 0
+        for part, part_rows in parts.items():
+            cols = {name: [_value(kind, r.get(name)) for r in part_rows] for name, kind in columns}
+            target = self.dataset_dir / part
+            target.mkdir(parents=True, exist_ok=True)
+            pq.write_table(pa.Table.from_pydict(cols, schema=schema),
+                           target / f"part-{run_id}-{seq:05d}.parquet", compression=self.compression)
+            files += 1
+        return files
+
+    def run(self, full: bool = False) -> Dict[str, int]:
+        _import_pyarrow()  # chybějící závislost ohlásit dřív, než se cokoli načte z DB
+        if full and self.dataset_dir.exists():
+            logger.info(f"Full export: removing {self.dataset_dir}")
+            shutil.rmtree(self.dataset_dir)
+        self.dataset_dir.mkdir(parents=True, exist_ok=True)
+
+        after = self.load_watermark()
+        until = self.storage.db_now() - timedelta(seconds=self.lag_seconds)
+        run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        stats = {"rows": 0, "files": 0, "batches": 0}
+        while True:
+            with metrics.timer("stage_seconds", source="ALL", stage="export_fetch"):
+                rows = self.storage.load_tenders_changed(after, until, self.batch_size, with_raw=self.with_raw)
+            if not rows:
+                break
+            with metrics.timer("stage_seconds", source="ALL", stage="export_write"):
+                stats["files"] += self._write_batch(rows, run_id, stats["batches"])
+            after = (rows[-1]["updated_at"], rows[-1]["source_id"], rows[-1]["external_id"])
+            stats["rows"] += len(rows)
+            stats["batches"] += 1
+            self._save_watermark(after, stats["rows"])
+            metrics.inc("export_rows_total", len(rows), dataset=DATASET)
+            if len(rows) < self.batch_size:
+                break
+        logger.info(f"Parquet export → {self.dataset_dir}: {stats} (watermark {after[0]})")
+        return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from core.storage import DatabaseStorage
+
+    p = argparse.ArgumentParser(description="Inkrementální export zakázek do Parquetu (Hive partitions)")
+    p.add_argument("--out", type=Path, default=EXPORT_DIR)
+    p.add_argument("--with-raw", action="store_true", help="přidat sloupec raw_detail (nejnovější detail z raw_data)")
+    p.add_argument("--batch-size", type=int, default=50000)
+    p.add_argument("--lag", type=float, default=300.0, help="exportovat jen změny starší než N sekund")
+    p.add_argument("--compression", default="zstd")
+    p.add_argument("--full", action="store_true", help="smazat dataset a exportovat vše znovu")
+    args = p.parse_args(argv)
+
+    load_dotenv(ENV_PATH)
+    dsn = os.getenv("SUPABASE_DSN") or os.getenv("SUPABASE_DSN_POOLER")
+    if not dsn:
+        logger.error("SUPABASE_DSN environment variable not set")
+        return 2
+    exporter = ParquetExporter(DatabaseStorage(dsn), args.out, batch_size=args.batch_size,
+                               with_raw=args.with_raw, lag_seconds=args.lag, compression=args.compression)
+    try:
+        exporter.run(full=args.full)
+    except RuntimeError as e:
+        logger.error(str(e))
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,36 +2,103 @@
 from __future__ import annotations
 
 import random
+import threading
 import time
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, Optional
 import requests
 
+from core.metrics import metrics
+
+if TYPE_CHECKING:
+    from core.archive import ArchiveWriter
+
 
 class HttpFetcher:
     def __init__(self, delay_min: float = 0.5, delay_max: float = 1.0,
                  user_agent: Optional[str] = None,
-                 max_retries: int = 3, backoff_base: float = 0.6):
+                 max_retries: int = 3, backoff_base: float = 0.6,
+                 source: str = "-"):
         self.delay_min = delay_min
         self.delay_max = delay_max
         self.max_retries = max_retries
         self.backoff_base = backoff_base
+        self.source = source  # label pro metriky
+        # sdílený limiter: rozestup mezi starty requestů platí přes všechna vlákna tohoto fetcheru
+        self._slot_lock = threading.Lock()
+        self._next_slot = 0.0
+        self.archive: Optional["ArchiveWriter"] = None  # když je nastaven, get_text ukládá stažené stránky
         self.session = requests.Session()
         self.session.headers.update({
             "User-Agent": user_agent or "vz-aggregator/0.1 (+contact@example.com)"
         })
 
-    def get_text(self, url: str) -> str:
+    def _sleep(self, seconds: float) -> None:
+        metrics.inc("http_sleep_seconds_total", seconds, source=self.source)
+        time.sleep(seconds)
+
+    def _wait_turn(self) -> None:
+        """Počká na další volný slot (delay_min..delay_max od startu předchozího requestu)."""
+        with self._slot_lock:
+            now = time.monotonic()
+            start = max(now, self._next_slot)
+            self._next_slot = start + random.uniform(self.delay_min, self.delay_max)
+        if start > now:
+            self._sleep(start - now)
+
+    def get_text(self, url: str, kind: str = "page") -> str:
         attempt = 0
         while True:
             try:
-                time.sleep(random.uniform(self.delay_min, self.delay_max))
-                r = self.session.get(url, timeout=30)
+                self._wait_turn()
+                try:
+                    with metrics.timer("http_request_seconds", source=self.source):
+                        r = self.session.get(url, timeout=30)
+                except Exception:
+                    metrics.inc("http_requests_total", source=self.source, status="error")
+                    raise
+                metrics.inc("http_requests_total", source=self.source, status=r.status_code)
                 r.raise_for_status()
+                metrics.inc("http_bytes_total", len(r.content), source=self.source)
+                if getattr(r, "from_cache", False):  # requests-cache a kompatibilní session
+                    metrics.inc("http_cache_hits_total", source=self.source)
                 r.encoding = r.apparent_encoding or "utf-8"
-                return r.text
+                text = r.text
+                if self.archive is not None:
+                    self.archive.append(url, text, kind=kind, status=r.status_code,
+                                        content_type=r.headers.get("Content-Type"))
+                return text
             except Exception:
                 attempt += 1
                 if attempt > self.max_retries:
                     raise
+                metrics.inc("http_retries_total", source=self.source)
                 # exponential backoff with jitter
-                time.sleep((self.backoff_base ** attempt) + random.uniform(0, 0.3))
+                self._sleep((self.backoff_base ** attempt) + random.uniform(0, 0.3))
+
+    def open_stream(self, url: str, headers: Optional[Dict[str, str]] = None,
+                    ok_statuses: tuple = (200, 206, 304, 416)) -> requests.Response:
+        """
+        Streamovaný GET přes stejný limiter a retry jako get_text. Tělo se nečte – volající
+        iteruje `iter_content` a response zavře. Statusy z `ok_statuses` se vrací bez raise.
+        """
+        attempt = 0
+        while True:
+            try:
+                self._wait_turn()
+                try:
+                    with metrics.timer("http_request_seconds", source=self.source):
+                        r = self.session.get(url, headers=headers, stream=True, timeout=60)
+                except Exception:
+                    metrics.inc("http_requests_total", source=self.source, status="error")
+                    raise
+                metrics.inc("http_requests_total", source=self.source, status=r.status_code)
+                if r.status_code not in ok_statuses:
+                    r.close()
+                    r.raise_for_status()
+                return r
+            except Exception:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                metrics.inc("http_retries_total", source=self.source)
+                self._sleep((self.backoff_base ** attempt) + random.uniform(0, 0.3))
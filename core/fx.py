@@ -0,0 +1,103 @@
+# core/fx.py
+"""Přepočet rozpočtů na CZK podle lokální kurzovní tabulky (config/fx_rates.csv).
+
+    currency,valid_from,czk_per_unit
+    EUR,2026-01-01,24.32
+
+Kurz = nejnovější řádek měny s valid_from <= datum přepočtu (bez data = platí odjakživa).
+Tabulka se drží v procesu a znovu načte, jen když se změní mtime souboru –
+`rates()` je levné volat pro každou dávku.
+
+    to_czk(1000, "EUR") → 24320.0
+"""
+from __future__ import annotations
+
+import bisect
+import csv
+import os
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from core.normalize import parse_date
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+RATES_PATH = PROJECT_ROOT / "config" / "fx_rates.csv"
+
+BASE = "CZK"
+
+
+class FxTable:
+    """Kurzy měna → [(valid_from, CZK za 1 jednotku)] seřazené podle data."""
+
+    def __init__(self, rates: Dict[str, List[Tuple[date, float]]]) -> None:
+        self._rates = {cur: sorted(rows) for cur, rows in rates.items()}
+        self._dates = {cur: [d for d, _ in rows] for cur, rows in self._rates.items()}
+
+    @classmethod
+    def load(cls, path: Path) -> "FxTable":
+        rates: Dict[str, List[Tuple[date, float]]] = {}
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(line for line in f if not line.lstrip().startswith("#")):
+                cur = (row.get("currency") or "").strip().upper()
+                try:
+                    rate = float((row.get("czk_per_unit") or "").replace(",", "."))
+                except ValueError:
+                    continue
+                if not cur or rate <= 0:
+                    continue
+                valid_from = parse_date(row.get("valid_from")) or date.min
+                rates.setdefault(cur, []).append((valid_from, rate))
+        return cls(rates)
+
+    def rate(self, currency: str, on: Optional[date] = None) -> Optional[float]:
+        """CZK za 1 jednotku měny platné k datu `on` (default dnes); neznámá měna → None."""
+        cur = currency.strip().upper()
+        if cur == BASE:
+            return 1.0
+        dates = self._dates.get(cur)
+        if not dates:
+            return None
+        i = bisect.bisect_right(dates, on or date.today())
+        return self._rates[cur][i - 1][1] if i else None
+
+    def currencies(self) -> List[str]:
+        return sorted(self._rates)
+
+
+_lock = threading.Lock()
+_cache: Dict[Path, Tuple[float, FxTable]] = {}
+
+
+def rates(path: Path = RATES_PATH) -> FxTable:
+    """Kurzovní tabulka z cache procesu; při změně souboru (mtime) se načte znovu."""
+    try:
+        mtime = os.stat(path).st_mtime
+    except FileNotFoundError:
+        mtime = -1.0
+    with _lock:
+        hit = _cache.get(path)
+        if hit and hit[0] == mtime:
+            return hit[1]
+        if mtime < 0:
+            logger.warning(f"FX rates file {path} not found – only {BASE} budgets will be normalized")
+            table = FxTable({})
+        else:
+            table = FxTable.load(path)
+            logger.info(f"FX rates loaded from {path.name}: {', '.join(table.currencies()) or '-'}")
+        _cache[path] = (mtime, table)
+    return table
+
+
+def to_czk(value: Optional[float], currency: Optional[str], on: Optional[date] = None,
+           table: Optional[FxTable] = None) -> Optional[float]:
+    """Hodnota v CZK (zaokrouhlená na haléře); bez měny = CZK (stejně jako ingest), neznámá měna → None."""
+    if value is None:
+        return None
+    rate = (table or rates()).rate(currency or BASE, on)
+    if rate is None:
+        return None
+    return round(float(value) * rate, 2)
@@ -1,9 +1,165 @@
+# core/labeler.py
+"""Štítkování zakázek kategoriemi (config/labels.yaml) podle názvu, popisu a CPV.
+
+Klasifikátor = centroidy TF-IDF: každá kategorie je řídký vektor svých termů (IDF napříč
+kategoriemi → slovo společné mnoha kategoriím váží málo), zakázka je řídký vektor kmenů
+názvu (váha 2×) a popisu. Skóre = kosinová podobnost + `cpv_weight` při shodě CPV prefixu.
+Dávka se skóruje přes invertovaný index term → [(kategorie, váha)] – řídké násobení
+matice × vektor bez procházení všech kategorií.
+
+Inkrementálně: zpracují se jen zakázky bez štítků, se změněným hash_id nebo textem
+(otisk title/description/cpv) nebo štítkované starší verzí labels.yaml; dávka se zapíše
+jedním INSERT ... SELECT FROM unnest.
+
+    python -m core.labeler [--batch-size 2000] [--limit 50000] [--source NEN] [--dry-run]
+"""
 from __future__ import annotations
+
+import argparse
+import hashlib
+import math
+import os
 import sys
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+from dotenv import load_dotenv
+from loguru import logger
+
+from core.alerts import stem
+from core.cpv import cpv_prefixes
+from core.dedup import fold
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+ENV_PATH = PROJECT_ROOT / ".env"
+LABELS_PATH = PROJECT_ROOT / "config" / "labels.yaml"
+
+TITLE_WEIGHT = 2.0
+MIN_TOKEN = 2
+
+
+def terms(text: Optional[str]) -> List[str]:
+    """Kmeny slov textu (bez diakritiky, lowercase, ořez pádových koncovek)."""
+    return [stem(w) for w in fold(text).split() if len(w) >= MIN_TOKEN]
+
+
+@dataclass(frozen=True)
+class LabelResult:
+    labels: List[str]
+    scores: Dict[str, float]
+
+
+class LabelModel:
+    """Zkompilovaná taxonomie; `version` = otisk labels.yaml (změna → přeštítkovat vše)."""
 
-def main() -> int:
-    print("labeler: test OK")
+    def __init__(self, spec: Dict[str, Any], version: str = "") -> None:
+        self.version = version
+        self.threshold = float(spec.get("threshold", 0.3))
+        self.max_labels = int(spec.get("max_labels", 3))
+        self.cpv_weight = float(spec.get("cpv_weight", 0.35))
+        labels = spec.get("labels") or {}
+        self.keys: List[str] = list(labels)
+
+        docs: List[Counter] = [Counter(t for phrase in (v or {}).get("terms") or [] for t in terms(phrase))
+                               for v in labels.values()]
+        df = Counter(t for d in docs for t in d)
+        n = len(docs)
+        self.idf: Dict[str, float] = {t: math.log((1 + n) / (1 + c)) + 1.0 for t, c in df.items()}
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+        for i, d in enumerate(docs):
+            vec = {t: tf * self.idf[t] for t, tf in d.items()}
+            norm = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+            for t, w in vec.items():
+                self.postings.setdefault(t, []).append((i, w / norm))
+        self.cpv: Dict[str, List[int]] = {}
+        for i, v in enumerate(labels.values()):
+            for p in (v or {}).get("cpv") or []:
+                self.cpv.setdefault(str(p), []).append(i)
+
+    @classmethod
+    def load(cls, path: Path = LABELS_PATH) -> "LabelModel":
+        data = path.read_bytes()
+        return cls(yaml.safe_load(data) or {}, version=hashlib.sha1(data).hexdigest()[:12])
+
+    def score(self, title: Optional[str], description: Optional[str], cpv: Optional[List[str]]) -> LabelResult:
+        tf: Counter = Counter()
+        for t in terms(title):
+            tf[t] += TITLE_WEIGHT
+        for t in terms(description):
+            tf[t] += 1.0
+        # jen termy taxonomie; ostatní slova do normy nevstupují (krátký i dlouhý popis srovnatelně)
+        vec = {t: c * self.idf[t] for t, c in tf.items() if t in self.idf}
+        norm = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+
+        scores = [0.0] * len(self.keys)
+        for t, w in vec.items():
+            for i, lw in self.postings[t]:
+                scores[i] += w / norm * lw
+        for i in {i for p in cpv_prefixes(cpv or []) for i in self.cpv.get(p, ())}:
+            scores[i] += self.cpv_weight
+
+        ranked = sorted((s, i) for i, s in enumerate(scores) if s >= self.threshold)[::-1][: self.max_labels]
+        return LabelResult([self.keys[i] for _, i in ranked],
+                           {self.keys[i]: round(s, 4) for s, i in ranked})
+
+
+class Labeler:
+    """Dávkové, inkrementální štítkování nad DatabaseStorage."""
+
+    def __init__(self, storage: Any, model: Optional[LabelModel] = None, batch_size: int = 2000) -> None:
+        self.storage = storage
+        self.model = model or LabelModel.load()
+        self.batch_size = batch_size
+
+    def run(self, limit: Optional[int] = None, source_id: Optional[str] = None,
+            dry_run: bool = False) -> Dict[str, int]:
+        stats = {"processed": 0, "labeled": 0, "unlabeled": 0}
+        after: Tuple[str, str] = ("", "")
+        while limit is None or stats["processed"] < limit:
+            size = self.batch_size if limit is None else min(self.batch_size, limit - stats["processed"])
+            rows = self.storage.load_label_pending(self.model.version, after, size, source_id=source_id)
+            if not rows:
+                break
+            after = (rows[-1]["source_id"], rows[-1]["external_id"])
+            out = []
+            for r in rows:
+                res = self.model.score(r["title"], r["description"], r["cpv"])
+                out.append({"source_id": r["source_id"], "external_id": r["external_id"],
+                            "hash_id": r["hash_id"], "text_fp": r["text_fp"],
+                            "labels": res.labels, "scores": res.scores})
+                stats["labeled" if res.labels else "unlabeled"] += 1
+            if not dry_run:
+                self.storage.save_tender_labels(out, self.model.version)
+            stats["processed"] += len(rows)
+            if len(rows) < size:
+                break
+        logger.info(f"Labeling (model {self.model.version}{', dry-run' if dry_run else ''}): {stats}")
+        return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from core.storage import DatabaseStorage
+
+    p = argparse.ArgumentParser(description="Inkrementální štítkování zakázek kategoriemi z config/labels.yaml")
+    p.add_argument("--batch-size", type=int, default=2000)
+    p.add_argument("--limit", type=int, default=None, help="max. počet zpracovaných zakázek")
+    p.add_argument("--source", default=None, help="jen jeden source_id (default všechny)")
+    p.add_argument("--labels", type=Path, default=LABELS_PATH)
+    p.add_argument("--dry-run", action="store_true", help="jen spočítat, nezapisovat")
+    args = p.parse_args(argv)
+
+    load_dotenv(ENV_PATH)
+    dsn = os.getenv("SUPABASE_DSN") or os.getenv("SUPABASE_DSN_POOLER")
+    if not dsn:
+        logger.error("SUPABASE_DSN environment variable not set")
+        return 2
+    Labeler(DatabaseStorage(dsn), LabelModel.load(args.labels), batch_size=args.batch_size).run(
+        limit=args.limit, source_id=args.source, dry_run=args.dry_run)
     return 0
 
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,120 @@
+# core/ledger.py
+"""Report nad ingest_runs: porovná poslední běh s klouzavou baseline a hlásí výkonnostní regrese.
+
+    python -m core.ledger --source NEN --baseline 10 --threshold 0.3 [--mode poll]
+
+Porovnávají se jen běhy stejného režimu (plné běhy vs. inkrementální polly daemonu).
+
+Návratový kód 1 = nalezena regrese (vhodné pro cron/CI alert), 0 = v pořádku nebo málo dat.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from statistics import median
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+from loguru import logger
+
+from core.storage import DatabaseStorage
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+ENV_PATH = PROJECT_ROOT / ".env"
+
+
+@dataclass
+class Comparison:
+    metric: str
+    latest: float
+    baseline: float
+    change: float          # relativní změna (+0.25 = o 25 % víc)
+    higher_is_better: bool
+    regression: bool
+
+
+def _num(v: Any) -> Optional[float]:
+    try:
+        return None if v is None else float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _run_metrics(run: Dict[str, Any]) -> Dict[str, float]:
+    """Metriky jednoho běhu: details/sec a sekundy fází na jeden detail (nezávislé na objemu)."""
+    out: Dict[str, float] = {}
+    dps = _num(run.get("details_per_sec"))
+    if dps is not None:
+        out["details_per_sec"] = dps
+    details = max(1.0, _num(run.get("details_fetched")) or 0.0)
+    for stage, secs in (run.get("stage_seconds") or {}).items():
+        v = _num(secs)
+        if v is not None:
+            out[f"{stage}_ms_per_detail"] = v * 1000.0 / details
+    return out
+
+
+def compare_runs(latest: Dict[str, Any], baseline_runs: List[Dict[str, Any]],
+                 threshold: float = 0.3) -> List[Comparison]:
+    """Porovná poslední běh s mediánem baseline. `threshold` = povolené relativní zhoršení."""
+    cur = _run_metrics(latest)
+    history = [_run_metrics(r) for r in baseline_runs]
+    out: List[Comparison] = []
+    for metric, value in sorted(cur.items()):
+        samples = [h[metric] for h in history if metric in h]
+        if not samples:
+            continue
+        base = median(samples)
+        if base == 0:
+            continue
+        change = (value - base) / base
+        higher_is_better = metric == "details_per_sec"
+        worse = -change if higher_is_better else change
+        out.append(Comparison(metric, value, base, change, higher_is_better, worse > threshold))
+    return out
+
+
+def report(storage: DatabaseStorage, source_id: str, baseline: int, threshold: float,
+           min_baseline: int = 3, mode: str = "full") -> int:
+    runs = storage.recent_ingest_runs(source_id, limit=baseline + 1, mode=mode)
+    if len(runs) < min_baseline + 1:
+        logger.warning(f"[{source_id}] not enough successful {mode} runs for a baseline ({len(runs)} found)")
+        return 0
+
+    latest, history = runs[0], runs[1:]
+    comparisons = compare_runs(latest, history, threshold)
+    print(f"Source {source_id} ({mode}): run #{latest['id']} started {latest['started_at']} "
+          f"vs median of {len(history)} previous runs (threshold {threshold:.0%})")
+    print(f"{'metric':<34} {'latest':>12} {'baseline':>12} {'change':>9}")
+    for c in comparisons:
+        flag = "  REGRESSION" if c.regression else ""
+        print(f"{c.metric:<34} {c.latest:>12.3f} {c.baseline:>12.3f} {c.change:>+8.1%}{flag}")
+
+    regressions = [c for c in comparisons if c.regression]
+    if regressions:
+        logger.error(f"[{source_id}] performance regression: {', '.join(c.metric for c in regressions)}")
+        return 1
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Porovnání posledního ingest běhu s baseline")
+    p.add_argument("--source", default="NEN", help="source_id v ingest_runs (default NEN)")
+    p.add_argument("--baseline", type=int, default=10, help="počet předchozích úspěšných běhů v baseline")
+    p.add_argument("--threshold", type=float, default=0.3, help="povolené relativní zhoršení (0.3 = 30 %%)")
+    p.add_argument("--mode", choices=("full", "poll"), default="full", help="režim porovnávaných běhů")
+    args = p.parse_args(argv)
+
+    load_dotenv(ENV_PATH)
+    dsn = os.getenv("SUPABASE_DSN") or os.getenv("SUPABASE_DSN_POOLER")
+    if not dsn:
+        logger.error("SUPABASE_DSN environment variable not set")
+        return 2
+    return report(DatabaseStorage(dsn), args.source, args.baseline, args.threshold, mode=args.mode)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+# core/metrics.py
+"""Lehká instrumentace ingestu: countery, gauge a histogramy s exportem do Prometheus textfile."""
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_LABEL_PAT = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0,
+)
+
+# popisky pro HELP řádky; neznámé metriky dostanou prázdný popis
+_HELP: Dict[str, str] = {
+    "http_request_seconds": "Duration of single HTTP requests (without politeness sleep).",
+    "http_requests_total": "HTTP requests by response status ('error' = no response).",
+    "http_retries_total": "HTTP retries after a failed attempt.",
+    "http_bytes_total": "Response body bytes downloaded.",
+    "http_sleep_seconds_total": "Time spent in politeness delay and retry backoff.",
+    "http_cache_hits_total": "Responses served from an HTTP cache.",
+    "parse_seconds": "Time spent in HTML/feed parsers by stage.",
+    "normalize_seconds": "Time spent building TenderUnit/RawRecord from parsed rows.",
+    "stage_seconds": "Wall time of ingest stages (fetch, insert_raw, upsert_tenders, alerts, sync_from_raw, facets, attachments, dedup, labeling, tiering, export_fetch, export_write).",
+    "db_rows_total": "Rows affected by storage phases by result.",
+    "ingest_duration_seconds": "Wall time of the whole source ingest.",
+    "ingest_last_success_timestamp_seconds": "Unix time of the last successful ingest.",
+    "attachments_total": "Attachments processed by result (downloaded, unchanged, deduplicated, failed).",
+    "daemon_runs_total": "Scheduled daemon ingest runs by mode (full, poll) and result.",
+    "crawl_jobs_total": "Crawl queue jobs by result (enqueued, done, retried, expired).",
+    "alert_matches_total": "New saved-search alert matches written.",
+    "outbox_events_total": "Tender change events processed by outbox consumers.",
+    "tiering_rows_total": "Tenders moved between hot and archive tiers by direction.",
+    "export_rows_total": "Tender rows written to Parquet snapshot exports.",
+    "api_requests_total": "Read API requests by route and cache outcome (hit, miss, not_modified).",
+    "api_request_seconds": "Read API request latency by route.",
+}
+
+
+def _key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(key) + ([extra] if extra else [])
+    if not items:
+        return ""
+    esc = lambda v: v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')  # noqa: E731
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for i, b in enumerate(self.buckets):
+            if value <= b:
+                self.counts[i] += 1
+                break
+
+
+class MetricsRegistry:
+    """Thread-safe registr metrik jednoho procesu (jmenný prostor `vz_`)."""
+
+    def __init__(self, namespace: str = "vz", buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.namespace = namespace
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._hists: Dict[str, Dict[LabelKey, _Histogram]] = {}
+
+    # ------------------------------------------------------------ zápis
+    def inc(self, name: str, value: float = 1.0, **labels: object) -> None:
+        k = _key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[k] = series.get(k, 0.0) + value
+
+    def set(self, name: str, value: float, **labels: object) -> None:
+        with self._lock:
+            self._gauges.setdefault(name, {})[_key(labels)] = float(value)
+
+    def observe(self, name: str, value: float, **labels: object) -> None:
+        k = _key(labels)
+        with self._lock:
+            series = self._hists.setdefault(name, {})
+            h = series.get(k)
+            if h is None:
+                h = series[k] = _Histogram(self.buckets)
+            h.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: object) -> Iterator[None]:
+        """Změří dobu bloku do histogramu `name` (i když blok vyhodí výjimku)."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0, **labels)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._hists.clear()
+
+    # ------------------------------------------------------------ čtení
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Ploché hodnoty `name{labels}` → číslo (countery, gauge, u histogramů _sum a _count).
+        Hodí se pro rozdíl „po - před“ jednoho běhu.
+        """
+        out: Dict[str, float] = {}
+        with self._lock:
+            for name, series in self._counters.items():
+                for k, v in series.items():
+                    out[f"{name}{_fmt_labels(k)}"] = v
+            for name, series in self._gauges.items():
+                for k, v in series.items():
+                    out[f"{name}{_fmt_labels(k)}"] = v
+            for name, series in self._hists.items():
+                for k, h in series.items():
+                    out[f"{name}_sum{_fmt_labels(k)}"] = h.sum
+                    out[f"{name}_count{_fmt_labels(k)}"] = float(h.count)
+        return out
+
+    def render(self) -> str:
+        """Prometheus text exposition format (kompatibilní s node_exporter textfile collectorem)."""
+        lines: List[str] = []
+        ns = f"{self.namespace}_" if self.namespace else ""
+        with self._lock:
+            for kind, store in (("counter", self._counters), ("gauge", self._gauges)):
+                for name in sorted(store):
+                    full = ns + name
+                    lines.append(f"# HELP {full} {_HELP.get(name, '')}".rstrip())
+                    lines.append(f"# TYPE {full} {kind}")
+                    for k, v in sorted(store[name].items()):
+                        lines.append(f"{full}{_fmt_labels(k)} {_fmt_value(v)}")
+            for name in sorted(self._hists):
+                full = ns + name
+                lines.append(f"# HELP {full} {_HELP.get(name, '')}".rstrip())
+                lines.append(f"# TYPE {full} histogram")
+                for k, h in sorted(self._hists[name].items()):
+                    cumulative = 0
+                    for b, c in zip(h.buckets, h.counts):
+                        cumulative += c
+                        lines.append(f"{full}_bucket{_fmt_labels(k, ('le', _fmt_value(b)))} {cumulative}")
+                    lines.append(f"{full}_bucket{_fmt_labels(k, ('le', '+Inf'))} {h.count}")
+                    lines.append(f"{full}_sum{_fmt_labels(k)} {_fmt_value(h.sum)}")
+                    lines.append(f"{full}_count{_fmt_labels(k)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Path) -> Path:
+        """Atomicky zapíše metriky (tmp + rename), aby collector nikdy neviděl půlku souboru."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(self.render(), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+
+def delta(after: Dict[str, float], before: Dict[str, float]) -> Dict[str, float]:
+    """Rozdíl dvou snapshotů – metriky jednoho běhu i v procesu, který běží déle."""
+    out: Dict[str, float] = {}
+    for k, v in after.items():
+        d = v - before.get(k, 0.0)
+        if d:
+            out[k] = d
+    return out
+
+
+def _parse_key(key: str) -> Tuple[str, Dict[str, str]]:
+    base, _, rest = key.partition("{")
+    return base, dict(_LABEL_PAT.findall(rest))
+
+
+def total(snapshot: Dict[str, float], name: str, **labels: object) -> float:
+    """Součet série `name` ze snapshotu přes všechny labely kromě zadaných (ty musí sedět)."""
+    want = {k: str(v) for k, v in labels.items()}
+    s = 0.0
+    for key, v in snapshot.items():
+        base, lbl = _parse_key(key)
+        if base == name and all(lbl.get(k) == w for k, w in want.items()):
+            s += v
+    return s
+
+
+def by_label(snapshot: Dict[str, float], name: str, label: str, **labels: object) -> Dict[str, float]:
+    """Hodnoty série `name` rozpadlé podle jednoho labelu, např. stage_seconds_sum podle `stage`."""
+    want = {k: str(v) for k, v in labels.items()}
+    out: Dict[str, float] = {}
+    for key, v in snapshot.items():
+        base, lbl = _parse_key(key)
+        if base != name or label not in lbl or not all(lbl.get(k) == w for k, w in want.items()):
+            continue
+        out[lbl[label]] = out.get(lbl[label], 0.0) + v
+    return out
+
+
+# globální registr procesu (obdobně jako loguru `logger`)
+metrics = MetricsRegistry()
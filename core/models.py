@@ -34,6 +34,7 @@ class TenderUnit(BaseModel):
 
     # NOVÉ
     status: Optional[str] = None
+    status_norm: Optional[str] = None   # open | closed | awarded | completed | cancelled
     description: Optional[str] = None
     
 
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import re
+from datetime import date, datetime
 from decimal import Decimal, InvalidOperation
 from typing import Optional, Tuple
 
@@ -50,19 +51,46 @@ def normalize_money(value_text: Optional[str], currency_text: Optional[str]) ->
     return val, cur
 
 
+# --- datumy ------------------------------------------------------------
+
+_DATE_FORMATS = ("%d. %m. %Y %H:%M", "%d.%m.%Y %H:%M", "%d. %m. %Y", "%d.%m.%Y")
+
+def parse_date(text: Optional[str]) -> Optional[date]:
+    """ISO datum/čas ('2025-08-01', '2025-08-01T10:00:00+02:00') nebo český formát ('1. 8. 2025 10:00')."""
+    if not text:
+        return None
+    t = re.sub(r"\s+", " ", text.strip())
+    try:
+        return datetime.fromisoformat(t.replace("Z", "+00:00")).date()
+    except ValueError:
+        pass
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(t, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
 # --- status ------------------------------------------------------------
 
+# řízený slovník = hodnoty enumu tender_status v DB (sql/2026-10-08-status-norm.sql)
+STATUS_VALUES = ("open", "closed", "awarded", "completed", "cancelled")
+
 _STATUS_MAP = {
-    # NEN slovník → náš řízený slovník
-    # (zachovejme české labely, ale můžeme si držet i normalized)
-    "Neukončen": "open",
-    "Ukončení plnění": "completed",
-    "Zadané": "awarded",
-    "Zadán": "awarded",
-    "Zrušené": "cancelled",
-    "Zrušeno": "cancelled",
-    "Ukončen": "closed",
-    "Neukončeno": "open",
+    # NEN/VVZ slovník (lowercase) → náš řízený slovník
+    # (české labely zůstávají ve sloupci status; SQL zrcadlo: tender_status_from_label)
+    "neukončen": "open",
+    "neukončeno": "open",
+    "ukončení plnění": "completed",
+    "zadané": "awarded",
+    "zadán": "awarded",
+    "zadáno": "awarded",
+    "zrušené": "cancelled",
+    "zrušen": "cancelled",
+    "zrušeno": "cancelled",
+    "ukončen": "closed",
+    "ukončeno": "closed",
 }
 
 def normalize_status(raw: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
@@ -73,5 +101,5 @@ def normalize_status(raw: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
     if not raw:
         return None, None
     raw_clean = raw.strip()
-    norm = _STATUS_MAP.get(raw_clean)
+    norm = _STATUS_MAP.get(re.sub(r"\s+", " ", raw_clean).lower())
     return norm, raw_clean
@@ -0,0 +1,115 @@
+# core/outbox.py
+"""Konzumace outboxu změn zakázek (tender_events, sql/2026-10-13-outbox.sql).
+
+Trigger na tenders zapisuje v transakci upsertu kompaktní události (op I/U, změněné sloupce,
+u změn jejich nové hodnoty). Konzument (alerty, indexace, exporty) čte dávky za svým kurzorem
+v outbox_cursors a kurzor posune až po úspěšném zpracování dávky → at-least-once; handler
+má být idempotentní. Jeden proces na jméno konzumenta.
+
+    consumer = OutboxConsumer(storage, "search-index")
+    consumer.run(lambda events: index(events), until_empty=True)
+
+    python -m core.outbox status
+    python -m core.outbox prune --days 14
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from loguru import logger
+
+from core.metrics import metrics
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+ENV_PATH = PROJECT_ROOT / ".env"
+
+Cursor = Tuple[str, int]  # (txid jako text, id)
+Handler = Callable[[List[dict]], Any]
+
+
+class OutboxConsumer:
+    """Pojmenovaný čtenář tender_events s perzistentním kurzorem."""
+
+    def __init__(self, storage: Any, name: str, batch_size: int = 500) -> None:
+        self.storage = storage
+        self.name = name
+        self.batch_size = batch_size
+        self.stop = threading.Event()
+        self._cursor: Optional[Cursor] = None
+
+    @property
+    def cursor(self) -> Cursor:
+        if self._cursor is None:
+            self._cursor = self.storage.get_outbox_cursor(self.name)
+        return self._cursor
+
+    def poll(self) -> List[dict]:
+        """Další dávka za kurzorem (kurzor neposouvá)."""
+        return self.storage.read_tender_events(self.cursor, self.batch_size)
+
+    def commit(self, events: List[dict]) -> None:
+        """Potvrdí zpracování dávky – kurzor na její poslední událost."""
+        if not events:
+            return
+        last = events[-1]
+        self._cursor = (str(last["txid"]), int(last["id"]))
+        self.storage.save_outbox_cursor(self.name, self._cursor)
+        metrics.inc("outbox_events_total", len(events), consumer=self.name)
+
+    def run_batch(self, handler: Handler) -> int:
+        events = self.poll()
+        if events:
+            handler(events)  # výjimka = kurzor zůstane, dávka přijde znovu
+            self.commit(events)
+        return len(events)
+
+    def run(self, handler: Handler, until_empty: bool = False, idle_sleep: float = 5.0) -> int:
+        total = 0
+        while not self.stop.is_set():
+            n = self.run_batch(handler)
+            total += n
+            if n == self.batch_size:
+                continue
+            if until_empty:
+                break
+            self.stop.wait(idle_sleep)
+        logger.info(f"[outbox:{self.name}] processed {total} events")
+        return total
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from core.storage import DatabaseStorage
+
+    p = argparse.ArgumentParser(description="Outbox změn zakázek (tender_events)")
+    sub = p.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="konzumenti, kurzory a počet nepřečtených událostí")
+    pr = sub.add_parser("prune", help="smazat staré události přečtené všemi konzumenty")
+    pr.add_argument("--days", type=float, default=14.0)
+    args = p.parse_args(argv)
+
+    load_dotenv(ENV_PATH)
+    dsn = os.getenv("SUPABASE_DSN") or os.getenv("SUPABASE_DSN_POOLER")
+    if not dsn:
+        logger.error("SUPABASE_DSN environment variable not set")
+        return 2
+    storage = DatabaseStorage(dsn)
+    if args.command == "prune":
+        storage.prune_tender_events(args.days)
+        return 0
+    rows: List[Dict[str, Any]] = storage.outbox_status()
+    if not rows:
+        print("no outbox consumers")
+    for r in rows:
+        print(f"{r['consumer']:<24} cursor=({r['last_txid']}, {r['last_id']}) pending={r['pending']} "
+              f"updated_at={r['updated_at']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+# core/profiling.py
+"""Profilování ingestu: vzorkovací profiler (nízká režie, folded stacky pro flamegraph) nebo cProfile.
+
+Výstupy jdou do logs/ vedle běžných logů:
+  - profile-<ts>-sample.folded    … `a;b;c <počet>` (flamegraph.pl, speedscope, inferno)
+  - profile-<ts>-cprofile.pstats  … jen režim cprofile (snakeviz, flameprof)
+  - profile-<ts>-<mode>.txt       … top-N hot funkcí + čas podle adaptérů/storage
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from types import FrameType
+from typing import Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+# prefixy modulů, které chceme v souhrnu vidět zvlášť (adaptéry a storage)
+_FIRST_PARTY = ("adapters.", "core.")
+
+
+def _frame_label(frame: FrameType) -> str:
+    mod = frame.f_globals.get("__name__", "?")
+    return f"{mod}.{frame.f_code.co_qualname}"
+
+
+def _stack(frame: Optional[FrameType]) -> List[str]:
+    out: List[str] = []
+    while frame is not None:
+        out.append(_frame_label(frame))
+        frame = frame.f_back
+    out.reverse()
+    return out
+
+
+class SamplingProfiler:
+    """Vzorkuje stacky všech vláken z vedlejšího vlákna (sys._current_frames) každých `interval` s."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.stacks: Counter[Tuple[str, ...]] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _loop(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for tid, frame in sys._current_frames().items():
+                if tid == own:
+                    continue
+                self.stacks[tuple(_stack(frame))] += 1
+            self.samples += 1
+
+    # ------------------------------------------------------------ výstupy
+    def folded(self) -> str:
+        return "".join(f"{';'.join(st)} {n}\n" for st, n in self.stacks.most_common())
+
+    def summary(self, top: int = 30) -> str:
+        total = sum(self.stacks.values()) or 1
+        self_counts: Counter[str] = Counter()
+        incl_counts: Counter[str] = Counter()
+        for st, n in self.stacks.items():
+            if st:
+                self_counts[st[-1]] += n
+            for fn in set(st):
+                incl_counts[fn] += n
+        secs = lambda n: n * self.interval  # noqa: E731 – odhad času z počtu vzorků
+        lines = [f"Sampling profile: {self.samples} samples @ {self.interval * 1000:.1f} ms, {total} thread-stacks", ""]
+        lines.append(f"Top {top} by self time:")
+        for fn, n in self_counts.most_common(top):
+            lines.append(f"  {n / total:6.1%}  {secs(n):9.2f}s  {fn}")
+        lines.append("")
+        lines.append("Adapters / storage (inclusive):")
+        first_party = [(fn, n) for fn, n in incl_counts.items() if fn.startswith(_FIRST_PARTY)]
+        for fn, n in sorted(first_party, key=lambda x: -x[1])[:top]:
+            lines.append(f"  {n / total:6.1%}  {secs(n):9.2f}s  {fn}")
+        return "\n".join(lines) + "\n"
+
+
+class _ThreadProfiles:
+    """cProfile pro hlavní i nová vlákna (zdroje běží paralelně v ThreadPoolExecutor).
+
+    Do Pythonu 3.11 Profile.enable() instrumentuje jen volající vlákno → každé nové vlákno
+    si přes threading.setprofile založí vlastní Profile a na konci se statistiky sloučí.
+    Od 3.12 běží cProfile nad sys.monitoring a jeden profil pokrývá všechna vlákna.
+    """
+
+    def __init__(self) -> None:
+        self.main = cProfile.Profile()
+        self.threads: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._per_thread = sys.version_info < (3, 12)
+
+    def _hook(self, frame: FrameType, event: str, arg: object) -> None:
+        prof = cProfile.Profile()
+        with self._lock:
+            self.threads.append(prof)
+        prof.enable()  # nahradí tento hook profilerem vlákna
+
+    def enable(self) -> None:
+        if self._per_thread:
+            threading.setprofile(self._hook)
+        self.main.enable()
+
+    def disable(self) -> pstats.Stats:
+        self.main.disable()
+        if self._per_thread:
+            threading.setprofile(None)
+        stats = pstats.Stats(self.main)
+        with self._lock:
+            for prof in self.threads:
+                prof.create_stats()
+                stats.add(prof)
+        return stats
+
+
+def _cprofile_summary(stats: pstats.Stats, top: int) -> str:
+    buf = io.StringIO()
+    stats.stream = buf
+    st = stats.strip_dirs()
+    buf.write(f"Top {top} by cumulative time:\n")
+    st.sort_stats("cumulative").print_stats(top)
+    buf.write(f"\nTop {top} by self time:\n")
+    st.sort_stats("tottime").print_stats(top)
+    buf.write("\nAdapters / storage:\n")
+    st.sort_stats("cumulative").print_stats(r"adapters|storage|fetcher", top)
+    return buf.getvalue()
+
+
+@contextmanager
+def profiled(mode: str, out_dir: Path, top: int = 30, interval: float = 0.005) -> Iterator[None]:
+    """
+    Obalí blok profilerem a po jeho skončení (i při výjimce/SystemExit) zapíše výstupy do `out_dir`.
+    mode: 'sample' (vzorkovací, nízká režie) nebo 'cprofile' (deterministický, přesné počty volání).
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stem = out_dir / f"profile-{datetime.now():%Y%m%d-%H%M%S}-{mode}"
+    t0 = time.perf_counter()
+
+    if mode == "cprofile":
+        prof = _ThreadProfiles()
+        prof.enable()
+        try:
+            yield
+        finally:
+            stats = prof.disable()
+            stats.dump_stats(f"{stem}.pstats")  # před strip_dirs v souhrnu – plné cesty pro snakeviz
+            Path(f"{stem}.txt").write_text(_cprofile_summary(stats, top), encoding="utf-8")
+            logger.info(f"[profile] cProfile {time.perf_counter() - t0:.1f}s ({len(prof.threads)} worker threads) "
+                        f"→ {stem}.pstats, {stem}.txt")
+        return
+
+    if mode != "sample":
+        raise ValueError(f"unknown profile mode: {mode!r}")
+    sampler = SamplingProfiler(interval=interval)
+    sampler.start()
+    try:
+        yield
+    finally:
+        sampler.stop()
+        Path(f"{stem}.folded").write_text(sampler.folded(), encoding="utf-8")
+        Path(f"{stem}.txt").write_text(sampler.summary(top), encoding="utf-8")
+        logger.info(f"[profile] {sampler.samples} samples in {time.perf_counter() - t0:.1f}s → "
+                    f"{stem}.folded, {stem}.txt")
+
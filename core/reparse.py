@@ -0,0 +1,174 @@
+# core/reparse.py
+"""Reparse z archivu: přežene aktuální parsery přes archivované HTML a výsledky hromadně zapíše do DB.
+
+    python -m core.reparse --source nen --since 2026-09-01 --until 2026-10-01 --workers 8
+
+Žádné HTTP – seznamy i detaily se čtou z archivu (core.archive). Pro každou zakázku se použije
+nejnovější archivovaný řádek seznamu a nejnovější detail (podle notice_url) v daném intervalu.
+Parsování běží v ProcessPoolu (BeautifulSoup je CPU-bound), zápis v dávkách v hlavním procesu.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import yaml
+from dotenv import load_dotenv
+from loguru import logger
+
+from adapters.registry import create_adapter
+from core.archive import iter_index, read_entry
+from core.models import RawRecord, TenderUnit
+from core.storage import DatabaseStorage
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+ENV_PATH = PROJECT_ROOT / ".env"
+CONFIG_PATH = PROJECT_ROOT / "config" / "sources.yaml"
+
+Loc = Tuple[str, int, int]  # (segment, offset, length)
+
+# adaptér v každém worker procesu (vytvoří ho _init_worker)
+_adapter: Any = None
+
+
+def archive_dir(config: Dict[str, Any]) -> Path:
+    return PROJECT_ROOT / ((config.get("archive") or {}).get("dir") or "data/archive")
+
+
+def _init_worker(key: str, cfg: Dict[str, Any]) -> None:
+    global _adapter
+    _adapter = create_adapter(key, cfg)
+
+
+def _parse_lists(locs: List[Loc]) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """Worker: rozparsuje archivované stránky seznamu → [(fetched_at, rows)]."""
+    out = []
+    for loc in locs:
+        head, html = read_entry(*loc)
+        out.append((head["fetched_at"], _adapter.parse_tender_list(html)))
+    return out
+
+
+def _build(tasks: List[Tuple[Dict[str, Any], Optional[Loc]]]) -> Tuple[List[RawRecord], List[TenderUnit], int]:
+    """Worker: (řádek seznamu, umístění detailu) → RawRecord + TenderUnit aktuálními parsery."""
+    raws: List[RawRecord] = []
+    units: List[TenderUnit] = []
+    errors = 0
+    for row, loc in tasks:
+        detail: Dict[str, Any] = {}
+        if loc is not None:
+            try:
+                detail = _adapter.parse_tender_detail(read_entry(*loc)[1])
+            except Exception:
+                errors += 1
+        raw, unit = _adapter.build_records(row, detail)
+        raws.append(raw)
+        units.append(unit)
+    return raws, units, errors
+
+
+def _chunks(items: List[Any], size: int) -> Iterator[List[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def reparse(key: str, cfg: Dict[str, Any], root: Path, storage: Optional[DatabaseStorage],
+            since: Optional[datetime] = None, until: Optional[datetime] = None,
+            workers: int = 0, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Reparse jednoho zdroje z archivu. `storage=None` = dry run (jen parsování a počty).
+    Adaptér musí mít parse_tender_list / parse_tender_detail / build_records (NEN).
+    """
+    adapter = create_adapter(key, cfg)
+    src = adapter.source_id
+    for attr in ("parse_tender_list", "parse_tender_detail", "build_records"):
+        if not hasattr(adapter, attr):
+            raise TypeError(f"adapter {type(adapter).__name__} does not support reparse (missing {attr})")
+
+    t0 = time.perf_counter()
+    lists: List[Loc] = []
+    details: Dict[str, Loc] = {}  # notice_url → nejnovější detail
+    for e in iter_index(root, src, since=since, until=until):
+        if e.status >= 400:
+            continue
+        if e.kind == "list":
+            lists.append((e.segment, e.offset, e.length))
+        elif e.kind == "detail":
+            details[e.url] = (e.segment, e.offset, e.length)
+    logger.info(f"[reparse] {src}: {len(lists)} list pages, {len(details)} details in archive")
+
+    stats = {"list_pages": len(lists), "details": len(details), "tenders": 0, "detail_errors": 0,
+             "raw_inserted": 0, "tenders_new": 0, "tenders_updated": 0, "synced_from_raw": 0}
+    workers = workers or os.cpu_count() or 2
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(key, cfg)) as pool:
+        # 1) seznamy → nejnovější řádek pro každou zakázku
+        rows: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        for parsed in pool.map(_parse_lists, _chunks(lists, 20)):
+            for fetched_at, page_rows in parsed:
+                for r in page_rows:
+                    ext = str(r.get("external_id") or r.get("notice_url") or "")
+                    if ext and (ext not in rows or rows[ext][0] <= fetched_at):
+                        rows[ext] = (fetched_at, r)
+
+        # 2) detaily + build_records po dávkách, zápis průběžně
+        tasks = [(r, details.get(r.get("notice_url") or "")) for _, r in rows.values()]
+        for raws, units, errors in pool.map(_build, _chunks(tasks, batch_size)):
+            stats["tenders"] += len(units)
+            stats["detail_errors"] += errors
+            if storage is not None:
+                stats["raw_inserted"] += storage.insert_raw_batch(raws)
+                n_new, n_upd = storage.upsert_tenders(units)
+                stats["tenders_new"] += n_new
+                stats["tenders_updated"] += n_upd
+
+    if storage is not None:
+        stats["synced_from_raw"] = storage.sync_tenders_from_raw(src)
+    logger.info(f"[reparse] {src} done in {time.perf_counter() - t0:.1f}s: {stats}")
+    return stats
+
+
+def _parse_day(text: str) -> datetime:
+    dt = datetime.fromisoformat(text)
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Reparse archivovaného HTML aktuálními parsery (bez HTTP)")
+    p.add_argument("--source", default="nen", help="klíč zdroje v sources.yaml (default nen)")
+    p.add_argument("--config", type=Path, default=CONFIG_PATH)
+    p.add_argument("--since", type=_parse_day, default=None, help="od (ISO datum/čas, UTC)")
+    p.add_argument("--until", type=_parse_day, default=None, help="do (exkluzivně)")
+    p.add_argument("--workers", type=int, default=0, help="počet procesů (default = počet CPU)")
+    p.add_argument("--batch-size", type=int, default=500)
+    p.add_argument("--dry-run", action="store_true", help="jen parsovat, nic nezapisovat")
+    args = p.parse_args(argv)
+
+    with open(args.config, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+    cfg = (config.get("sources") or {}).get(args.source)
+    if cfg is None:
+        logger.error(f"Unknown source {args.source!r}")
+        return 2
+
+    storage = None
+    if not args.dry_run:
+        load_dotenv(ENV_PATH)
+        dsn = os.getenv("SUPABASE_DSN") or os.getenv("SUPABASE_DSN_POOLER")
+        if not dsn:
+            logger.error("SUPABASE_DSN environment variable not set")
+            return 2
+        storage = DatabaseStorage(dsn)
+
+    reparse(args.source, cfg, archive_dir(config), storage, since=args.since, until=args.until,
+            workers=args.workers, batch_size=args.batch_size)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,33 +2,52 @@
 """Hlavní runner pro spuštění datového ingestu."""
 from __future__ import annotations
 
+import argparse
 import os
+import socket
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
 import yaml
 from loguru import logger
 from dotenv import load_dotenv
 
-from core.storage import DatabaseStorage
-from adapters.nen import NENAdapter
+from core.alerts import AlertMatcher
+from core.archive import ArchiveWriter
+from core.attachments import AttachmentPipeline
+from core.dedup import DedupEngine
+from core.labeler import Labeler
+from core.metrics import metrics, by_label as metrics_by_label, delta as metrics_delta, total as metrics_total
+from core.profiling import profiled
+from core.storage import DatabaseStorage, FingerprintSnapshot
+from adapters.registry import create_adapter
 
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 ENV_PATH = PROJECT_ROOT / ".env"
+METRICS_PATH = PROJECT_ROOT / "logs" / "metrics.prom"
+CONFIG_PATH = PROJECT_ROOT / "config" / "sources.yaml"
 
 
 class TenderRunner:
     """Orchestrátor pro spuštění tender ingestu."""
 
-    def __init__(self) -> None:
+    def __init__(self, config_path: Optional[Path] = None) -> None:
+        self.config_path = Path(config_path) if config_path else CONFIG_PATH
         self._prepare_fs()
         self._load_env()
         self._setup_logging()
         self.config = self._load_config()
         self.storage = self._init_storage()
+        self._alerts: Optional[AlertMatcher] = None
+        self._alerts_lock = threading.Lock()
+        self._tiered_at: Optional[float] = None  # time.monotonic() posledního tieringu
+        # source_id → (snapshot otisků, time.monotonic() načtení); sdílený mezi běhy (daemon polly)
+        self._snapshots: Dict[str, Tuple[FingerprintSnapshot, float]] = {}
 
     # --------------------------------------------------------------------- utils
     def _prepare_fs(self) -> None:
@@ -59,18 +78,31 @@ class TenderRunner:
         )
         logger.info(f"[env] file: {ENV_PATH} | SUPABASE_DSN set: {'yes' if os.getenv('SUPABASE_DSN') else 'no'}")
 
+    def _read_config(self) -> Dict[str, Any]:
+        with open(self.config_path, "r", encoding="utf-8") as f:
+            return yaml.safe_load(f) or {}
+
     def _load_config(self) -> Dict[str, Any]:
         """Načte konfiguraci ze sources.yaml."""
-        config_path = PROJECT_ROOT / "config" / "sources.yaml"
+        config_path = self.config_path
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                cfg = yaml.safe_load(f) or {}
+            cfg = self._read_config()
             logger.info(f"Configuration loaded from {config_path}")
             return cfg
         except Exception as e:
             logger.exception(f"Failed to load config from {config_path}: {type(e).__name__}: {e}")
             sys.exit(1)
 
+    def reload_config(self) -> bool:
+        """Znovu načte sources.yaml (daemon); při chybě ponechá dosavadní konfiguraci."""
+        try:
+            self.config = self._read_config()
+        except Exception as e:
+            logger.error(f"Config reload from {self.config_path} failed, keeping previous: {type(e).__name__}: {e}")
+            return False
+        logger.info(f"Configuration reloaded from {self.config_path}")
+        return True
+
     def _init_storage(self) -> DatabaseStorage:
         """Inicializuje databázové připojení."""
         dsn = os.getenv("SUPABASE_DSN") or os.getenv("SUPABASE_DSN_POOLER")
@@ -90,73 +122,358 @@ class TenderRunner:
             sys.exit(1)
 
     # -------------------------------------------------------------- single source
-    def run_nen_ingest(self) -> bool:
-        """Spustí NEN ingest. Při chybě zaloguje stacktrace a vrátí False."""
-        logger.info("=== Starting NEN ingest ===")
+    def _sources(self) -> Dict[str, Dict[str, Any]]:
+        return self.config.get("sources") or {}
+
+    def run_source(self, key: str, cfg: Dict[str, Any], adapter: Optional[Any] = None, mode: str = "full") -> bool:
+        """
+        Spustí ingest jednoho zdroje (fetch → raw → tenders → sync).
+        Každý zdroj má vlastní adaptér (fetcher, rate limit) i vlastní DatabaseStorage;
+        daemon předává svůj "teplý" adaptér a sdílí storage s poolem spojení; `mode` (full | poll)
+        se zapíše do ingest_runs, aby regresní report porovnával jen běhy stejného režimu.
+        Při chybě zaloguje stacktrace a vrátí False.
+        """
+        name = key.upper()
+        logger.info(f"=== Starting {name} ingest ===")
         start = time.time()
+        before = metrics.snapshot()
+        run_id: Optional[int] = None
+        src = name
+        archive: Optional[ArchiveWriter] = None
 
         try:
-            nen_cfg = (self.config.get("sources") or {}).get("nen", {})
-            if not nen_cfg.get("enabled", False):
-                logger.warning("NEN source is disabled in config")
-                return True  # není to chyba, jen vypnuto
+            if adapter is None:
+                adapter = create_adapter(key, cfg)
+            storage = self.storage if getattr(self.storage, "pool", None) is not None else DatabaseStorage(self.storage.dsn)
+            src = adapter.source_id
+            archive = self._open_archive(adapter)
+            run_id = self._ledger_start(src, cfg, mode)
+            raw_inserted = tenders_new = tenders_updated = units = 0
+            fetch_stats: Dict[str, int] = {}
+            errors: List[str] = []
+            att_cfg = cfg.get("attachments") or {}
+            fetch_attachments = bool(att_cfg.get("enabled"))
+            if fetch_attachments and getattr(adapter, "fetcher", None) is None:
+                logger.warning(f"[{src}] attachments enabled but adapter has no fetcher – skipping attachments")
+                fetch_attachments = False
+            with_attachments: List[Any] = []
+            alerts = self._alert_matcher()
+            snapshot = self._fingerprints(storage, src)
 
-            adapter = NENAdapter(config=nen_cfg)
-            result = adapter.fetch_tenders()
+            # adaptér vydává dávky (NEN jednu, bulk feedy po batch_size) → zápis po dávkách
+            chunks = adapter.iter_results()
+            while True:
+                with metrics.timer("stage_seconds", source=src, stage="fetch"):
+                    result = next(chunks, None)
+                if result is None:
+                    break
+                units += len(result.tender_units)
+                errors.extend(result.errors)
+                for k, v in result.stats.items():
+                    fetch_stats[k] = fetch_stats.get(k, 0) + v
 
-            # RAW: vlož/verzuj
-            raw_inserted = self.storage.insert_raw_batch(result.raw_records)
+                # RAW: vlož/verzuj
+                with metrics.timer("stage_seconds", source=src, stage="insert_raw"):
+                    raw_inserted += storage.insert_raw_batch(result.raw_records, snapshot=snapshot)
 
-            # TENDERS: upsert všech (kvůli UPDATE existujících)
-            tenders_new, tenders_updated = self.storage.upsert_tenders(result.tender_units)
+                # TENDERS: upsert všech (kvůli UPDATE existujících)
+                # nové/změněné jednotky dávky – pro hlídací psy a přílohy (nezměněné už zpracované jsou)
+                changed: Optional[List[Any]] = [] if alerts or fetch_attachments else None
+                with metrics.timer("stage_seconds", source=src, stage="upsert_tenders"):
+                    n_new, n_upd = storage.upsert_tenders(result.tender_units, changed=changed, snapshot=snapshot)
+                tenders_new += n_new
+                tenders_updated += n_upd
+
+                # hlídací psi: nové/změněné zakázky dávky proti všem uloženým hledáním najednou
+                if alerts and changed:
+                    with metrics.timer("stage_seconds", source=src, stage="alerts"):
+                        self._match_alerts(alerts, changed)
+                if fetch_attachments and changed:
+                    with_attachments.extend(u for u in changed if u.attachments)
 
             # Doplň chybějící hodnoty z raw → tenders (jen NULL pole)
-            synced = self.storage.sync_tenders_from_raw()
+            with metrics.timer("stage_seconds", source=src, stage="sync_from_raw"):
+                synced = storage.sync_tenders_from_raw(src)
+                storage.fill_cpv_prefixes(src)
+                storage.fill_budget_czk(src)
+
+            # Facety: přičíst rozdíly za řádky změněné v tomto běhu
+            with metrics.timer("stage_seconds", source=src, stage="facets"):
+                self._refresh_facets(storage, src)
+
+            # Přílohy: stáhnout do content-addressed úložiště (přes rate limiter adaptéru)
+            att_stats: Dict[str, int] = {}
+            if with_attachments:
+                pipeline = AttachmentPipeline(
+                    adapter.fetcher, storage,
+                    root=PROJECT_ROOT / att_cfg.get("dir", "data/attachments"),
+                    concurrency=int(att_cfg.get("concurrency", 4)),
+                )
+                with metrics.timer("stage_seconds", source=src, stage="attachments"):
+                    att_stats = pipeline.run(with_attachments)
+
+            metrics.inc("db_rows_total", raw_inserted, source=src, op="insert_raw", result="inserted")
+            metrics.inc("db_rows_total", tenders_new, source=src, op="upsert_tenders", result="inserted")
+            metrics.inc("db_rows_total", tenders_updated, source=src, op="upsert_tenders", result="updated")
+            metrics.inc("db_rows_total", synced, source=src, op="sync_from_raw", result="updated")
+            if snapshot is not None:
+                metrics.inc("db_rows_total", snapshot.skipped_raw, source=src, op="insert_raw", result="unchanged")
+                metrics.inc("db_rows_total", snapshot.skipped_tenders, source=src, op="upsert_tenders",
+                            result="unchanged")
 
-            if result.errors:
+            if errors:
                 logger.warning(
-                    f"NEN scraping reported {len(result.errors)} minor errors (first 3 shown): {result.errors[:3]}"
+                    f"{name} scraping reported {len(errors)} minor errors (first 3 shown): {errors[:3]}"
                 )
 
             duration = time.time() - start
             stats = {
                 "duration_seconds": round(duration, 2),
-                "pages_scraped": result.stats.get("pages_scraped", 0),
-                "details_fetched": result.stats.get("details_fetched", 0),
+                "pages_scraped": fetch_stats.get("pages_scraped", 0),
+                "details_fetched": fetch_stats.get("details_fetched", 0),
                 "raw_inserted": raw_inserted,
                 "tenders_new": tenders_new,
                 "tenders_updated": tenders_updated,
                 "synced_from_raw": synced,
-                "tenders_skipped": max(0, len(result.tender_units) - (tenders_new + tenders_updated)),
-                "errors": len(result.errors),
+                "tenders_skipped": max(0, units - (tenders_new + tenders_updated)),
+                "tenders_unchanged_local": snapshot.skipped_tenders if snapshot is not None else 0,
+                "rows_known": fetch_stats.get("rows_known", 0),
+                "errors": len(errors),
+                **att_stats,
             }
-            logger.info("=== NEN ingest completed ===")
-            logger.info(f"Stats: {stats}")
+            run_metrics = metrics_delta(metrics.snapshot(), before)
+            stages = self._stage_seconds(run_metrics, src)
+            fetch_s = stages.get("fetch") or 0.0
+            stats.update({
+                "http_requests": int(metrics_total(run_metrics, "http_requests_total", source=src)),
+                "http_retries": int(metrics_total(run_metrics, "http_retries_total", source=src)),
+                "http_bytes": int(metrics_total(run_metrics, "http_bytes_total", source=src)),
+                "details_per_sec": round(stats["details_fetched"] / fetch_s, 3) if fetch_s else None,
+            })
+            self._ledger_finish(run_id, "ok", stats, stages)
+            metrics.observe("ingest_duration_seconds", duration, source=src)
+            metrics.set("ingest_last_success_timestamp_seconds", time.time(), source=src)
+            logger.info(f"=== {name} ingest completed ===")
+            logger.info(f"Stats: {stats} | stages: {stages}")
             return True
 
         except Exception as e:
             duration = time.time() - start
-            logger.exception(f"NEN ingest failed after {duration:.2f}s: {type(e).__name__}: {e}")
+            logger.exception(f"{name} ingest failed after {duration:.2f}s: {type(e).__name__}: {e}")
+            self._snapshots.pop(src, None)  # po chybě nevěřit snapshotu – příští běh ho načte znovu
+            stages = self._stage_seconds(metrics_delta(metrics.snapshot(), before), src)
+            self._ledger_finish(run_id, "failed", {"duration_seconds": round(duration, 2)}, stages,
+                                error_message=f"{type(e).__name__}: {e}")
             return False
+        finally:
+            if archive is not None:
+                archive.close()
+                logger.info(f"{name}: archived {archive.records} pages to {archive.dir}")
+
+    @staticmethod
+    def _refresh_facets(storage: DatabaseStorage, source_id: str) -> None:
+        """Facety jsou odvozená data – chyba refreshe ingest neshodí (watermark zůstane, dožene se příštím během)."""
+        try:
+            storage.refresh_source_facets(source_id)
+        except Exception as e:
+            logger.warning(f"Facet refresh for {source_id} failed: {type(e).__name__}: {e}")
+
+    def _alert_matcher(self) -> Optional[AlertMatcher]:
+        """Sdílený matcher (config `alerts.enabled`); index se přestaví jen při změně odběrů."""
+        if not (self.config.get("alerts") or {}).get("enabled"):
+            return None
+        with self._alerts_lock:
+            if self._alerts is None:
+                self._alerts = AlertMatcher(self.storage)
+            return self._alerts
+
+    @staticmethod
+    def _match_alerts(alerts: AlertMatcher, units: List[Any]) -> None:
+        """Alerty jsou odvozená data – chyba párování ingest neshodí."""
+        try:
+            alerts.process(units)
+        except Exception as e:
+            logger.warning(f"Alert matching failed: {type(e).__name__}: {e}")
+
+    def _open_archive(self, adapter: Any) -> Optional[ArchiveWriter]:
+        """Zapne archivaci stažených stránek (config `archive.enabled`) pro adaptéry s HTTP fetcherem."""
+        arch_cfg = self.config.get("archive") or {}
+        fetcher = getattr(adapter, "fetcher", None)
+        if not arch_cfg.get("enabled") or fetcher is None:
+            return None
+        fetcher.archive = ArchiveWriter(
+            PROJECT_ROOT / arch_cfg.get("dir", "data/archive"),
+            adapter.source_id,
+            max_segment_mb=int(arch_cfg.get("max_segment_mb", 256)),
+        )
+        return fetcher.archive
+
+    def run_nen_ingest(self) -> bool:
+        """Spustí NEN ingest (zachováno kvůli zpětné kompatibilitě)."""
+        nen_cfg = self._sources().get("nen", {})
+        if not nen_cfg.get("enabled", False):
+            logger.warning("NEN source is disabled in config")
+            return True  # není to chyba, jen vypnuto
+        return self.run_source("nen", nen_cfg)
+
+    def _run_dedup(self) -> None:
+        """Po ingestu všech zdrojů přiřadí nové/změněné zakázky do dedup clusterů (napříč zdroji)."""
+        dd_cfg = self.config.get("dedup") or {}
+        if not dd_cfg.get("enabled"):
+            return
+        engine = DedupEngine(
+            self.storage,
+            threshold=float(dd_cfg.get("threshold", 0.8)),
+            max_deadline_days=int(dd_cfg.get("max_deadline_days", 14)),
+        )
+        try:
+            with metrics.timer("stage_seconds", source="ALL", stage="dedup"):
+                engine.run()
+        except Exception as e:
+            logger.warning(f"Dedup failed: {type(e).__name__}: {e}")
+
+    def _fingerprints(self, storage: DatabaseStorage, source_id: str) -> Optional[FingerprintSnapshot]:
+        """Snapshot uložených otisků zdroje (config `fingerprints:`); chyba = zápis bez přeskakování.
+
+        Načtení = sken zakázek i raw_data zdroje, proto se snapshot drží mezi běhy (zápisy ho
+        udržují aktuální) a znovu načítá až po `fingerprints.max_age` s – dožene zápisy jiných
+        procesů (worker, reparse).
+        """
+        fp_cfg = self.config.get("fingerprints") or {}
+        if not fp_cfg.get("enabled"):
+            return None
+        now = time.monotonic()
+        cached = self._snapshots.get(source_id)
+        if cached is not None and now - cached[1] < float(fp_cfg.get("max_age", 86400)):
+            snap = cached[0]
+        else:
+            try:
+                snap = storage.load_fingerprints(source_id)
+            except Exception as e:
+                logger.warning(f"Fingerprint snapshot failed, writing all rows: {type(e).__name__}: {e}")
+                return None
+            self._snapshots[source_id] = (snap, now)
+        snap.skipped_raw = snap.skipped_tenders = 0  # počty za tento běh
+        return snap
+
+    def _run_labeling(self) -> None:
+        """Doštítkuje nové/změněné zakázky kategoriemi z config/labels.yaml (core/labeler.py)."""
+        lb_cfg = self.config.get("labeling") or {}
+        if not lb_cfg.get("enabled"):
+            return
+        try:
+            with metrics.timer("stage_seconds", source="ALL", stage="labeling"):
+                Labeler(self.storage, batch_size=int(lb_cfg.get("batch_size", 2000))).run(
+                    limit=lb_cfg.get("max_per_run"))
+        except Exception as e:
+            logger.warning(f"Labeling failed: {type(e).__name__}: {e}")
+
+    def _run_tiering(self) -> None:
+        """Přesune uzavřené/prošlé zakázky do tenders_archive (nejvýš jednou za tiering.interval)."""
+        tr_cfg = self.config.get("tiering") or {}
+        if not tr_cfg.get("enabled"):
+            return
+        now = time.monotonic()
+        if self._tiered_at is not None and now - self._tiered_at < float(tr_cfg.get("interval", 3600)):
+            return
+        self._tiered_at = now
+        try:
+            with metrics.timer("stage_seconds", source="ALL", stage="tiering"):
+                archived, restored = self.storage.tier_tenders(
+                    grace_days=int(tr_cfg.get("grace_days", 30)),
+                    batch_size=int(tr_cfg.get("batch_size", 5000)))
+            metrics.inc("tiering_rows_total", archived, direction="archived")
+            metrics.inc("tiering_rows_total", restored, direction="restored")
+        except Exception as e:
+            logger.warning(f"Tiering failed: {type(e).__name__}: {e}")
+
+    # -------------------------------------------------------------- run ledger
+    def _ledger_start(self, source_id: str, source_cfg: Dict[str, Any], mode: str = "full") -> Optional[int]:
+        """Zapíše začátek běhu do ingest_runs. Chyba ledgeru nesmí shodit ingest."""
+        try:
+            return self.storage.start_ingest_run(source_id, source_cfg, host=socket.gethostname(), mode=mode)
+        except Exception as e:
+            logger.warning(f"Failed to record ingest run start: {type(e).__name__}: {e}")
+            return None
+
+    def _ledger_finish(self, run_id: Optional[int], status: str, stats: Dict[str, Any],
+                       stages: Dict[str, float], error_message: Optional[str] = None) -> None:
+        if run_id is None:
+            return
+        try:
+            self.storage.finish_ingest_run(run_id, status, stats, stages, error_message=error_message)
+        except Exception as e:
+            logger.warning(f"Failed to record ingest run {run_id} end: {type(e).__name__}: {e}")
+
+    @staticmethod
+    def _stage_seconds(run_metrics: Dict[str, float], source_id: str) -> Dict[str, float]:
+        sums = metrics_by_label(run_metrics, "stage_seconds_sum", "stage", source=source_id)
+        return {k: round(v, 3) for k, v in sums.items()}
+
+    def _write_metrics(self) -> None:
+        """Zapíše metriky běhu do Prometheus textfile (cesta z METRICS_TEXTFILE, default logs/metrics.prom)."""
+        path = Path(os.getenv("METRICS_TEXTFILE") or METRICS_PATH)
+        try:
+            metrics.write_textfile(path)
+            logger.info(f"Metrics written to {path}")
+        except Exception as e:
+            logger.warning(f"Failed to write metrics to {path}: {type(e).__name__}: {e}")
 
     # --------------------------------------------------------------------- runner
-    def run(self) -> None:
-        """Hlavní metoda - spustí všechny enabled zdroje."""
+    def run(self) -> bool:
+        """Hlavní metoda - spustí všechny enabled zdroje (paralelně). Vrací True, pokud vše doběhlo."""
         logger.info("=== Tender Aggregator Runner Started ===")
-        ok = True
+        enabled = {k: v for k, v in self._sources().items() if (v or {}).get("enabled", False)}
+        for key in self._sources():
+            if key not in enabled:
+                logger.warning(f"{key.upper()} source is disabled in config")
 
-        ok = self.run_nen_ingest() and ok
+        ok = True
+        if len(enabled) == 1:
+            (key, cfg), = enabled.items()
+            ok = self.run_source(key, cfg)
+        elif enabled:
+            # každý zdroj ve vlastním vlákně; pomalý/padající zdroj nebrzdí ostatní
+            workers = int(self.config.get("max_parallel_sources") or len(enabled))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="source") as pool:
+                futures = {pool.submit(self.run_source, k, c): k for k, c in enabled.items()}
+                for fut in as_completed(futures):
+                    ok = fut.result() and ok
+        if enabled:
+            self._run_dedup()
+            self._run_labeling()
+            self._run_tiering()
+        self._write_metrics()
 
         if ok:
             logger.info("=== All ingests completed successfully ===")
-            sys.exit(0)
         else:
             logger.error("=== Some ingests failed ===")
-            sys.exit(1)
+        return ok
 
 
 def main() -> None:
-    TenderRunner().run()
+    p = argparse.ArgumentParser(description="Tender aggregator runner")
+    p.add_argument("--config", type=Path, default=None,
+                   help="alternativní sources.yaml (např. base_url na lokální stand-in / replay)")
+    p.add_argument("--profile", nargs="?", const="sample", choices=("sample", "cprofile"),
+                   help="profilovat běh; výstupy do logs/ (default režim: sample)")
+    p.add_argument("--profile-interval", type=float, default=0.005, help="perioda vzorkování v sekundách")
+    p.add_argument("--profile-top", type=int, default=30, help="počet funkcí v souhrnu")
+    p.add_argument("--daemon", action="store_true",
+                   help="běžet trvale: plánovač s intervaly per zdroj (config `daemon:` a `schedule:` zdrojů)")
+    args = p.parse_args()
+
+    runner = TenderRunner(config_path=args.config)
+    if args.daemon:
+        from core.daemon import IngestDaemon
+        sys.exit(IngestDaemon(runner).run())
+    if args.profile:
+        with profiled(args.profile, PROJECT_ROOT / "logs", top=args.profile_top, interval=args.profile_interval):
+            ok = runner.run()
+    else:
+        ok = runner.run()
+    sys.exit(0 if ok else 1)
 
 
 if __name__ == "__main__":
@@ -4,13 +4,16 @@ from __future__ import annotations
 
 import hashlib
 import json
-from typing import List, Tuple, Any
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import psycopg
 from psycopg.rows import dict_row
 from psycopg.types.json import Json
 from loguru import logger
 
+from core.cpv import cpv_prefixes
+from core.fx import rates as fx_rates, to_czk
 from core.models import RawRecord, TenderUnit
 
 
@@ -39,22 +42,107 @@ def _get_cell(row: Any, key_or_idx: Any) -> Any:
         return None
 
 
+# obsah zakázky, který upsert_tenders porovnává (bez odvozených cpv_prefixes/budget_czk)
+_FP_FIELDS = ("hash_id", "title", "buyer", "cpv", "country", "region", "procedure_type", "budget_value",
+              "currency", "deadline", "notice_url", "attachments", "status", "status_norm", "description")
+
+
+def _tender_fp(t: TenderUnit) -> str:
+    """Otisk obsahu zakázky (sloupec content_fp) – 16 hex znaků sha1 kanonického JSON."""
+    data = json.dumps([getattr(t, f) for f in _FP_FIELDS], ensure_ascii=False, sort_keys=True,
+                      separators=(",", ":"), default=str)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()[:16]
+
+
+class FingerprintSnapshot:
+    """Uložené otisky jednoho zdroje: external_id → content_fp zakázky a hash posledního payloadu.
+
+    Načítá se jednou (DatabaseStorage.load_fingerprints) a runner ho drží mezi běhy zdroje;
+    zápisy ho po commitu aktualizují. Platí jen pro jediného zapisovatele zdroje – souběžný zápis jiného procesu by
+    snapshot nepoznal a shodný řádek by se mylně přeskočil. Hodnoty drží jako 8B digest (paměť).
+    """
+
+    def __init__(self, source_id: str) -> None:
+        self.source_id = source_id
+        self.tenders: Dict[str, bytes] = {}
+        self.raw: Dict[str, bytes] = {}
+        self.skipped_raw = 0
+        self.skipped_tenders = 0
+
+    @staticmethod
+    def digest(hex_hash: str) -> bytes:
+        return bytes.fromhex(hex_hash[:16])
+
+    def raw_unchanged(self, source_id: str, external_id: str, payload_hash: str) -> bool:
+        return source_id == self.source_id and self.raw.get(external_id) == self.digest(payload_hash)
+
+    def tender_unchanged(self, source_id: str, external_id: str, fp: str) -> bool:
+        return source_id == self.source_id and self.tenders.get(external_id) == self.digest(fp)
+
+    def remember_raw(self, source_id: str, external_id: str, payload_hash: str) -> None:
+        if source_id == self.source_id:
+            self.raw[external_id] = self.digest(payload_hash)
+
+    def remember_tender(self, source_id: str, external_id: str, fp: str) -> None:
+        if source_id == self.source_id:
+            self.tenders[external_id] = self.digest(fp)
+
+
+_LISTING_FILTERS = ("statuses", "regions", "cpv", "budget_min", "budget_max", "deadline_from", "deadline_to")
+
+
+def _listing_filters(filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    filters = filters or {}
+    return {k: filters.get(k) for k in _LISTING_FILTERS}
+
+
+def _public_row(row: Any) -> dict:
+    """Řádek tenders pro API – bez interních sloupců (tsvector, otisk obsahu)."""
+    out = dict(row)
+    out.pop("search_tsv", None)
+    out.pop("content_fp", None)
+    return out
+
+
 class DatabaseStorage:
     """Databázová vrstva pro raw data a tenders."""
 
-    def __init__(self, dsn: str):
+    def __init__(self, dsn: str, pool: Any = None):
         self.dsn = dsn
+        # psycopg_pool.ConnectionPool (dlouho běžící daemon); bez poolu nové spojení na každé volání
+        self.pool = pool
+
+    @classmethod
+    def pooled(cls, dsn: str, min_size: int = 1, max_size: int = 8) -> "DatabaseStorage":
+        """Storage nad poolem spojení (volitelná závislost psycopg_pool; bez ní obyčejný storage)."""
+        try:
+            from psycopg_pool import ConnectionPool
+        except ImportError:
+            logger.warning("psycopg_pool not installed – falling back to a new DB connection per call")
+            return cls(dsn)
+        pool = ConnectionPool(dsn, min_size=min_size, max_size=max_size,
+                              kwargs={"row_factory": dict_row}, name="vz-aggregator", open=True)
+        return cls(dsn, pool=pool)
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.close()
 
-    def get_connection(self) -> psycopg.Connection:
-        """Vytvoří databázové připojení."""
+    def get_connection(self) -> Any:
+        """Databázové připojení jako context manager (`with storage.get_connection() as conn`);
+        s poolem se po bloku vrací do poolu, jinak se zavře."""
+        if self.pool is not None:
+            return self.pool.connection()
         return psycopg.connect(self.dsn, row_factory=dict_row)
 
     # ------------------------ RAW DATA ------------------------
-    def insert_raw_batch(self, records: List[RawRecord]) -> int:
+    def insert_raw_batch(self, records: List[RawRecord], snapshot: Optional[FingerprintSnapshot] = None) -> int:
         """
         Vloží/aktualizuje raw záznamy:
           - stejný payload (source_id, external_id, payload_hash) => jen zvedne last_seen
           - jiný payload => vloží novou verzi (nový řádek)
+        Se `snapshot` se záznamy shodné s posledním uloženým payloadem vůbec neposílají –
+        dostanou jen jeden hromadný UPDATE last_seen.
         Vrací počet nově vložených řádků (nepočítá pouhé 'touch' update).
         """
         if not records:
@@ -75,16 +163,22 @@ class DatabaseStorage:
         """
 
         inserted = 0
+        touched: List[Tuple[str, str, str]] = []
+        written: List[Tuple[str, str, str]] = []  # do snapshotu až po commitu
         with self.get_connection() as conn:
             with conn.cursor() as cur:
                 for r in records:
                     payload = r.payload
+                    payload_hash = _stable_hash(payload)
+                    if snapshot is not None and snapshot.raw_unchanged(r.source_id, r.external_id, payload_hash):
+                        touched.append((r.source_id, r.external_id, payload_hash))
+                        continue
                     params = {
                         "source_id": r.source_id,
                         "external_id": r.external_id,
                         "payload": Json(payload),
                         "payload_kind": _detect_kind(payload),
-                        "payload_hash": _stable_hash(payload),
+                        "payload_hash": payload_hash,
                         "fetched_at": r.fetched_at,  # může být None -> DB má default
                     }
                     cur.execute(sql, params)
@@ -92,103 +186,216 @@ class DatabaseStorage:
                     flag = bool(_get_cell(row, "inserted") if isinstance(row, dict) else _get_cell(row, 0))
                     if flag:
                         inserted += 1
+                    written.append((r.source_id, r.external_id, payload_hash))
+                if touched:
+                    cur.execute("""
+                        UPDATE raw_data r SET last_seen = now()
+                        FROM unnest(%(s)s::text[], %(e)s::text[], %(h)s::text[]) AS k(source_id, external_id, payload_hash)
+                        WHERE r.source_id = k.source_id AND r.external_id = k.external_id
+                          AND r.payload_hash = k.payload_hash;
+                    """, {"s": [k[0] for k in touched], "e": [k[1] for k in touched], "h": [k[2] for k in touched]})
             conn.commit()
 
-        logger.info(f"Raw upsert: {inserted} inserted (others were touched last_seen)")
+        if snapshot is not None:
+            for key in written:
+                snapshot.remember_raw(*key)
+            snapshot.skipped_raw += len(touched)
+        logger.info(f"Raw upsert: {inserted} inserted, {len(touched)} unchanged touched in bulk "
+                    f"(others were touched last_seen)")
         return inserted
 
     # ------------------------ TENDERS ------------------------
-def upsert_tenders(self, tenders: List[TenderUnit]) -> Tuple[int, int]:
-    """
-    INSERT ... ON CONFLICT (source_id, external_id) DO UPDATE
-    Aktualizujeme jen pokud se některé pole opravdu změnilo (IS DISTINCT FROM).
-    Vrací (new_count, updated_count).
-    """
-    if not tenders:
-        return 0, 0
-
-    sql = """
-        INSERT INTO tenders (
-            hash_id, source_id, external_id, title, buyer, cpv,
-            country, region, procedure_type, budget_value, currency,
-            deadline, notice_url, attachments, status, description
-        )
-        VALUES (
-            %(hash_id)s, %(source_id)s, %(external_id)s, %(title)s, %(buyer)s, %(cpv)s,
-            %(country)s, %(region)s, %(procedure_type)s, %(budget_value)s, %(currency)s,
-            %(deadline)s, %(notice_url)s, %(attachments)s, %(status)s, %(description)s
-        )
-        ON CONFLICT (source_id, external_id) DO UPDATE
-        SET
-            -- hash_id udržujeme aktuální (neunikátní, jen informační otisk)
-            hash_id        = EXCLUDED.hash_id,
-            title          = EXCLUDED.title,
-            buyer          = EXCLUDED.buyer,
-            cpv            = EXCLUDED.cpv,
-            country        = EXCLUDED.country,
-            region         = EXCLUDED.region,
-            procedure_type = EXCLUDED.procedure_type,
-            budget_value   = EXCLUDED.budget_value,
-            currency       = EXCLUDED.currency,
-            deadline       = EXCLUDED.deadline,
-            notice_url     = EXCLUDED.notice_url,
-            attachments    = EXCLUDED.attachments,
-            status         = EXCLUDED.status,
-            description    = EXCLUDED.description,
-            updated_at     = NOW()
-        WHERE (
-            tenders.title, tenders.buyer, tenders.cpv, tenders.country, tenders.region,
-            tenders.procedure_type, tenders.budget_value, tenders.currency, tenders.deadline,
-            tenders.notice_url, tenders.attachments, tenders.status, tenders.description,
-            tenders.hash_id
-        ) IS DISTINCT FROM (
-            EXCLUDED.title, EXCLUDED.buyer, EXCLUDED.cpv, EXCLUDED.country, EXCLUDED.region,
-            EXCLUDED.procedure_type, EXCLUDED.budget_value, EXCLUDED.currency, EXCLUDED.deadline,
-            EXCLUDED.notice_url, EXCLUDED.attachments, EXCLUDED.status, EXCLUDED.description,
-            EXCLUDED.hash_id
-        )
-        RETURNING (xmax = 0) AS inserted, (xmax <> 0) AS updated;
-    """
+    def upsert_tenders(self, tenders: List[TenderUnit], changed: Optional[List[TenderUnit]] = None,
+                       snapshot: Optional[FingerprintSnapshot] = None) -> Tuple[int, int]:
+        """
+        INSERT ... ON CONFLICT (source_id, external_id) DO UPDATE
+        Aktualizujeme jen pokud se některé pole opravdu změnilo (IS DISTINCT FROM).
+        Vrací (new_count, updated_count); do `changed` (pokud je zadán) přidá nové/změněné jednotky.
+        Každý nový/změněný řádek zapíše trigger v téže transakci do outboxu tender_events
+        (sql/2026-10-13-outbox.sql, čtení přes core/outbox.py). Zakázka přesunutá do tenders_archive
+        se aktualizuje v archivu; zpět do hot ji vrátí tier_tenders, pokud se znovu otevře.
+        Se `snapshot` (load_fingerprints) se zakázky se shodným content_fp vůbec neposílají;
+        jim i serverem nezměněným řádkům se jen hromadně posune last_seen.
+        """
+        if not tenders:
+            return 0, 0
 
-    new_count = 0
-    updated_count = 0
-    with self.get_connection() as conn:
-        with conn.cursor() as cur:
-            for t in tenders:
-                params = {
-                    "hash_id": t.hash_id,
-                    "source_id": t.source_id,
-                    "external_id": t.external_id,
-                    "title": t.title,
-                    "buyer": t.buyer,
-                    "cpv": t.cpv,                     # text[]
-                    "country": t.country,
-                    "region": t.region,
-                    "procedure_type": t.procedure_type,
-                    "budget_value": t.budget_value,
-                    "currency": t.currency,
-                    "deadline": t.deadline,
-                    "notice_url": t.notice_url,
-                    "attachments": Json(t.attachments),  # jsonb
-                    "status": t.status,
-                    "description": t.description,
-                }
-                cur.execute(sql, params)
-                row = cur.fetchone()
-                if row:
-                    if row[0]:
-                        new_count += 1
-                    elif row[1]:
-                        updated_count += 1
-        conn.commit()
+        sql = """
+            INSERT INTO {table} AS t (
+                hash_id, source_id, external_id, title, buyer, cpv, cpv_prefixes,
+                country, region, procedure_type, budget_value, currency, budget_czk,
+                deadline, notice_url, attachments, status, status_norm, description,
+                content_fp, last_seen
+            )
+            VALUES (
+                %(hash_id)s, %(source_id)s, %(external_id)s, %(title)s, %(buyer)s, %(cpv)s, %(cpv_prefixes)s,
+                %(country)s, %(region)s, %(procedure_type)s, %(budget_value)s, %(currency)s, %(budget_czk)s,
+                %(deadline)s, %(notice_url)s, %(attachments)s, %(status)s,
+                %(status_norm)s::tender_status, %(description)s,
+                %(content_fp)s, NOW()
+            )
+            ON CONFLICT (source_id, external_id) DO UPDATE
+            SET
+                -- hash_id udržujeme aktuální (neunikátní, jen informační otisk)
+                hash_id        = EXCLUDED.hash_id,
+                title          = EXCLUDED.title,
+                buyer          = EXCLUDED.buyer,
+                cpv            = EXCLUDED.cpv,
+                cpv_prefixes   = EXCLUDED.cpv_prefixes,
+                country        = EXCLUDED.country,
+                region         = EXCLUDED.region,
+                procedure_type = EXCLUDED.procedure_type,
+                budget_value   = EXCLUDED.budget_value,
+                currency       = EXCLUDED.currency,
+                budget_czk     = EXCLUDED.budget_czk,
+                deadline       = EXCLUDED.deadline,
+                notice_url     = EXCLUDED.notice_url,
+                attachments    = EXCLUDED.attachments,
+                status         = EXCLUDED.status,
+                status_norm    = EXCLUDED.status_norm,
+                description    = EXCLUDED.description,
+                content_fp     = EXCLUDED.content_fp,
+                last_seen      = NOW(),
+                -- jen doplněný otisk (řádky z doby před sql/2026-10-15-fingerprints.sql) není změna obsahu
+                updated_at     = CASE WHEN {content_changed} THEN NOW() ELSE t.updated_at END
+            WHERE {content_changed}
+               OR t.content_fp IS DISTINCT FROM EXCLUDED.content_fp
+            RETURNING (xmax = 0) AS inserted, (xmax <> 0 AND t.updated_at = NOW()) AS updated;
+        """
+        content_changed = """(
+            (
+                t.title, t.buyer, t.cpv, t.cpv_prefixes, t.country, t.region,
+                t.procedure_type, t.budget_value, t.currency, t.deadline,
+                t.notice_url, t.attachments, t.status, t.status_norm, t.description,
+                t.hash_id
+            ) IS DISTINCT FROM (
+                EXCLUDED.title, EXCLUDED.buyer, EXCLUDED.cpv, EXCLUDED.cpv_prefixes, EXCLUDED.country, EXCLUDED.region,
+                EXCLUDED.procedure_type, EXCLUDED.budget_value, EXCLUDED.currency, EXCLUDED.deadline,
+                EXCLUDED.notice_url, EXCLUDED.attachments, EXCLUDED.status, EXCLUDED.status_norm, EXCLUDED.description,
+                EXCLUDED.hash_id
+            )
+            -- budget_czk se přepočítá jen se změnou hodnoty/měny (nový kurz sám o sobě řádek nepřepisuje),
+            -- případně když ještě chybí
+            OR (t.budget_czk IS NULL AND EXCLUDED.budget_czk IS NOT NULL)
+        )"""
 
-    logger.info(f"Upserted tenders: {new_count} new, {updated_count} updated")
-    return new_count, updated_count
+        new_count = 0
+        updated_count = 0
+        skipped = 0
+        written: List[Tuple[str, str, str]] = []  # do snapshotu až po commitu
+        fx = fx_rates()
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                # řádky přesunuté tieringem do archivu aktualizujeme tam (sql/2026-10-14-tiering.sql)
+                archived = self._archived_keys(cur, tenders)
+                statements = {False: sql.format(table="tenders", content_changed=content_changed),
+                              True: sql.format(table="tenders_archive", content_changed=content_changed)}
+                touched: Dict[bool, List[Tuple[str, str]]] = {False: [], True: []}
+                for t in tenders:
+                    key = (t.source_id, t.external_id)
+                    fp = _tender_fp(t)
+                    if snapshot is not None and snapshot.tender_unchanged(t.source_id, t.external_id, fp):
+                        touched[key in archived].append(key)
+                        skipped += 1
+                        continue
+                    params = {
+                        "hash_id": t.hash_id,
+                        "source_id": t.source_id,
+                        "external_id": t.external_id,
+                        "title": t.title,
+                        "buyer": t.buyer,
+                        "cpv": t.cpv,                     # text[]
+                        "cpv_prefixes": cpv_prefixes(t.cpv),
+                        "country": t.country,
+                        "region": t.region,
+                        "procedure_type": t.procedure_type,
+                        "budget_value": t.budget_value,
+                        "currency": t.currency,
+                        "budget_czk": to_czk(t.budget_value, t.currency, table=fx),
+                        "deadline": t.deadline,
+                        "notice_url": t.notice_url,
+                        "attachments": Json(t.attachments),  # jsonb
+                        "status": t.status,
+                        "status_norm": t.status_norm,
+                        "description": t.description,
+                        "content_fp": fp,
+                    }
+                    cur.execute(statements[key in archived], params)
+                    row = cur.fetchone()
+                    if not row:
+                        touched[key in archived].append(key)  # server shodu zjistil sám (bez snapshotu)
+                    elif _get_cell(row, "inserted") or _get_cell(row, "updated"):
+                        if _get_cell(row, "inserted"):
+                            new_count += 1
+                        else:
+                            updated_count += 1
+                        if changed is not None:
+                            changed.append(t)
+                    written.append((t.source_id, t.external_id, fp))
+                for in_archive, keys in touched.items():
+                    if keys:
+                        self._touch_tenders(cur, "tenders_archive" if in_archive else "tenders", keys)
+            conn.commit()
+
+        if snapshot is not None:
+            for key in written:
+                snapshot.remember_tender(*key)
+            snapshot.skipped_tenders += skipped
+        logger.info(f"Upserted tenders: {new_count} new, {updated_count} updated, {skipped} unchanged skipped")
+        return new_count, updated_count
+
+    @staticmethod
+    def _touch_tenders(cur: Any, table: str, keys: List[Tuple[str, str]]) -> None:
+        """Hromadně posune last_seen nezměněným zakázkám (jeden UPDATE přes PK)."""
+        cur.execute(f"""
+            UPDATE {table} t SET last_seen = NOW()
+            FROM unnest(%(s)s::text[], %(e)s::text[]) AS k(source_id, external_id)
+            WHERE t.source_id = k.source_id AND t.external_id = k.external_id;
+        """, {"s": [k[0] for k in keys], "e": [k[1] for k in keys]})
+
+    @staticmethod
+    def _archived_keys(cur: Any, tenders: List[TenderUnit]) -> set:
+        """Klíče (source_id, external_id) dávky, které leží v tenders_archive (jeden dotaz přes PK)."""
+        cur.execute("""
+            SELECT a.source_id, a.external_id
+            FROM unnest(%(s)s::text[], %(e)s::text[]) AS k(source_id, external_id)
+            JOIN tenders_archive a ON a.source_id = k.source_id AND a.external_id = k.external_id;
+        """, {"s": [t.source_id for t in tenders], "e": [t.external_id for t in tenders]})
+        return {(r["source_id"], r["external_id"]) for r in cur.fetchall()}
+
+    def load_fingerprints(self, source_id: str) -> FingerprintSnapshot:
+        """Snapshot otisků zdroje pro přeskakování nezměněných zápisů (jednou na začátku běhu).
+
+        content_fp zakázek (hot i archiv) a hash posledního payloadu každého external_id
+        z raw_data (podle last_seen); oba dotazy se čtou serverovým kurzorem po částech.
+        """
+        snap = FingerprintSnapshot(source_id)
+        with self.get_connection() as conn:
+            with conn.cursor(name="fp_tenders") as cur:
+                cur.itersize = 20000
+                cur.execute("""
+                    SELECT external_id, content_fp FROM tenders_all
+                    WHERE source_id = %(source_id)s AND content_fp IS NOT NULL;
+                """, {"source_id": source_id})
+                for r in cur:
+                    snap.tenders[r["external_id"]] = snap.digest(r["content_fp"])
+            with conn.cursor(name="fp_raw") as cur:
+                cur.itersize = 20000
+                cur.execute("""
+                    SELECT DISTINCT ON (external_id) external_id, payload_hash
+                    FROM raw_data
+                    WHERE source_id = %(source_id)s
+                    ORDER BY external_id, last_seen DESC;
+                """, {"source_id": source_id})
+                for r in cur:
+                    snap.raw[r["external_id"]] = snap.digest(r["payload_hash"])
+        logger.info(f"[{source_id}] fingerprint snapshot: {len(snap.tenders)} tenders, {len(snap.raw)} raw")
+        return snap
 
     # ------------------------ Post-ingest sync z RAW ------------------------
-    def sync_tenders_from_raw(self) -> int:
+    def sync_tenders_from_raw(self, source_id: str = "NEN") -> int:
         """
-        Doplní do tenders (pro source_id='NEN') latest hodnoty z raw_data.detail.
+        Doplní do tenders (pro daný source_id) latest hodnoty z raw_data.detail.
         Nepřepisuje nenull hodnoty v tenders – jen doplňuje.
         Vrací počet řádků, kterých se update dotkl.
         """
@@ -200,11 +407,12 @@ def upsert_tenders(self, tenders: List[TenderUnit]) -> Tuple[int, int]:
                  NULLIF(r.payload->'detail'->>'currency','')     AS currency,
                  NULLIF(r.payload->'detail'->>'region','')       AS region,
                  NULLIF(r.payload->'detail'->>'status','')       AS status,
+                 NULLIF(r.payload->'detail'->>'status_norm','')::tender_status AS status_norm,
                  NULLIF(r.payload->'detail'->>'description','')  AS description,
                  COALESCE(jsonb_path_query_array(r.payload, '$.detail.cpv'), '[]'::jsonb) AS cpv_json,
                  COALESCE(r.payload->'detail'->'attachments', '[]'::jsonb)               AS attachments_json
           FROM raw_data r
-          WHERE r.source_id = 'NEN'
+          WHERE r.source_id = %(source_id)s
             AND (r.payload->'detail') IS NOT NULL
           ORDER BY r.external_id, r.last_seen DESC
         )
@@ -212,24 +420,31 @@ def upsert_tenders(self, tenders: List[TenderUnit]) -> Tuple[int, int]:
         SET
           budget_value = COALESCE(t.budget_value, lr.budget_value),
           currency     = COALESCE(t.currency, lr.currency, 'CZK'),
+          -- doplněný rozpočet/měna → přepočet na CZK dopočítá fill_budget_czk (kurzy jsou v Pythonu)
+          budget_czk   = CASE WHEN t.budget_value IS NULL OR t.currency IS NULL THEN NULL ELSE t.budget_czk END,
           region       = COALESCE(t.region, lr.region),
           status       = COALESCE(t.status, lr.status),
+          status_norm  = COALESCE(t.status_norm, lr.status_norm, tender_status_from_label(lr.status)),
           description  = COALESCE(t.description, lr.description),
           cpv          = CASE WHEN t.cpv IS NULL OR array_length(t.cpv,1)=0
                               THEN ARRAY(SELECT jsonb_array_elements_text(lr.cpv_json))
                               ELSE t.cpv END,
+          -- doplněné cpv → prefixy dopočítá fill_cpv_prefixes (hierarchie je v Pythonu)
+          cpv_prefixes = CASE WHEN t.cpv IS NULL OR array_length(t.cpv,1)=0
+                              THEN NULL ELSE t.cpv_prefixes END,
           attachments  = CASE WHEN (t.attachments IS NULL OR t.attachments = '[]'::jsonb)
                               THEN lr.attachments_json
                               ELSE t.attachments END,
           updated_at   = NOW()
         FROM latest_raw lr
-        WHERE t.source_id = 'NEN'
+        WHERE t.source_id = %(source_id)s
           AND t.external_id = lr.external_id
           AND (
                (t.budget_value IS NULL AND lr.budget_value IS NOT NULL)
             OR (t.currency     IS NULL AND lr.currency     IS NOT NULL)
             OR (t.region       IS NULL AND lr.region       IS NOT NULL)
             OR (t.status       IS NULL AND lr.status       IS NOT NULL)
+            OR (t.status_norm  IS NULL AND COALESCE(lr.status_norm, tender_status_from_label(lr.status)) IS NOT NULL)
             OR (t.description  IS NULL AND lr.description  IS NOT NULL)
             OR ( (t.cpv IS NULL OR array_length(t.cpv,1)=0) AND jsonb_array_length(lr.cpv_json) > 0 )
             OR ( (t.attachments IS NULL OR t.attachments = '[]'::jsonb) AND lr.attachments_json <> '[]'::jsonb )
@@ -239,9 +454,752 @@ def upsert_tenders(self, tenders: List[TenderUnit]) -> Tuple[int, int]:
         updated = 0
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute(sql)
+                cur.execute(sql, {"source_id": source_id})
                 rows = cur.fetchall()
                 updated = len(rows)
             conn.commit()
-        logger.info(f"Post-ingest sync from raw → tenders updated rows: {updated}")
+        logger.info(f"Post-ingest sync from raw → tenders ({source_id}) updated rows: {updated}")
         return updated
+
+    def db_now(self):
+        """Aktuální čas DB serveru (pro porovnání s updated_at bez závislosti na hodinách klienta)."""
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT NOW() AS now;")
+                return _get_cell(cur.fetchone(), "now")
+
+    # ------------------------ FACETS ------------------------
+    def refresh_tender_facets(self, source_id: Optional[str] = None, since: Any = None) -> int:
+        """Přičte do tender_facets rozdíly za řádky změněné od `since` (viz sql/2026-10-06-facets.sql)."""
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT refresh_tender_facets(%(source_id)s, %(since)s) AS n;",
+                            {"source_id": source_id, "since": since})
+                n = int(_get_cell(cur.fetchone(), "n") or 0)
+            conn.commit()
+        logger.info(f"Facet refresh ({source_id or 'all'}): {n} rows recomputed")
+        return n
+
+    def refresh_source_facets(self, source_id: str) -> int:
+        """Refresh facet zdroje od jeho watermarku (sql/2026-10-17-facet-watermarks.sql); watermark se
+        posune jen s úspěšným refreshem, po chybě se řádky doženou příště."""
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT refresh_source_facets(%(source_id)s) AS n;", {"source_id": source_id})
+                n = int(_get_cell(cur.fetchone(), "n") or 0)
+            conn.commit()
+        logger.info(f"Facet refresh ({source_id}): {n} rows recomputed")
+        return n
+
+    def fill_cpv_prefixes(self, source_id: Optional[str] = None, batch_size: int = 5000) -> int:
+        """
+        Dopočítá cpv_prefixes řádkům, kde chybí (NULL = nespočteno: backfill, cpv doplněné
+        v sync_tenders_from_raw). Zapisuje po dávkách přes unnest.
+        """
+        select_sql = """
+            SELECT source_id, external_id, cpv FROM tenders
+            WHERE cpv_prefixes IS NULL
+              AND (%(source_id)s::text IS NULL OR source_id = %(source_id)s)
+            LIMIT %(limit)s;
+        """
+        update_sql = """
+            UPDATE tenders t SET cpv_prefixes = u.prefixes::text[]
+            FROM unnest(%(s)s::text[], %(e)s::text[], %(p)s::text[]) AS u(source_id, external_id, prefixes)
+            WHERE t.source_id = u.source_id AND t.external_id = u.external_id;
+        """
+        total = 0
+        with self.get_connection() as conn:
+            while True:
+                with conn.cursor() as cur:
+                    cur.execute(select_sql, {"source_id": source_id, "limit": batch_size})
+                    rows = cur.fetchall()
+                    if not rows:
+                        break
+                    # prefixy jako textový literál pole – unnest neumí pole polí různé délky
+                    prefixes = ["{" + ",".join(cpv_prefixes(r["cpv"] or [])) + "}" for r in rows]
+                    cur.execute(update_sql, {"s": [r["source_id"] for r in rows],
+                                             "e": [r["external_id"] for r in rows], "p": prefixes})
+                conn.commit()
+                total += len(rows)
+                if len(rows) < batch_size:
+                    break
+        if total:
+            logger.info(f"CPV prefixes filled for {total} tenders ({source_id or 'all'})")
+        return total
+
+    def fill_budget_czk(self, source_id: Optional[str] = None, batch_size: int = 5000) -> int:
+        """
+        Dopočítá budget_czk řádkům s rozpočtem, kde chybí (backfill, rozpočet doplněný
+        v sync_tenders_from_raw). Keyset přes (source_id, external_id) – řádky s neznámou
+        měnou zůstanou NULL a nevrací se v další dávce. Zvedá updated_at, aby přepočet
+        zachytily inkrementální facety.
+        """
+        select_sql = """
+            SELECT source_id, external_id, budget_value, currency FROM tenders
+            WHERE budget_czk IS NULL AND budget_value IS NOT NULL
+              AND (%(source_id)s::text IS NULL OR source_id = %(source_id)s)
+              AND (source_id, external_id) > (%(after_s)s, %(after_e)s)
+            ORDER BY source_id, external_id
+            LIMIT %(limit)s;
+        """
+        update_sql = """
+            UPDATE tenders t SET budget_czk = u.czk, updated_at = NOW()
+            FROM unnest(%(s)s::text[], %(e)s::text[], %(v)s::numeric[]) AS u(source_id, external_id, czk)
+            WHERE t.source_id = u.source_id AND t.external_id = u.external_id;
+        """
+        fx = fx_rates()
+        total = 0
+        skipped = 0
+        after = ("", "")
+        with self.get_connection() as conn:
+            while True:
+                with conn.cursor() as cur:
+                    cur.execute(select_sql, {"source_id": source_id, "after_s": after[0], "after_e": after[1],
+                                             "limit": batch_size})
+                    rows = cur.fetchall()
+                    if not rows:
+                        break
+                    after = (rows[-1]["source_id"], rows[-1]["external_id"])
+                    done = [(r, to_czk(r["budget_value"], r["currency"], table=fx)) for r in rows]
+                    done = [(r, czk) for r, czk in done if czk is not None]
+                    skipped += len(rows) - len(done)
+                    if done:
+                        cur.execute(update_sql, {"s": [r["source_id"] for r, _ in done],
+                                                 "e": [r["external_id"] for r, _ in done],
+                                                 "v": [czk for _, czk in done]})
+                conn.commit()
+                total += len(done)
+                if len(rows) < batch_size:
+                    break
+        if total or skipped:
+            logger.info(f"Budget CZK filled for {total} tenders ({source_id or 'all'}), "
+                        f"{skipped} without FX rate")
+        return total
+
+    # ------------------------ TIERING (hot/cold) ------------------------
+    def tier_tenders(self, grace_days: int = 30, batch_size: int = 5000) -> Tuple[int, int]:
+        """
+        Přesune uzavřené/dávno prošlé zakázky z tenders do tenders_archive a znovu otevřené
+        vrátí zpět (sql/2026-10-14-tiering.sql). Po dávkách, každá ve vlastní transakci.
+        Vrací (archived, restored).
+        """
+        archived = restored = 0
+        with self.get_connection() as conn:
+            while True:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT * FROM tier_tenders(%(grace)s, %(batch)s);",
+                                {"grace": grace_days, "batch": batch_size})
+                    row = cur.fetchone()
+                conn.commit()
+                n = int(_get_cell(row, "archived") or 0)
+                archived += n
+                restored += int(_get_cell(row, "restored") or 0)
+                if n < batch_size:
+                    break
+        if archived or restored:
+            logger.info(f"Tiering: {archived} tenders archived, {restored} restored to hot")
+            self.notify_tenders_changed()
+        return archived, restored
+
+    # ------------------------ READ API (core/api.py) ------------------------
+    CHANGE_CHANNEL = "tenders_changed"
+
+    def list_tenders(self, sort_field: str = "created_at", sort_dir: str = "desc",
+                     after: Optional[Tuple[Optional[str], Optional[str], bool]] = None, limit: int = 30,
+                     filters: Optional[Dict[str, Any]] = None) -> List[dict]:
+        """Stránka výpisu přes list_tenders() (keyset, sql/2026-10-05-listing.sql); after = (hodnota, id, null část)."""
+        sql = """
+            SELECT * FROM list_tenders(
+                sort_field => %(sort_field)s::text, sort_dir => %(sort_dir)s::text,
+                after_value => %(after_value)s::text, after_id => %(after_id)s::text,
+                after_null => %(after_null)s::boolean, lim => %(lim)s::int,
+                statuses => %(statuses)s::text[], regions => %(regions)s::text[], cpv => %(cpv)s::text[],
+                budget_min => %(budget_min)s::numeric, budget_max => %(budget_max)s::numeric,
+                deadline_from => %(deadline_from)s::date, deadline_to => %(deadline_to)s::date);
+        """
+        after_value, after_id, after_null = after or (None, None, False)
+        params = {"sort_field": sort_field, "sort_dir": sort_dir, "after_value": after_value,
+                  "after_id": after_id, "after_null": after_null, "lim": limit, **_listing_filters(filters)}
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                return [_public_row(r) for r in cur.fetchall()]
+
+    def count_tenders_estimate(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        sql = """
+            SELECT tenders_count_estimate(
+                statuses => %(statuses)s::text[], regions => %(regions)s::text[], cpv => %(cpv)s::text[],
+                budget_min => %(budget_min)s::numeric, budget_max => %(budget_max)s::numeric,
+                deadline_from => %(deadline_from)s::date, deadline_to => %(deadline_to)s::date) AS n;
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, _listing_filters(filters))
+                return int(_get_cell(cur.fetchone(), "n") or 0)
+
+    def search_tenders(self, q: str, limit: int = 30, offset: int = 0) -> List[dict]:
+        """Fulltext přes search_tenders() (řazení podle relevance, proto offset místo keysetu)."""
+        sql = "SELECT * FROM search_tenders(%(q)s) LIMIT %(lim)s OFFSET %(off)s;"
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, {"q": q, "lim": limit, "off": offset})
+                return [_public_row(r) for r in cur.fetchall()]
+
+    def get_tender(self, source_id: str, external_id: str) -> Optional[dict]:
+        """Detail zakázky z hot i archivu (tenders_all) včetně štítků."""
+        sql = """
+            SELECT t.*, l.labels
+            FROM tenders_all t
+            LEFT JOIN tender_labels l ON l.source_id = t.source_id AND l.external_id = t.external_id
+            WHERE t.source_id = %(s)s AND t.external_id = %(e)s
+            LIMIT 1;
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, {"s": source_id, "e": external_id})
+                row = cur.fetchone()
+        return _public_row(row) if row else None
+
+    def load_tender_facets(self) -> List[dict]:
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT facet, value, n FROM tender_facets ORDER BY facet, n DESC, value;")
+                return list(cur.fetchall())
+
+    def notify_tenders_changed(self, source_id: Optional[str] = None) -> None:
+        """NOTIFY pro cache read API (mimo ingest_runs: worker, tiering)."""
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_notify(%(ch)s, %(payload)s);",
+                            {"ch": self.CHANGE_CHANNEL, "payload": source_id or ""})
+            conn.commit()
+
+    def listen(self, channel: str, on_notify: Callable[[str], None], stop: threading.Event,
+               timeout: float = 5.0) -> None:
+        """
+        Blokující LISTEN na vlastním autocommit spojení (ne z poolu); `on_notify(payload)`
+        pro každou notifikaci, dokud není nastaven `stop`. Výpadek spojení = výjimka volajícímu.
+        """
+        with psycopg.connect(self.dsn, autocommit=True) as conn:
+            conn.execute(f"LISTEN {channel};")
+            while not stop.is_set():
+                for n in conn.notifies(timeout=timeout):
+                    on_notify(n.payload)
+                    if stop.is_set():
+                        break
+
+    # ------------------------ EXPORT ------------------------
+    def load_tenders_changed(self, after: Tuple[Any, str, str], until: Any, limit: int,
+                             with_raw: bool = False) -> List[dict]:
+        """
+        Zakázky (hot + archiv, view tenders_all) změněné za kurzorem (updated_at, source_id,
+        external_id) a před `until`, vzestupně. `after[0] = None` = od začátku. S `with_raw`
+        přidá raw_detail = payload->'detail' nejnovějšího raw záznamu.
+        """
+        raw_select = ", r.detail AS raw_detail" if with_raw else ""
+        raw_join = """
+            LEFT JOIN LATERAL (
+              SELECT rd.payload->'detail' AS detail
+              FROM raw_data rd
+              WHERE rd.source_id = t.source_id AND rd.external_id = t.external_id
+                AND (rd.payload->'detail') IS NOT NULL
+              ORDER BY rd.last_seen DESC
+              LIMIT 1
+            ) r ON TRUE""" if with_raw else ""
+        sql = f"""
+            SELECT t.hash_id, t.source_id, t.external_id, t.title, t.buyer, t.cpv, t.country, t.region,
+                   t.procedure_type, t.budget_value, t.currency, t.budget_czk, t.deadline, t.notice_url,
+                   t.attachments, t.status, t.status_norm::text AS status_norm, t.description,
+                   t.created_at, t.updated_at{raw_select}
+            FROM tenders_all t{raw_join}
+            WHERE (%(ts)s::timestamptz IS NULL
+                   OR (t.updated_at, t.source_id, t.external_id) > (%(ts)s::timestamptz, %(s)s, %(e)s))
+              AND t.updated_at < %(until)s
+            ORDER BY t.updated_at, t.source_id, t.external_id
+            LIMIT %(limit)s;
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, {"ts": after[0], "s": after[1], "e": after[2], "until": until, "limit": limit})
+                return list(cur.fetchall())
+
+    # ------------------------ INGEST RUNS (ledger) ------------------------
+    def start_ingest_run(self, source_id: str, config: dict, host: Optional[str] = None,
+                         mode: str = "full") -> int:
+        """Založí řádek v ingest_runs se stavem 'running' a vrátí jeho id (mode: full | poll)."""
+        sql = """
+            INSERT INTO ingest_runs (source_id, status, config, host, mode)
+            VALUES (%(source_id)s, 'running', %(config)s, %(host)s, %(mode)s)
+            RETURNING id;
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, {"source_id": source_id, "config": Json(config), "host": host, "mode": mode})
+                run_id = int(_get_cell(cur.fetchone(), "id"))
+            conn.commit()
+        return run_id
+
+    def finish_ingest_run(self, run_id: int, status: str, stats: dict,
+                          stage_seconds: dict, error_message: Optional[str] = None) -> None:
+        """Uzavře běh: stav, trvání, časy fází a počty (klíče jako sloupce ingest_runs)."""
+        sql = """
+            UPDATE ingest_runs SET
+                status           = %(status)s,
+                finished_at      = NOW(),
+                duration_seconds = %(duration_seconds)s,
+                stage_seconds    = %(stage_seconds)s,
+                http_requests    = %(http_requests)s,
+                http_retries     = %(http_retries)s,
+                http_bytes       = %(http_bytes)s,
+                pages_scraped    = %(pages_scraped)s,
+                details_fetched  = %(details_fetched)s,
+                raw_inserted     = %(raw_inserted)s,
+                tenders_new      = %(tenders_new)s,
+                tenders_updated  = %(tenders_updated)s,
+                synced_from_raw  = %(synced_from_raw)s,
+                errors           = %(errors)s,
+                details_per_sec  = %(details_per_sec)s,
+                error_message    = %(error_message)s
+            WHERE id = %(id)s;
+        """
+        cols = (
+            "duration_seconds", "http_requests", "http_retries", "http_bytes", "pages_scraped",
+            "details_fetched", "raw_inserted", "tenders_new", "tenders_updated", "synced_from_raw",
+            "errors", "details_per_sec",
+        )
+        params = {c: stats.get(c) for c in cols}
+        params.update({
+            "id": run_id,
+            "status": status,
+            "stage_seconds": Json(stage_seconds),
+            "error_message": error_message,
+        })
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                # doručí se až commitem → read API zahodí cache až nad zapsanými daty
+                cur.execute("SELECT pg_notify(%(ch)s, source_id) FROM ingest_runs WHERE id = %(id)s;",
+                            {"ch": self.CHANGE_CHANNEL, "id": run_id})
+            conn.commit()
+
+    def recent_ingest_runs(self, source_id: str, limit: int = 20, status: str = "ok",
+                           mode: str = "full") -> List[dict]:
+        """Posledních `limit` běhů zdroje v daném režimu (nejnovější první)."""
+        sql = """
+            SELECT * FROM ingest_runs
+            WHERE source_id = %(source_id)s AND status = %(status)s AND mode = %(mode)s
+            ORDER BY started_at DESC
+            LIMIT %(limit)s;
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, {"source_id": source_id, "status": status, "mode": mode, "limit": limit})
+                return list(cur.fetchall())
+
+    # ------------------------ CRAWL QUEUE (crawl_jobs) ------------------------
+    def enqueue_crawl_jobs(self, source_id: str, rows: List[dict], max_attempts: int = 5) -> int:
+        """
+        Vloží řádky seznamu do fronty. Existující job se vrátí do fronty jen při změně řádku
+        (a ne pokud ho právě zpracovává worker). Vrací počet nově zařazených jobů.
+        """
+        rows = [r for r in rows if r.get("external_id")]
+        if not rows:
+            return 0
+        sql = """
+            INSERT INTO crawl_jobs (source_id, external_id, url, payload, max_attempts)
+            SELECT %(source_id)s, u.external_id, u.url, u.payload, %(max_attempts)s
+            FROM unnest(%(e)s::text[], %(u)s::text[], %(p)s::jsonb[]) AS u(external_id, url, payload)
+            ON CONFLICT (source_id, external_id) DO UPDATE
+            SET url = EXCLUDED.url, payload = EXCLUDED.payload, status = 'pending', attempts = 0,
+                available_at = NOW(), last_error = NULL, updated_at = NOW()
+            WHERE crawl_jobs.status <> 'running'
+              AND crawl_jobs.payload IS DISTINCT FROM EXCLUDED.payload
+            RETURNING 1;
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, {"source_id": source_id, "max_attempts": max_attempts,
+                                  "e": [str(r["external_id"]) for r in rows],
+                                  "u": [r.get("notice_url") for r in rows],
+                                  "p": [Json(r) for r in rows]})
+                n = len(cur.fetchall())
+            conn.commit()
+        return n
+
+    def requeue_expired_crawl_jobs(self, source_id: str) -> int:
+        """Joby s vypršelým leasem (spadlý/zaseknutý worker) zpět do fronty, po max_attempts → failed."""
+        sql = """
+            UPDATE crawl_jobs
+            SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END,
+                locked_by = NULL, lease_until = NULL, last_error = 'lease expired', updated_at = NOW()
+            WHERE status = 'running' AND lease_until < NOW() AND source_id = %(source_id)s
+            RETURNING 1;
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, {"source_id": source_id})
+                n = len(cur.fetchall())
+            conn.commit()
+        return n
+
+    def claim_crawl_jobs(self, source_id: str, worker_id: str, limit: int, lease_seconds: float) -> List[dict]:
+        """Atomicky si vezme až `limit` čekajících jobů (SKIP LOCKED → souběžní workery se nečekají)."""
+        sql = """
+            WITH picked AS (
+              SELECT id FROM crawl_jobs
+              WHERE source_id = %(source_id)s AND status = 'pending' AND available_at <= NOW()
+              ORDER BY id
+              LIMIT %(limit)s
+              FOR UPDATE SKIP LOCKED
+            )
+            UPDATE crawl_jobs j
+            SET status = 'running', attempts = j.attempts + 1, locked_by = %(worker)s,
+                lease_until = NOW() + make_interval(secs => %(lease)s), updated_at = NOW()
+            FROM picked
+            WHERE j.id = picked.id
+            RETURNING j.id, j.external_id, j.url, j.payload, j.attempts, j.max_attempts;
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, {"source_id": source_id, "worker": worker_id,
+                                  "limit": limit, "lease": float(lease_seconds)})
+                rows = list(cur.fetchall())
+            conn.commit()
+        return rows
+
+    def complete_crawl_jobs(self, job_ids: List[int], worker_id: str) -> int:
+        """Označí joby jako hotové – jen pokud lease pořád drží tento worker."""
+        if not job_ids:
+            return 0
+        sql = """
+            UPDATE crawl_jobs
+            SET status = 'done', locked_by = NULL, lease_until = NULL, last_error = NULL, updated_at = NOW()
+            WHERE id = ANY(%(ids)s) AND status = 'running' AND locked_by = %(worker)s
+            RETURNING 1;
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, {"ids": job_ids, "worker": worker_id})
+                n = len(cur.fetchall())
+            conn.commit()
+        return n
+
+    def fail_crawl_job(self, job_id: int, worker_id: str, error: str, retry_delay: float) -> None:
+        """Chyba zpracování: zpět do fronty s odkladem, po max_attempts → failed."""
+        sql = """
+            UPDATE crawl_jobs
+            SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END,
+                available_at = NOW() + make_interval(secs => %(delay)s),
+                locked_by = NULL, lease_until = NULL, last_error = %(error)s, updated_at = NOW()
+            WHERE id = %(id)s AND status = 'running' AND locked_by = %(worker)s;
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, {"id": job_id, "worker": worker_id, "error": error[:1000],
+                                  "delay": float(retry_delay)})
+            conn.commit()
+
+    def crawl_queue_depth(self, source_id: str) -> Dict[str, int]:
+        """Počty jobů zdroje podle stavu (pending zahrnuje i odložené po chybě)."""
+        sql = "SELECT status, count(*) AS n FROM crawl_jobs WHERE source_id = %(source_id)s GROUP BY status;"
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, {"source_id": source_id})
+                return {r["status"]: int(r["n"]) for r in cur.fetchall()}
+
+    # ------------------------ ALERTS ------------------------
+    def alert_subscriptions_version(self) -> str:
+        """Levný otisk aktivních odběrů (počet + poslední změna) – matcher podle něj přestaví index."""
+        sql = "SELECT count(*) AS n, max(updated_at) AS ts FROM alert_subscriptions WHERE active;"
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql)
+                row = cur.fetchone()
+        return f"{_get_cell(row, 'n')}|{_get_cell(row, 'ts')}"
+
+    def load_alert_subscriptions(self) -> List[dict]:
+        sql = """
+            SELECT id, cpv, regions, budget_min, budget_max, keywords
+            FROM alert_subscriptions WHERE active;
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql)
+                return list(cur.fetchall())
+
+    def save_alert_matches(self, rows: List[Tuple[int, str, str]]) -> int:
+        """Hromadný zápis shod (subscription_id, source_id, external_id); existující dvojice se přeskočí."""
+        if not rows:
+            return 0
+        sql = """
+            INSERT INTO alert_matches (subscription_id, source_id, external_id)
+            SELECT * FROM unnest(%(sub)s::bigint[], %(s)s::text[], %(e)s::text[])
+            ON CONFLICT DO NOTHING
+            RETURNING 1;
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, {"sub": [r[0] for r in rows], "s": [r[1] for r in rows],
+                                  "e": [r[2] for r in rows]})
+                n = len(cur.fetchall())
+            conn.commit()
+        return n
+
+    # ------------------------ OUTBOX (tender_events) ------------------------
+    def read_tender_events(self, after: Tuple[str, int], limit: int) -> List[dict]:
+        """
+        Dávka událostí za kurzorem (txid, id) vzestupně. Čte jen transakce starší než xmin
+        aktuálního snapshotu (všechny už skončily) – později commitnutá transakce má txid >= xmin,
+        takže kurzor nikdy nepřeskočí událost, která se zviditelní až po přečtení.
+        """
+        sql = """
+            SELECT id, txid::text AS txid, source_id, external_id, hash_id, op,
+                   changed_fields, changes, created_at
+            FROM tender_events
+            WHERE (txid, id) > (%(after_txid)s::xid8, %(after_id)s)
+              AND txid < pg_snapshot_xmin(pg_current_snapshot())
+            ORDER BY txid, id
+            LIMIT %(limit)s;
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, {"after_txid": after[0], "after_id": after[1], "limit": limit})
+                return list(cur.fetchall())
+
+    def get_outbox_cursor(self, consumer: str) -> Tuple[str, int]:
+        """Kurzor konzumenta (txid, id); nový konzument začíná od začátku outboxu."""
+        sql = """
+            INSERT INTO outbox_cursors (consumer) VALUES (%(consumer)s)
+            ON CONFLICT (consumer) DO UPDATE SET consumer = EXCLUDED.consumer
+            RETURNING last_txid::text AS last_txid, last_id;
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, {"consumer": consumer})
+                row = cur.fetchone()
+            conn.commit()
+        return str(_get_cell(row, "last_txid")), int(_get_cell(row, "last_id"))
+
+    def save_outbox_cursor(self, consumer: str, cursor: Tuple[str, int]) -> None:
+        sql = """
+            UPDATE outbox_cursors SET last_txid = %(txid)s::xid8, last_id = %(id)s, updated_at = NOW()
+            WHERE consumer = %(consumer)s;
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, {"consumer": consumer, "txid": cursor[0], "id": cursor[1]})
+            conn.commit()
+
+    def outbox_status(self) -> List[dict]:
+        """Konzumenti, jejich kurzor a počet nepřečtených událostí."""
+        sql = """
+            SELECT c.consumer, c.last_txid::text AS last_txid, c.last_id, c.updated_at,
+                   (SELECT count(*) FROM tender_events e WHERE (e.txid, e.id) > (c.last_txid, c.last_id)) AS pending
+            FROM outbox_cursors c
+            ORDER BY c.consumer;
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql)
+                return list(cur.fetchall())
+
+    def prune_tender_events(self, older_than_days: float) -> int:
+        """Smaže události starší než N dní, které už přečetli všichni konzumenti."""
+        sql = """
+            DELETE FROM tender_events e
+            WHERE e.created_at < NOW() - make_interval(secs => %(secs)s)
+              AND NOT EXISTS (SELECT 1 FROM outbox_cursors c WHERE (e.txid, e.id) > (c.last_txid, c.last_id));
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, {"secs": older_than_days * 86400})
+                n = cur.rowcount
+            conn.commit()
+        logger.info(f"Outbox prune: {n} events deleted")
+        return n
+
+    # ------------------------ LABELS ------------------------
+    def load_label_pending(self, model_version: str, after: Tuple[str, str], limit: int,
+                           source_id: Optional[str] = None) -> List[dict]:
+        """
+        Zakázky ke (pře)štítkování: bez štítků, jiná verze modelu, nebo změněné od štítkování
+        (updated_at > labeled_at, jako load_dedup_pending) se změněným hash_id/textem – md5 textu
+        (tender_label_fp) se počítá jen pro tyto kandidáty, ne pro celou tabulku.
+        Keyset přes (source_id, external_id) – zpracovaná dávka se znovu nevrací.
+        """
+        sql = """
+            SELECT t.source_id, t.external_id, t.hash_id, t.title, t.description, t.cpv,
+                   tender_label_fp(t.title, t.description, t.cpv) AS text_fp
+            FROM tenders t
+            LEFT JOIN tender_labels l
+              ON l.source_id = t.source_id AND l.external_id = t.external_id
+            WHERE (t.source_id, t.external_id) > (%(after_s)s, %(after_e)s)
+              AND (%(source_id)s::text IS NULL OR t.source_id = %(source_id)s)
+              AND (l.source_id IS NULL
+                   OR l.model_version <> %(version)s
+                   OR (l.labeled_at < t.updated_at
+                       AND (l.hash_id <> t.hash_id
+                            OR l.text_fp <> tender_label_fp(t.title, t.description, t.cpv))))
+            ORDER BY t.source_id, t.external_id
+            LIMIT %(limit)s;
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, {"after_s": after[0], "after_e": after[1], "source_id": source_id,
+                                  "version": model_version, "limit": limit})
+                return list(cur.fetchall())
+
+    def save_tender_labels(self, rows: List[dict], model_version: str) -> int:
+        """Dávka štítků jedním INSERT ... SELECT FROM unnest (upsert podle (source_id, external_id))."""
+        if not rows:
+            return 0
+        sql = """
+            INSERT INTO tender_labels (source_id, external_id, labels, scores, hash_id, text_fp,
+                                       model_version, labeled_at)
+            SELECT u.source_id, u.external_id, u.labels::text[], u.scores, u.hash_id, u.text_fp,
+                   %(version)s, NOW()
+            FROM unnest(%(s)s::text[], %(e)s::text[], %(l)s::text[], %(sc)s::jsonb[],
+                        %(h)s::text[], %(fp)s::text[])
+                 AS u(source_id, external_id, labels, scores, hash_id, text_fp)
+            ON CONFLICT (source_id, external_id) DO UPDATE SET
+                labels = EXCLUDED.labels, scores = EXCLUDED.scores, hash_id = EXCLUDED.hash_id,
+                text_fp = EXCLUDED.text_fp, model_version = EXCLUDED.model_version,
+                labeled_at = EXCLUDED.labeled_at;
+        """
+        params = {
+            "version": model_version,
+            "s": [r["source_id"] for r in rows],
+            "e": [r["external_id"] for r in rows],
+            # štítky jako textový literál pole (viz fill_cpv_prefixes); klíče jsou identifikátory
+            "l": ["{" + ",".join(r["labels"]) + "}" for r in rows],
+            "sc": [json.dumps(r["scores"]) for r in rows],
+            "h": [r["hash_id"] for r in rows],
+            "fp": [r["text_fp"] for r in rows],
+        }
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+            conn.commit()
+        return len(rows)
+
+    # ------------------------ ATTACHMENTS ------------------------
+    def load_attachment_index(self, urls: List[str]) -> Dict[str, dict]:
+        """Stav příloh z minulých běhů (sha256, velikost, ETag, Last-Modified) podle URL."""
+        if not urls:
+            return {}
+        sql = """
+            SELECT url, sha256, size_bytes, etag, last_modified, content_type, name
+            FROM attachment_files
+            WHERE url = ANY(%(urls)s);
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, {"urls": urls})
+                return {row["url"]: dict(row) for row in cur.fetchall()}
+
+    def upsert_attachment_files(self, rows: List[dict]) -> int:
+        """Zapíše/aktualizuje stav stažených příloh (PK = url); vrací počet zapsaných řádků."""
+        if not rows:
+            return 0
+        sql = """
+            INSERT INTO attachment_files (
+                url, source_id, external_id, name, sha256, size_bytes,
+                etag, last_modified, content_type, fetched_at, checked_at
+            ) VALUES (
+                %(url)s, %(source_id)s, %(external_id)s, %(name)s, %(sha256)s, %(size_bytes)s,
+                %(etag)s, %(last_modified)s, %(content_type)s, %(fetched_at)s, NOW()
+            )
+            ON CONFLICT (url) DO UPDATE SET
+                source_id     = EXCLUDED.source_id,
+                external_id   = EXCLUDED.external_id,
+                name          = COALESCE(EXCLUDED.name, attachment_files.name),
+                sha256        = EXCLUDED.sha256,
+                size_bytes    = EXCLUDED.size_bytes,
+                etag          = EXCLUDED.etag,
+                last_modified = EXCLUDED.last_modified,
+                content_type  = EXCLUDED.content_type,
+                fetched_at    = COALESCE(EXCLUDED.fetched_at, attachment_files.fetched_at),
+                checked_at    = NOW();
+        """
+        cols = ("url", "source_id", "external_id", "name", "sha256", "size_bytes",
+                "etag", "last_modified", "content_type", "fetched_at")
+        params = [{c: r.get(c) for c in cols} for r in rows]
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.executemany(sql, params)
+            conn.commit()
+        return len(params)
+
+    # ------------------------ DEDUP (MinHash / LSH) ------------------------
+    def load_dedup_pending(self, limit: int) -> List[dict]:
+        """Zakázky bez podpisu nebo změněné od posledního výpočtu (nejstarší změny první)."""
+        sql = """
+            SELECT t.hash_id, t.source_id, t.external_id, t.title, t.buyer, t.deadline
+            FROM tenders t
+            LEFT JOIN tender_signatures s
+              ON s.source_id = t.source_id AND s.external_id = t.external_id
+            WHERE s.source_id IS NULL OR s.computed_at < t.updated_at
+            ORDER BY t.updated_at
+            LIMIT %(limit)s;
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, {"limit": limit})
+                return list(cur.fetchall())
+
+    def load_lsh_candidates(self, buckets: List[Tuple[int, int]]) -> List[dict]:
+        """Zakázky sdílející některý (pás, bucket) – s podpisem, deadline a aktuálním clusterem."""
+        if not buckets:
+            return []
+        sql = """
+            SELECT b.band, b.bucket, b.source_id, b.external_id,
+                   s.minhash, t.hash_id, t.deadline, t.dedup_cluster_id
+            FROM unnest(%(bands)s::smallint[], %(buckets)s::bigint[]) AS q(band, bucket)
+            JOIN tender_lsh_bands b ON b.band = q.band AND b.bucket = q.bucket
+            JOIN tender_signatures s ON s.source_id = b.source_id AND s.external_id = b.external_id
+            JOIN tenders t ON t.source_id = b.source_id AND t.external_id = b.external_id;
+        """
+        params = {"bands": [b for b, _ in buckets], "buckets": [k for _, k in buckets]}
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                return list(cur.fetchall())
+
+    def save_dedup(self, signatures: List[dict], bands: List[Tuple[int, int, str, str]],
+                   assign: List[Tuple[str, str, str]], merges: List[Tuple[str, str]]) -> None:
+        """V jedné transakci: podpisy, LSH pásy (nahradí staré), přiřazení a sloučení clusterů."""
+        if not signatures:
+            return
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.executemany("""
+                    INSERT INTO tender_signatures (source_id, external_id, minhash, text_fp, computed_at)
+                    VALUES (%(source_id)s, %(external_id)s, %(minhash)s, %(text_fp)s, NOW())
+                    ON CONFLICT (source_id, external_id) DO UPDATE SET
+                        minhash = EXCLUDED.minhash, text_fp = EXCLUDED.text_fp, computed_at = NOW();
+                """, signatures)
+                cur.execute("""
+                    DELETE FROM tender_lsh_bands b
+                    USING unnest(%(s)s::text[], %(e)s::text[]) AS k(source_id, external_id)
+                    WHERE b.source_id = k.source_id AND b.external_id = k.external_id;
+                """, {"s": [x["source_id"] for x in signatures], "e": [x["external_id"] for x in signatures]})
+                if bands:
+                    cur.execute("""
+                        INSERT INTO tender_lsh_bands (band, bucket, source_id, external_id)
+                        SELECT * FROM unnest(%(band)s::smallint[], %(bucket)s::bigint[], %(s)s::text[], %(e)s::text[])
+                        ON CONFLICT DO NOTHING;
+                    """, {"band": [b[0] for b in bands], "bucket": [b[1] for b in bands],
+                          "s": [b[2] for b in bands], "e": [b[3] for b in bands]})
+                if merges:
+                    cur.executemany(
+                        "UPDATE tenders SET dedup_cluster_id = %s WHERE dedup_cluster_id = %s;",
+                        [(new, old) for old, new in merges],
+                    )
+                if assign:
+                    cur.execute("""
+                        UPDATE tenders t SET dedup_cluster_id = a.cluster_id
+                        FROM unnest(%(s)s::text[], %(e)s::text[], %(c)s::text[]) AS a(source_id, external_id, cluster_id)
+                        WHERE t.source_id = a.source_id AND t.external_id = a.external_id
+                          AND t.dedup_cluster_id IS DISTINCT FROM a.cluster_id;
+                    """, {"s": [a[0] for a in assign], "e": [a[1] for a in assign], "c": [a[2] for a in assign]})
+            conn.commit()
@@ -0,0 +1,218 @@
+# core/worker.py
+"""Distribuovaný crawl přes frontu crawl_jobs v Postgresu (sql/2026-10-10-crawl-queue.sql).
+
+Producent projde stránky seznamu a řádky zařadí do fronty; libovolný počet workerů
+(procesy/stroje nad stejnou DB) si bere dávky přes FOR UPDATE SKIP LOCKED s leasem,
+stáhne detaily a výsledky zapíše přes DatabaseStorage. Spadlý worker = po vypršení
+leasu se jeho joby vrátí do fronty; chyba detailu = odklad a nový pokus (max_attempts).
+
+    python -m core.worker enqueue --source nen
+    python -m core.worker work --source nen [--batch-size 20] [--lease 300] [--until-empty]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+from dotenv import load_dotenv
+from loguru import logger
+
+from adapters.registry import create_adapter
+from core.alerts import AlertMatcher
+from core.metrics import metrics
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+ENV_PATH = PROJECT_ROOT / ".env"
+CONFIG_PATH = PROJECT_ROOT / "config" / "sources.yaml"
+
+
+def enqueue_list(adapter: Any, storage: Any, max_attempts: int = 5) -> Dict[str, int]:
+    """Producent: řádky seznamu (bez detailů) → crawl_jobs."""
+    stats = {"pages": 0, "rows": 0, "enqueued": 0}
+    for rows in adapter.iter_list_rows():
+        stats["pages"] += 1
+        stats["rows"] += len(rows)
+        stats["enqueued"] += storage.enqueue_crawl_jobs(adapter.source_id, rows, max_attempts=max_attempts)
+    metrics.inc("crawl_jobs_total", stats["enqueued"], source=adapter.source_id, result="enqueued")
+    logger.info(f"[{adapter.source_id}] enqueue: {stats}")
+    return stats
+
+
+class CrawlWorker:
+    """Konzument fronty: claim dávky → detaily → insert_raw_batch + upsert_tenders → done/retry."""
+
+    def __init__(self, adapter: Any, storage: Any, worker_id: Optional[str] = None, batch_size: int = 20,
+                 lease_seconds: float = 300.0, retry_delay: float = 60.0, idle_sleep: float = 5.0,
+                 alerts: Optional[Any] = None) -> None:
+        self.adapter = adapter
+        self.alerts = alerts  # core.alerts.AlertMatcher
+        self.storage = storage
+        self.source_id = adapter.source_id
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.retry_delay = retry_delay
+        self.idle_sleep = idle_sleep
+        self.stop = threading.Event()
+
+    def run_batch(self) -> Dict[str, int]:
+        jobs = self.storage.claim_crawl_jobs(self.source_id, self.worker_id, self.batch_size, self.lease_seconds)
+        stats = {"claimed": len(jobs), "done": 0, "retried": 0, "tenders_new": 0, "tenders_updated": 0}
+        if not jobs:
+            return stats
+        raws, units, ok_ids = [], [], []
+        for job in jobs:
+            try:
+                raw, unit = self.adapter.fetch_record(job["payload"])
+            except Exception as e:
+                logger.warning(f"[{self.source_id}] job {job['id']} ({job['external_id']}) "
+                               f"attempt {job['attempts']}/{job['max_attempts']}: {type(e).__name__}: {e}")
+                # lineární backoff podle počtu pokusů
+                self.storage.fail_crawl_job(job["id"], self.worker_id, f"{type(e).__name__}: {e}",
+                                            self.retry_delay * job["attempts"])
+                stats["retried"] += 1
+                continue
+            raws.append(raw)
+            units.append(unit)
+            ok_ids.append(job["id"])
+
+        # zápis je idempotentní → při pádu před complete job po leasu zpracuje jiný worker znovu
+        changed: Optional[List[Any]] = [] if self.alerts else None
+        try:
+            with metrics.timer("stage_seconds", source=self.source_id, stage="insert_raw"):
+                self.storage.insert_raw_batch(raws)
+            with metrics.timer("stage_seconds", source=self.source_id, stage="upsert_tenders"):
+                stats["tenders_new"], stats["tenders_updated"] = self.storage.upsert_tenders(units, changed=changed)
+        except Exception as e:
+            # chyba DB: joby hned vrátit do fronty (s backoffem), ne čekat na vypršení leasu
+            logger.error(f"[{self.source_id}] storing batch of {len(ok_ids)} jobs failed: {type(e).__name__}: {e}")
+            stats["retried"] += self._fail_jobs(jobs, ok_ids, f"store: {type(e).__name__}: {e}")
+            metrics.inc("crawl_jobs_total", stats["retried"], source=self.source_id, result="retried")
+            return stats
+        if changed:
+            try:
+                self.alerts.process(changed)
+            except Exception as e:
+                logger.warning(f"Alert matching failed: {type(e).__name__}: {e}")
+        stats["done"] = self.storage.complete_crawl_jobs(ok_ids, self.worker_id)
+        if stats["done"] < len(ok_ids):
+            logger.warning(f"[{self.source_id}] {len(ok_ids) - stats['done']} jobs lost their lease before completion")
+        metrics.inc("crawl_jobs_total", stats["done"], source=self.source_id, result="done")
+        metrics.inc("crawl_jobs_total", stats["retried"], source=self.source_id, result="retried")
+        return stats
+
+    def _fail_jobs(self, jobs: List[Dict[str, Any]], ids: List[int], error: str) -> int:
+        """Vrátí joby do fronty (fail_crawl_job); co se nepodaří (DB pořád dole), převezme requeue po leasu."""
+        attempts = {job["id"]: job["attempts"] for job in jobs}
+        n = 0
+        for job_id in ids:
+            try:
+                self.storage.fail_crawl_job(job_id, self.worker_id, error, self.retry_delay * attempts[job_id])
+                n += 1
+            except Exception as e:
+                logger.warning(f"[{self.source_id}] releasing job {job_id} failed: {type(e).__name__}: {e}")
+                break
+        return n
+
+    def run(self, until_empty: bool = False) -> Dict[str, int]:
+        total: Dict[str, int] = {"batches": 0, "claimed": 0, "done": 0, "retried": 0,
+                                 "tenders_new": 0, "tenders_updated": 0}
+        dirty = False  # zapsané řádky bez refreshe facet
+        logger.info(f"[{self.source_id}] worker {self.worker_id} started (batch {self.batch_size}, "
+                    f"lease {self.lease_seconds}s)")
+        while not self.stop.is_set():
+            try:
+                expired = self.storage.requeue_expired_crawl_jobs(self.source_id)
+                if expired:
+                    logger.warning(f"[{self.source_id}] {expired} jobs with expired lease requeued")
+                    metrics.inc("crawl_jobs_total", expired, source=self.source_id, result="expired")
+                batch = self.run_batch()
+            except Exception as e:  # DB nedostupná (claim/complete): počkat a zkusit znovu, worker běží dál
+                logger.error(f"[{self.source_id}] worker batch failed: {type(e).__name__}: {e}")
+                self.stop.wait(self.idle_sleep)
+                continue
+            if batch["claimed"]:
+                total["batches"] += 1
+                for k in batch:
+                    total[k] += batch[k]
+                dirty = dirty or bool(batch["tenders_new"] or batch["tenders_updated"])
+                continue
+
+            # fronta (zatím) prázdná: dohnat odvozená data a čekat / skončit
+            if dirty:
+                dirty = not self._refresh_facets()
+            if until_empty and not self.storage.crawl_queue_depth(self.source_id).get("pending"):
+                break
+            self.stop.wait(self.idle_sleep)
+        if dirty:
+            self._refresh_facets()
+        logger.info(f"[{self.source_id}] worker {self.worker_id} finished: {total}")
+        return total
+
+    def _refresh_facets(self) -> bool:
+        """Refresh facet od watermarku zdroje; chyba = zkusí se znovu při dalším vyprázdnění fronty."""
+        try:
+            self.storage.refresh_source_facets(self.source_id)
+            self.storage.notify_tenders_changed(self.source_id)  # cache read API (core/api.py)
+            return True
+        except Exception as e:
+            logger.warning(f"Facet refresh for {self.source_id} failed: {type(e).__name__}: {e}")
+            return False
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from core.storage import DatabaseStorage
+
+    p = argparse.ArgumentParser(description="Crawl fronta crawl_jobs: producent seznamu a workery detailů")
+    p.add_argument("command", choices=("enqueue", "work"))
+    p.add_argument("--source", default="nen", help="klíč zdroje v sources.yaml")
+    p.add_argument("--config", type=Path, default=CONFIG_PATH)
+    p.add_argument("--dsn", default=None, help="default SUPABASE_DSN / SUPABASE_DSN_POOLER z .env")
+    p.add_argument("--batch-size", type=int, default=20)
+    p.add_argument("--lease", type=float, default=300.0, help="lease jobu v sekundách (> doba dávky)")
+    p.add_argument("--retry-delay", type=float, default=60.0, help="odklad po chybě × číslo pokusu")
+    p.add_argument("--max-attempts", type=int, default=5)
+    p.add_argument("--until-empty", action="store_true", help="skončit, až ve frontě nic nečeká")
+    args = p.parse_args(argv)
+
+    load_dotenv(ENV_PATH)
+    dsn = args.dsn or os.getenv("SUPABASE_DSN") or os.getenv("SUPABASE_DSN_POOLER")
+    if not dsn:
+        logger.error("SUPABASE_DSN environment variable not set")
+        return 2
+    with open(args.config, "r", encoding="utf-8") as f:
+        full_cfg = yaml.safe_load(f) or {}
+    cfg = (full_cfg.get("sources") or {}).get(args.source)
+    if cfg is None:
+        logger.error(f"source {args.source!r} not found in {args.config}")
+        return 2
+
+    adapter = create_adapter(args.source, cfg)
+    storage = DatabaseStorage(dsn)
+    if args.command == "enqueue":
+        enqueue_list(adapter, storage, max_attempts=args.max_attempts)
+        return 0
+
+    alerts = AlertMatcher(storage) if (full_cfg.get("alerts") or {}).get("enabled") else None
+    worker = CrawlWorker(adapter, storage, batch_size=args.batch_size,
+                         lease_seconds=args.lease, retry_delay=args.retry_delay, alerts=alerts)
+    if threading.current_thread() is threading.main_thread():
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda *_: worker.stop.set())  # dokončí rozjetou dávku
+    started = time.time()
+    stats = worker.run(until_empty=args.until_empty)
+    took = time.time() - started
+    logger.info(f"{stats['done']} jobs in {took:.1f}s ({stats['done'] / took if took else 0:.2f}/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -93,8 +93,9 @@ export async function fetchTenders({
 }
 
 export async function fetchTenderById(id: string): Promise<Tender> {
+  // hot + archiv (tenders_all) – detail archivované zakázky z odkazu/záložky
   const { data, error } = await supabase
-    .from('tenders')
+    .from('tenders_all')
     .select('*')
     .eq('hash_id', id)
     .single();
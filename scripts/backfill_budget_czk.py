@@ -0,0 +1,45 @@
+"""Backfill tenders.budget_czk (rozpočet přepočtený na CZK) pro existující řádky.
+
+    python scripts/backfill_budget_czk.py [--source NEN] [--batch-size 5000]
+
+Zpracuje řádky s rozpočtem a budget_czk IS NULL (po migraci sql/2026-10-09-budget-czk.sql jen cizí měny);
+kurzy z config/fx_rates.csv – po doplnění chybějící měny stačí spustit znovu;
+opakované spuštění je bezpečné.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from loguru import logger
+from dotenv import load_dotenv
+
+# --- bootstrap paths / env ----------------------------------------------------
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+load_dotenv(PROJECT_ROOT / ".env")
+
+from core.storage import DatabaseStorage  # noqa: E402
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Backfill tenders.budget_czk")
+    p.add_argument("--source", default=None, help="jen jeden source_id (default všechny)")
+    p.add_argument("--batch-size", type=int, default=5000)
+    args = p.parse_args()
+
+    dsn = os.getenv("SUPABASE_DSN", "").strip() or os.getenv("SUPABASE_DSN_POOLER", "").strip()
+    if not dsn:
+        logger.error("SUPABASE_DSN environment variable not set")
+        return 2
+    n = DatabaseStorage(dsn).fill_budget_czk(args.source, batch_size=args.batch_size)
+    logger.info(f"✅ Backfill done: {n} tenders updated")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""End-to-end zátěžový test: NENAdapter → (volitelně) lokální Postgres proti NEN stand-in serveru.
+
+Reportuje propustnost (details/sec), latence HTTP (p50/p95/p99/max) a rychlost
+zápisu do DB pro všechny tři fáze (raw insert, upsert tenders, sync z raw).
+
+    python scripts/nen_loadtest.py --pages 5 --latency-ms 10-40 --burst-every 200 --burst-length 5
+    python scripts/nen_loadtest.py --url http://127.0.0.1:8765 --dsn postgresql://localhost/vz_test
+    python scripts/nen_loadtest.py --dsn postgresql://localhost/vz_test --queue-workers 4
+
+S --queue-workers se detaily stahují přes frontu crawl_jobs (core/worker.py): seznam zařadí
+tento proces, detaily zpracuje N samostatných worker procesů proti stejné DB.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import yaml
+from loguru import logger
+
+from adapters.nen import NENAdapter
+from core.storage import DatabaseStorage
+from core.worker import enqueue_list
+
+import nen_standin
+
+
+class LatencyRecorder:
+    """Obalí HttpFetcher.get_text a měří latenci každého volání (vč. retry a sleepu)."""
+
+    def __init__(self, fetcher: Any) -> None:
+        self._inner = fetcher.get_text
+        self._lock = threading.Lock()
+        self.samples: List[float] = []
+        self.failures = 0
+        fetcher.get_text = self  # type: ignore[method-assign]
+
+    def __call__(self, url: str, **kwargs: Any) -> str:
+        t0 = time.perf_counter()
+        try:
+            return self._inner(url, **kwargs)
+        except Exception:
+            with self._lock:
+                self.failures += 1
+            raise
+        finally:
+            with self._lock:
+                self.samples.append(time.perf_counter() - t0)
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = min(len(s) - 1, max(0, int(round(q / 100.0 * (len(s) - 1)))))
+    return s[k]
+
+
+def _timed(fn, *args) -> tuple[Any, float]:
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def ensure_source(storage: DatabaseStorage, source_id: str) -> None:
+    """Lokální DB nemusí mít seednutý zdroj adaptéru (FK z raw_data/tenders)."""
+    with storage.get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "INSERT INTO sources (id, name, url) VALUES (%s, %s, %s) ON CONFLICT (id) DO NOTHING",
+                (source_id, f"{source_id} (load test)", "http://127.0.0.1/"),
+            )
+        conn.commit()
+
+
+def _adapter_config(base_url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        "base_url": base_url,
+        "max_pages": args.pages,
+        "max_detail_per_run": args.max_details,
+        "detail_log_every": 10**9,
+        "delay_min": args.delay_min,
+        "delay_max": args.delay_max,
+        "max_retries": args.max_retries,
+        "backoff_base": args.backoff_base,
+    }
+
+
+def run_queue_loadtest(base_url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Seznam → crawl_jobs v tomto procesu, detaily v N worker procesech (python -m core.worker)."""
+    cfg = _adapter_config(base_url, args)
+    adapter = NENAdapter(config=cfg)
+    storage = DatabaseStorage(args.dsn)
+    ensure_source(storage, adapter.source_id)
+    with storage.get_connection() as conn:  # lokální test DB: vždy od prázdné fronty
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM crawl_jobs WHERE source_id = %s", (adapter.source_id,))
+        conn.commit()
+
+    enq, enqueue_s = _timed(enqueue_list, adapter, storage)
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False, encoding="utf-8") as f:
+        yaml.safe_dump({"sources": {"nen": cfg}}, f)
+        cfg_path = f.name
+    cmd = [sys.executable, "-m", "core.worker", "work", "--source", "nen", "--config", cfg_path,
+           "--dsn", args.dsn, "--batch-size", str(args.queue_batch), "--lease", "60",
+           "--retry-delay", "1", "--until-empty"]
+    t0 = time.perf_counter()
+    try:
+        procs = [subprocess.Popen(cmd, cwd=PROJECT_ROOT) for _ in range(args.queue_workers)]
+        codes = [p.wait() for p in procs]
+    finally:
+        os.unlink(cfg_path)
+    work_s = time.perf_counter() - t0
+
+    depth = storage.crawl_queue_depth(adapter.source_id)
+    done = depth.get("done", 0)
+    return {
+        "pages_scraped": enq["pages"],
+        "jobs_enqueued": enq["enqueued"],
+        "enqueue_seconds": round(enqueue_s, 3),
+        "queue_workers": args.queue_workers,
+        "worker_exit_codes": codes,
+        "jobs_done": done,
+        "jobs_failed": depth.get("failed", 0),
+        "jobs_left": depth.get("pending", 0) + depth.get("running", 0),
+        "work_seconds": round(work_s, 3),
+        "details_per_sec": round(done / work_s, 2) if work_s else 0.0,
+    }
+
+
+def run_loadtest(base_url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    adapter = NENAdapter(config=_adapter_config(base_url, args))
+    recorder = LatencyRecorder(adapter.fetcher)
+
+    result, scrape_s = _timed(adapter.fetch_tenders)
+    details = result.stats.get("details_fetched", 0)
+    report: Dict[str, Any] = {
+        "pages_scraped": result.stats.get("pages_scraped", 0),
+        "details_fetched": details,
+        "errors": len(result.errors),
+        "http_requests": len(recorder.samples),
+        "http_failures": recorder.failures,
+        "scrape_seconds": round(scrape_s, 3),
+        "details_per_sec": round(details / scrape_s, 2) if scrape_s else 0.0,
+        "latency_p50_ms": round(percentile(recorder.samples, 50) * 1000, 1),
+        "latency_p95_ms": round(percentile(recorder.samples, 95) * 1000, 1),
+        "latency_p99_ms": round(percentile(recorder.samples, 99) * 1000, 1),
+        "latency_max_ms": round(max(recorder.samples, default=0.0) * 1000, 1),
+    }
+
+    if args.dsn:
+        storage = DatabaseStorage(args.dsn)
+        ensure_source(storage, adapter.source_id)
+        raw_inserted, raw_s = _timed(storage.insert_raw_batch, result.raw_records)
+        (t_new, t_upd), upsert_s = _timed(storage.upsert_tenders, result.tender_units)
+        synced, sync_s = _timed(storage.sync_tenders_from_raw)
+        report.update({
+            "raw_inserted": raw_inserted,
+            "raw_rows_per_sec": round(len(result.raw_records) / raw_s, 1) if raw_s else 0.0,
+            "tenders_new": t_new,
+            "tenders_updated": t_upd,
+            "upsert_rows_per_sec": round(len(result.tender_units) / upsert_s, 1) if upsert_s else 0.0,
+            "synced_from_raw": synced,
+            "sync_seconds": round(sync_s, 3),
+        })
+    return report
+
+
+def main() -> int:
+    p = nen_standin.build_arg_parser()
+    p.description = "Zátěžový test NENAdapter proti lokálnímu stand-in serveru"
+    p.set_defaults(port=0, pages=3)
+    p.add_argument("--url", help="URL již běžícího stand-in serveru (jinak se spustí vlastní)")
+    p.add_argument("--dsn", default=os.getenv("LOADTEST_DSN"), help="lokální Postgres; bez něj se DB fáze přeskočí")
+    p.add_argument("--max-details", type=int, default=10**6)
+    p.add_argument("--delay-min", type=float, default=0.0)
+    p.add_argument("--delay-max", type=float, default=0.0)
+    p.add_argument("--max-retries", type=int, default=3)
+    p.add_argument("--backoff-base", type=float, default=0.6)
+    p.add_argument("--queue-workers", type=int, default=0,
+                   help="detaily přes frontu crawl_jobs v N worker procesech (vyžaduje --dsn)")
+    p.add_argument("--queue-batch", type=int, default=20, help="velikost dávky workeru")
+    args = p.parse_args()
+    if args.queue_workers and not args.dsn:
+        p.error("--queue-workers requires --dsn (workery sdílí frontu v Postgresu)")
+
+    logger.remove()
+    logger.add(sys.stderr, level=os.getenv("LOG_LEVEL", "WARNING"))
+
+    server: Optional[Any] = None
+    base_url = args.url
+    if not base_url:
+        server, _state, base_url = nen_standin.start_in_thread(nen_standin.config_from_args(args), args.host, args.port)
+    try:
+        report = run_queue_loadtest(base_url, args) if args.queue_workers else run_loadtest(base_url, args)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    width = max(len(k) for k in report)
+    for k, v in report.items():
+        print(f"{k:<{width}}  {v}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
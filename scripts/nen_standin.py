@@ -0,0 +1,348 @@
+"""Lokální stand-in NEN serveru pro ladění rychlosti a zátěžové testy.
+
+Servíruje stránkovaný seznam zakázek (HTML kostra převzatá z nen_list.html)
+a syntetické detaily. Latence, chybovost, dávky 429 a počet stránek jsou
+konfigurovatelné, takže lze ladit concurrency/rate-limit bez zatěžování NEN.
+
+    python scripts/nen_standin.py --port 8765 --pages 20 --latency-ms 20-80 --error-rate 0.02
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import html
+import random
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+TEMPLATE_PATH = PROJECT_ROOT / "nen_list.html"
+
+_TBODY_PAT = re.compile(r'(<tbody class="gov-table__body">)(.*?)(</tbody>)', re.S)
+_LIST_PAT = re.compile(r"^/verejne-zakazky(?:/p:vz:page=(\d+))?/?$")
+_DETAIL_PAT = re.compile(r"^/verejne-zakazky/detail-zakazky/(N\d{3}-\d{2}-V(\d{8}))/?$")
+_FILE_PAT = re.compile(r"^/file/stahnout/([\w.-]+)$")
+_RANGE_PAT = re.compile(r"^bytes=(\d+)-$")
+
+_STATUSES = ["Neukončen", "Zadán", "Zrušeno", "Ukončen", "Ukončení plnění"]
+_BUYERS = [
+    "Ministerstvo obrany", "Hlavní město Praha", "Statutární město Brno",
+    "Ředitelství silnic a dálnic ČR", "Správa železnic, státní organizace",
+    "Fakultní nemocnice Olomouc", "Kraj Vysočina", "Město Tábor",
+]
+_REGIONS = ["Hlavní město Praha", "Jihomoravský kraj", "Olomoucký kraj", "Kraj Vysočina", "Jihočeský kraj"]
+_CPV = ["45000000", "45210000", "45233140", "33100000", "72000000", "79410000", "90910000", "34144900"]
+_PROCEDURES = ["Otevřené řízení", "Zjednodušené podlimitní řízení", "Veřejná zakázka malého rozsahu"]
+
+
+@dataclass
+class StandinConfig:
+    pages: int = 10
+    rows_per_page: int = 50
+    latency_min_ms: float = 0.0
+    latency_max_ms: float = 0.0
+    error_rate: float = 0.0
+    burst_every: int = 0          # každý N-tý request spustí dávku 429
+    burst_length: int = 0         # kolik requestů v dávce dostane 429
+    retry_after: int = 1
+    attachments: int = 3
+    attachment_kb: int = 256      # velikost syntetické přílohy
+    seed: int = 42
+
+
+# ------------------------- syntetická data -----------------------------------
+
+def _rng_for(key: str, seed: int) -> random.Random:
+    digest = hashlib.sha256(f"{seed}|{key}".encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def _external_id(n: int) -> str:
+    return f"N006/25/V{n:08d}"
+
+
+def _row_number(page: int, idx: int, rows_per_page: int) -> int:
+    return 10_000_000 + (page - 1) * rows_per_page + idx
+
+
+def _list_row(n: int, seed: int) -> str:
+    rng = _rng_for(f"row-{n}", seed)
+    ext = _external_id(n)
+    slug = ext.replace("/", "-")
+    title = html.escape(f"Syntetická zakázka {n} – {rng.choice(['oprava', 'dodávka', 'servis', 'výstavba'])}")
+    status = rng.choice(_STATUSES)
+    buyer = html.escape(rng.choice(_BUYERS))
+    deadline = (date(2025, 1, 1) + timedelta(days=rng.randint(0, 540))).strftime("%d. %m. %Y") + " 10:00"
+    return (
+        '<tr class="gov-table__row">'
+        '<td class="gov-table__cell gov-table__cell u-hide--tablet gov-table__row-controls">'
+        f'<a class="gov-link" href="/verejne-zakazky/detail-zakazky/{slug}">'
+        '<span class="gov-table__row-button-text">Detail</span></a></td>'
+        f'<td class="gov-table__cell gov-table__cell--second" title="{ext}">{ext}</td>'
+        f'<td class="gov-table__cell" title="{title}">{title}</td>'
+        f'<td class="gov-table__cell" title="{status}">{status}</td>'
+        f'<td class="gov-table__cell" title="{buyer}">{buyer}</td>'
+        f'<td class="gov-table__cell gov-table__cell--last" title="{deadline}">{deadline}</td>'
+        '<td class="gov-table__cell gov-table__cell--narrow gov-table__cell u-display-block u-hide--from-tablet '
+        'gov-table__row-controls" style="display:none;visibility:hidden"></td>'
+        "</tr>"
+    )
+
+
+def _detail_page(slug: str, n: int, cfg: StandinConfig) -> str:
+    rng = _rng_for(f"row-{n}", cfg.seed)
+    status = rng.choice(_STATUSES)
+    budget = f"{rng.randint(50, 50_000) * 1000:,}".replace(",", " ") + ",00"
+    cpv = sorted(set(rng.sample(_CPV, k=rng.randint(1, 3))))
+    atts = "".join(
+        f'<li><a href="/file/stahnout/{slug}-{i}.pdf">Příloha {i}.pdf</a></li>'
+        for i in range(1, cfg.attachments + 1)
+    )
+    # výplň, aby velikost stránky odpovídala reálnému detailu (~100 kB)
+    filler = "<p>" + ("Lorem ipsum dolor sit amet. " * 40) + "</p>"
+    return f"""<!DOCTYPE html>
+<html lang="cs"><head><meta charset="utf-8">
+<meta name="description" content="Detail zakázky {html.escape(_external_id(n))}">
+<title>Detail zakázky | NEN stand-in</title></head>
+<body>
+<div class="gov-grid-tile" title="Předpokládaná hodnota (bez DPH)">
+  <h3>Předpokládaná hodnota (bez DPH)</h3><p class="text gov-note" title="{budget} Kč">{budget} Kč</p>
+</div>
+<div class="gov-grid-tile" title="Měna"><h3>Měna</h3><p>CZK</p></div>
+<table>
+  <tr><th>Aktuální stav ZP</th><td>{status}</td></tr>
+  <tr><th>Druh zadávacího řízení</th><td>{rng.choice(_PROCEDURES)}</td></tr>
+  <tr><th>Hlavní místo plnění</th><td>{rng.choice(_REGIONS)}</td></tr>
+  <tr><th>Kód z číselníku CPV</th><td>{", ".join(cpv)}</td></tr>
+  <tr><th>Popis předmětu</th><td>Syntetický popis předmětu zakázky {n}.</td></tr>
+</table>
+<ul class="attachments">{atts}</ul>
+{filler * 8}
+</body></html>"""
+
+
+def _attachment_body(name: str, cfg: StandinConfig) -> bytes:
+    """Deterministický obsah přílohy. Příloha č. 1 je u všech zakázek stejná (obchodní podmínky) → dedup."""
+    key = "shared-terms" if name.endswith("-1.pdf") else name
+    block = hashlib.sha256(f"{cfg.seed}:{key}".encode()).digest() * 32
+    size = cfg.attachment_kb * 1024
+    return (block * (size // len(block) + 1))[:size]
+
+
+class _Template:
+    """Kostra list stránky z nen_list.html (načtená jednou)."""
+
+    def __init__(self, path: Path) -> None:
+        self.head, self.tail = "<html><body><table class=\"gov-table\"><tbody class=\"gov-table__body\">", \
+            "</tbody></table></body></html>"
+        if path.exists():
+            text = path.read_text(encoding="utf-8")
+            m = _TBODY_PAT.search(text)
+            if m:
+                self.head = text[:m.end(1)]
+                self.tail = text[m.start(3):]
+
+    def render(self, rows: str) -> str:
+        return self.head + rows + self.tail
+
+
+# ------------------------- server --------------------------------------------
+
+class StandinState:
+    """Sdílený stav serveru (počítadla pro 429 dávky a statistiky)."""
+
+    def __init__(self, cfg: StandinConfig) -> None:
+        self.cfg = cfg
+        self.template = _Template(TEMPLATE_PATH)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.burst_left = 0
+        self.status_counts: dict[int, int] = {}
+        self.rng = random.Random(cfg.seed)
+
+    def next_fault(self) -> Optional[int]:
+        """Rozhodne, zda tento request selže (429/500) – podle konfigurace."""
+        with self.lock:
+            self.requests += 1
+            if self.burst_left > 0:
+                self.burst_left -= 1
+                return 429
+            if self.cfg.burst_every and self.requests % self.cfg.burst_every == 0:
+                self.burst_left = max(0, self.cfg.burst_length - 1)
+                return 429
+            if self.cfg.error_rate and self.rng.random() < self.cfg.error_rate:
+                return 500
+        return None
+
+    def count(self, status: int) -> None:
+        with self.lock:
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+    def render_list(self, page: int) -> Optional[str]:
+        if page < 1 or page > self.cfg.pages:
+            return None
+        rows = "".join(
+            _list_row(_row_number(page, i, self.cfg.rows_per_page), self.cfg.seed)
+            for i in range(self.cfg.rows_per_page)
+        )
+        return self.template.render(rows)
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    server_version = "nen-standin/0.1"
+    state: StandinState  # nastavuje make_server
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002 – signatura z BaseHTTPRequestHandler
+        pass
+
+    def _send(self, status: int, body: str = "", headers: Optional[dict] = None) -> None:
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+        self.state.count(status)
+
+    def _send_file(self, name: str) -> None:
+        """Příloha s ETag/Last-Modified, podmíněným GET (304) a Range/If-Range (206/416)."""
+        data = _attachment_body(name, self.state.cfg)
+        etag = '"' + hashlib.sha256(data).hexdigest()[:16] + '"'
+        headers = {"ETag": etag, "Last-Modified": "Mon, 06 Oct 2025 08:00:00 GMT", "Accept-Ranges": "bytes"}
+        if self.headers.get("If-None-Match") == etag:
+            status, body = 304, b""
+        else:
+            status, body = 200, data
+            m = _RANGE_PAT.match(self.headers.get("Range", ""))
+            if_range = self.headers.get("If-Range")
+            if m and (if_range is None or if_range in (etag, headers["Last-Modified"])):
+                start = int(m.group(1))
+                if start >= len(data):
+                    status, body = 416, b""
+                    headers["Content-Range"] = f"bytes */{len(data)}"
+                else:
+                    status, body = 206, data[start:]
+                    headers["Content-Range"] = f"bytes {start}-{len(data) - 1}/{len(data)}"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+        self.state.count(status)
+
+    def do_GET(self) -> None:  # noqa: N802 – API BaseHTTPRequestHandler
+        cfg = self.state.cfg
+        if cfg.latency_max_ms > 0:
+            time.sleep(random.uniform(cfg.latency_min_ms, cfg.latency_max_ms) / 1000.0)
+
+        fault = self.state.next_fault()
+        if fault == 429:
+            self._send(429, "Too Many Requests", {"Retry-After": str(cfg.retry_after)})
+            return
+        if fault == 500:
+            self._send(500, "Internal Server Error")
+            return
+
+        path = self.path.split("?", 1)[0]
+        m = _LIST_PAT.match(path)
+        if m:
+            body = self.state.render_list(int(m.group(1) or 1))
+            self._send(200, body) if body is not None else self._send(404, "Not Found")
+            return
+        m = _DETAIL_PAT.match(path)
+        if m:
+            self._send(200, _detail_page(m.group(1), int(m.group(2)), cfg))
+            return
+        m = _FILE_PAT.match(path)
+        if m:
+            self._send_file(m.group(1))
+            return
+        self._send(404, "Not Found")
+
+
+def make_server(cfg: StandinConfig, host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingHTTPServer, StandinState]:
+    """Vytvoří server (port=0 → volný port); spuštění je na volajícím."""
+    state = StandinState(cfg)
+    handler = type("BoundStandinHandler", (StandinHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server, state
+
+
+def start_in_thread(cfg: StandinConfig, host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingHTTPServer, StandinState, str]:
+    """Spustí server na pozadí a vrátí (server, state, base_url)."""
+    server, state = make_server(cfg, host, port)
+    threading.Thread(target=server.serve_forever, name="nen-standin", daemon=True).start()
+    h, p = server.server_address[:2]
+    return server, state, f"http://{h}:{p}"
+
+
+def parse_range(text: str) -> Tuple[float, float]:
+    """'20-80' → (20.0, 80.0); '50' → (50.0, 50.0)."""
+    lo, _, hi = text.partition("-")
+    return float(lo), float(hi or lo)
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Lokální stand-in NEN serveru")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--pages", type=int, default=10)
+    p.add_argument("--rows-per-page", type=int, default=50)
+    p.add_argument("--latency-ms", default="0", help="např. '20-80' (uniformně) nebo '50'")
+    p.add_argument("--error-rate", type=float, default=0.0, help="podíl odpovědí 500 (0..1)")
+    p.add_argument("--burst-every", type=int, default=0, help="každý N-tý request spustí dávku 429")
+    p.add_argument("--burst-length", type=int, default=0, help="délka dávky 429")
+    p.add_argument("--retry-after", type=int, default=1)
+    p.add_argument("--attachments", type=int, default=3)
+    p.add_argument("--attachment-kb", type=int, default=256)
+    p.add_argument("--seed", type=int, default=42)
+    return p
+
+
+def config_from_args(args: argparse.Namespace) -> StandinConfig:
+    lat_min, lat_max = parse_range(args.latency_ms)
+    return StandinConfig(
+        pages=args.pages,
+        rows_per_page=args.rows_per_page,
+        latency_min_ms=lat_min,
+        latency_max_ms=lat_max,
+        error_rate=args.error_rate,
+        burst_every=args.burst_every,
+        burst_length=args.burst_length,
+        retry_after=args.retry_after,
+        attachments=args.attachments,
+        attachment_kb=args.attachment_kb,
+        seed=args.seed,
+    )
+
+
+def main() -> int:
+    args = build_arg_parser().parse_args()
+    server, state = make_server(config_from_args(args), args.host, args.port)
+    print(f"NEN stand-in listening on http://{args.host}:{server.server_address[1]} "
+          f"({state.cfg.pages} pages × {state.cfg.rows_per_page} rows)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served {state.requests} requests, status counts: {state.status_counts}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,22 @@
+"""Ruční (pře)štítkování zakázek kategoriemi – obal nad `python -m core.labeler`.
+
+    python scripts/run_labeling.py [--source NEN] [--batch-size 2000] [--limit 50000] [--dry-run]
+
+Zpracuje jen zakázky bez štítků, změněné od posledního štítkování nebo štítkované starší
+verzí config/labels.yaml; opakované spuštění je bezpečné.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+# --- bootstrap paths / env ----------------------------------------------------
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.labeler import main  # noqa: E402
+
+
+if __name__ == "__main__":
+    sys.exit(main())
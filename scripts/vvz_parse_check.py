@@ -0,0 +1,32 @@
+"""Quick sanity check pro VVZ bulk adaptér nad lokálními fixture soubory (bez DB a sítě)."""
+
+import sys
+from pathlib import Path
+
+# Přidej projekt root do Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from adapters.vvz import VVZAdapter
+from loguru import logger
+
+
+def main(argv: list[str]) -> bool:
+    """Projde feedy (default scripts/fixtures/vvz_sample.*) a vypíše první záznamy."""
+    feeds = argv or [str(project_root / "scripts" / "fixtures" / "vvz_sample.*")]
+    adapter = VVZAdapter({"feed_paths": feeds, "batch_size": 2})
+
+    total = 0
+    for i, chunk in enumerate(adapter.iter_results(), start=1):
+        logger.info(f"Batch {i}: {len(chunk.tender_units)} units, stats={chunk.stats}, errors={chunk.errors[:3]}")
+        for unit in chunk.tender_units[:2]:
+            logger.info(f"  {unit.external_id}: {unit.title[:50]} | {unit.buyer} | {unit.deadline} | "
+                        f"{unit.budget_value} {unit.currency} | cpv={unit.cpv} | {unit.status}")
+        total += len(chunk.tender_units)
+
+    logger.info(f"Total records: {total}")
+    return total > 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main(sys.argv[1:]) else 1)
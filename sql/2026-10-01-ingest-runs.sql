@@ -0,0 +1,27 @@
+-- ledger běhů ingestu (přežije rotaci logů; podklad pro detekci výkonnostních regresí)
+CREATE TABLE IF NOT EXISTS ingest_runs (
+  id               BIGSERIAL PRIMARY KEY,
+  source_id        TEXT NOT NULL,
+  status           TEXT NOT NULL DEFAULT 'running',   -- running | ok | failed
+  started_at       TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  finished_at      TIMESTAMPTZ,
+  duration_seconds NUMERIC,
+  host             TEXT,
+  config           JSONB NOT NULL DEFAULT '{}',       -- snapshot sekce ze sources.yaml
+  stage_seconds    JSONB NOT NULL DEFAULT '{}',       -- {"fetch": 812.4, "insert_raw": 3.1, ...}
+  http_requests    INTEGER,
+  http_retries     INTEGER,
+  http_bytes       BIGINT,
+  pages_scraped    INTEGER,
+  details_fetched  INTEGER,
+  raw_inserted     INTEGER,
+  tenders_new      INTEGER,
+  tenders_updated  INTEGER,
+  synced_from_raw  INTEGER,
+  errors           INTEGER,
+  details_per_sec  NUMERIC,
+  error_message    TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_ingest_runs_source_started
+  ON ingest_runs (source_id, started_at DESC);
@@ -0,0 +1,17 @@
+-- stažené přílohy: stav podle URL, obsah v content-addressed úložišti (data/attachments/ab/cd/<sha256>)
+CREATE TABLE IF NOT EXISTS attachment_files (
+  url           TEXT PRIMARY KEY,
+  source_id     TEXT NOT NULL,
+  external_id   TEXT NOT NULL,
+  name          TEXT,
+  sha256        CHAR(64) NOT NULL,          -- hash obsahu = cesta v úložišti
+  size_bytes    BIGINT NOT NULL,
+  etag          TEXT,
+  last_modified TEXT,                       -- hlavička Last-Modified tak, jak přišla (pro If-Modified-Since)
+  content_type  TEXT,
+  fetched_at    TIMESTAMPTZ,                -- poslední skutečné stažení
+  checked_at    TIMESTAMPTZ NOT NULL DEFAULT NOW()  -- poslední kontrola (i 304)
+);
+
+CREATE INDEX IF NOT EXISTS ix_attachment_files_tender ON attachment_files (source_id, external_id);
+CREATE INDEX IF NOT EXISTS ix_attachment_files_sha ON attachment_files (sha256);
@@ -0,0 +1,23 @@
+-- detekce téměř-duplicitních zakázek (core/dedup.py): MinHash podpisy + LSH pásy
+ALTER TABLE tenders ADD COLUMN IF NOT EXISTS dedup_cluster_id TEXT;
+CREATE INDEX IF NOT EXISTS idx_tenders_dedup_cluster ON tenders (dedup_cluster_id);
+-- hledání zakázek změněných od posledního výpočtu podpisu
+CREATE INDEX IF NOT EXISTS idx_tenders_updated_at ON tenders (updated_at);
+
+CREATE TABLE IF NOT EXISTS tender_signatures (
+  source_id   TEXT NOT NULL,
+  external_id TEXT NOT NULL,
+  minhash     BIGINT[] NOT NULL,          -- NUM_PERM hodnot
+  text_fp     TEXT NOT NULL,              -- sha1 normalizovaného názvu|kupujícího
+  computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (source_id, external_id)
+);
+
+CREATE TABLE IF NOT EXISTS tender_lsh_bands (
+  band        SMALLINT NOT NULL,
+  bucket      BIGINT NOT NULL,
+  source_id   TEXT NOT NULL,
+  external_id TEXT NOT NULL,
+  PRIMARY KEY (band, bucket, source_id, external_id)
+);
+CREATE INDEX IF NOT EXISTS idx_lsh_bands_tender ON tender_lsh_bands (source_id, external_id);
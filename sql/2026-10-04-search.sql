@@ -0,0 +1,80 @@
+-- fulltext nad tenders: unaccent + jednoduchá česká konfigurace, GIN nad generovaným tsvector,
+-- trigramy pro podřetězce/prefixy a RPC search_tenders (řazení podle relevance)
+CREATE EXTENSION IF NOT EXISTS unaccent;
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- unaccent() je STABLE (závisí na search_path) → IMMUTABLE obálka s pevným slovníkem,
+-- aby šla použít v indexech a generovaných sloupcích
+CREATE OR REPLACE FUNCTION public.f_unaccent(text)
+RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$;
+
+-- Postgres nemá vestavěný český stemmer (snowball) → simple + unaccent;
+-- skloňování řeší search_tender_query (ořez koncovek + prefixový dotaz)
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'czech_unaccent') THEN
+    CREATE TEXT SEARCH CONFIGURATION public.czech_unaccent (COPY = pg_catalog.simple);
+    ALTER TEXT SEARCH CONFIGURATION public.czech_unaccent
+      ALTER MAPPING FOR asciiword, asciihword, hword_asciipart, word, hword, hword_part
+      WITH public.unaccent, pg_catalog.simple;
+  END IF;
+END $$;
+
+-- generovaný sloupec: přepočítá se při každém INSERT/UPDATE řádku (upsert_tenders, sync_tenders_from_raw),
+-- beze změn v ingestu; no-op upserty (IS DISTINCT FROM) řádek nepřepisují
+ALTER TABLE tenders ADD COLUMN IF NOT EXISTS search_tsv tsvector
+  GENERATED ALWAYS AS (
+    setweight(to_tsvector('public.czech_unaccent'::regconfig, coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('public.czech_unaccent'::regconfig, coalesce(buyer, '')), 'B') ||
+    setweight(to_tsvector('public.czech_unaccent'::regconfig, coalesce(description, '')), 'C')
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_tenders_search_tsv ON tenders USING GIN (search_tsv);
+-- fallback pro podřetězce ("LIKE '%...%'") a překlepy (similarity)
+CREATE INDEX IF NOT EXISTS idx_tenders_title_trgm
+  ON tenders USING GIN (public.f_unaccent(lower(title)) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_tenders_buyer_trgm
+  ON tenders USING GIN (public.f_unaccent(lower(coalesce(buyer, ''))) gin_trgm_ops);
+
+-- 'opravy mostů Praha' → 'oprav:* & most:* & prah:*'
+-- lehký český "stemmer": u slov delších než 4 znaky ořízne běžnou pádovou koncovku;
+-- slovo, ze kterého by zbyly méně než 2 znaky ('ovych'), zůstane celé (prázdné ':*' = chyba to_tsquery)
+CREATE OR REPLACE FUNCTION public.search_tender_query(q text)
+RETURNS tsquery
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$
+  SELECT to_tsquery('public.czech_unaccent'::regconfig, coalesce(string_agg(
+           CASE WHEN length(st.s) >= 2 THEN st.s ELSE w END || ':*',
+           ' & '), ''))
+  FROM regexp_split_to_table(public.f_unaccent(lower(coalesce(q, ''))), '[^0-9a-z]+') AS w,
+       LATERAL (SELECT CASE WHEN length(w) > 4
+                            THEN regexp_replace(w, '(ovych|ovymi|ovemu|ove|ovy|ich|ech|ami|emi|ach|um|ou|em|mi|a|e|i|o|u|y)$', '')
+                            ELSE w END) AS st(s)
+  WHERE w <> ''
+$$;
+
+-- RPC: SETOF tenders → PostgREST na výsledek aplikuje další filtry (.in, .gte, …) i range()
+CREATE OR REPLACE FUNCTION public.search_tenders(q text)
+RETURNS SETOF tenders
+LANGUAGE sql STABLE PARALLEL SAFE
+AS $$
+  WITH query AS (
+    SELECT public.search_tender_query(q) AS tsq,
+           replace(replace(public.f_unaccent(lower(trim(q))), '%', '\%'), '_', '\_') AS plain
+  )
+  SELECT t.*
+  FROM tenders t, query
+  WHERE query.plain <> ''
+    AND (
+      t.search_tsv @@ query.tsq
+      OR public.f_unaccent(lower(t.title)) LIKE '%' || query.plain || '%'
+      OR public.f_unaccent(lower(coalesce(t.buyer, ''))) LIKE '%' || query.plain || '%'
+    )
+  ORDER BY ts_rank_cd(t.search_tsv, query.tsq) DESC,
+           similarity(public.f_unaccent(lower(t.title)), query.plain) DESC,
+           t.external_id
+$$;
+
+GRANT EXECUTE ON FUNCTION public.search_tenders(text) TO anon, authenticated;
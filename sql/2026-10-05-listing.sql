@@ -0,0 +1,114 @@
+-- výpis zakázek: keyset (seek) stránkování místo OFFSET + odhad počtu z plánovače místo COUNT(*)
+
+-- kompozitní indexy odpovídající řazení (sort sloupec, external_id jako tie-breaker)
+CREATE INDEX IF NOT EXISTS idx_tenders_deadline_ext   ON tenders (deadline, external_id);
+CREATE INDEX IF NOT EXISTS idx_tenders_created_ext    ON tenders (created_at, external_id);
+CREATE INDEX IF NOT EXISTS idx_tenders_budget_ext     ON tenders (budget_value, external_id);
+
+-- WHERE pro filtry výpisu (sdílí list_tenders i tenders_count_estimate)
+CREATE OR REPLACE FUNCTION public.tenders_filter_sql(
+  statuses      text[]  DEFAULT NULL,
+  regions       text[]  DEFAULT NULL,
+  cpv           text[]  DEFAULT NULL,
+  budget_min    numeric DEFAULT NULL,
+  budget_max    numeric DEFAULT NULL,
+  deadline_from date    DEFAULT NULL,
+  deadline_to   date    DEFAULT NULL
+)
+RETURNS text
+LANGUAGE plpgsql IMMUTABLE
+AS $$
+DECLARE
+  w text := 'TRUE';
+BEGIN
+  IF cardinality(statuses) > 0 THEN w := w || format(' AND status = ANY(%L::text[])', statuses); END IF;
+  IF cardinality(regions)  > 0 THEN w := w || format(' AND region = ANY(%L::text[])', regions); END IF;
+  IF cardinality(cpv)      > 0 THEN w := w || format(' AND cpv && %L::text[]', cpv); END IF;
+  IF budget_min    IS NOT NULL THEN w := w || format(' AND budget_value >= %L::numeric', budget_min); END IF;
+  IF budget_max    IS NOT NULL THEN w := w || format(' AND budget_value <= %L::numeric', budget_max); END IF;
+  IF deadline_from IS NOT NULL THEN w := w || format(' AND deadline >= %L::date', deadline_from); END IF;
+  IF deadline_to   IS NOT NULL THEN w := w || format(' AND deadline <= %L::date', deadline_to); END IF;
+  RETURN w;
+END $$;
+
+-- Jedna stránka výpisu. Kurzor = (after_value, after_id) posledního řádku předchozí stránky;
+-- řádky s NULL v řadicím sloupci jdou na konec (after_null = kurzor už je mezi nimi).
+-- Nejdřív seek přes ne-NULL hodnoty, zbytek stránky se doplní z NULL části – obojí po indexu (sloupec, external_id).
+CREATE OR REPLACE FUNCTION public.list_tenders(
+  sort_field    text    DEFAULT 'created_at',
+  sort_dir      text    DEFAULT 'desc',
+  after_value   text    DEFAULT NULL,
+  after_id      text    DEFAULT NULL,
+  after_null    boolean DEFAULT false,
+  lim           integer DEFAULT 30,
+  statuses      text[]  DEFAULT NULL,
+  regions       text[]  DEFAULT NULL,
+  cpv           text[]  DEFAULT NULL,
+  budget_min    numeric DEFAULT NULL,
+  budget_max    numeric DEFAULT NULL,
+  deadline_from date    DEFAULT NULL,
+  deadline_to   date    DEFAULT NULL
+)
+RETURNS SETOF tenders
+LANGUAGE plpgsql STABLE
+AS $$
+DECLARE
+  col   text;
+  typ   text;
+  dir   text := CASE WHEN lower(sort_dir) = 'asc' THEN 'ASC' ELSE 'DESC' END;
+  cmp   text := CASE WHEN lower(sort_dir) = 'asc' THEN '>' ELSE '<' END;
+  filt  text := public.tenders_filter_sql(statuses, regions, cpv, budget_min, budget_max, deadline_from, deadline_to);
+  got   integer := 0;
+BEGIN
+  CASE sort_field
+    WHEN 'deadline'     THEN col := 'deadline';     typ := 'date';
+    WHEN 'budget_value' THEN col := 'budget_value'; typ := 'numeric';
+    ELSE                     col := 'created_at';   typ := 'timestamptz';
+  END CASE;
+  lim := least(greatest(coalesce(lim, 30), 1), 200);
+
+  IF NOT after_null THEN
+    RETURN QUERY EXECUTE format(
+      'SELECT * FROM tenders WHERE %s AND %I IS NOT NULL %s ORDER BY %I %s, external_id %s LIMIT %s',
+      filt, col,
+      CASE WHEN after_id IS NULL THEN ''
+           ELSE format('AND (%I, external_id) %s (%L::%s, %L)', col, cmp, after_value, typ, after_id) END,
+      col, dir, dir, lim);
+    GET DIAGNOSTICS got = ROW_COUNT;
+    IF got >= lim THEN
+      RETURN;
+    END IF;
+    after_id := NULL;  -- NULL část od začátku
+  END IF;
+
+  RETURN QUERY EXECUTE format(
+    'SELECT * FROM tenders WHERE %s AND %I IS NULL %s ORDER BY external_id %s LIMIT %s',
+    filt, col,
+    CASE WHEN after_id IS NULL THEN '' ELSE format('AND external_id %s %L', cmp, after_id) END,
+    dir, lim - got);
+END $$;
+
+-- Odhad počtu řádků pro filtry z plánovače (EXPLAIN) – O(1) místo COUNT(*) přes celou tabulku
+CREATE OR REPLACE FUNCTION public.tenders_count_estimate(
+  statuses      text[]  DEFAULT NULL,
+  regions       text[]  DEFAULT NULL,
+  cpv           text[]  DEFAULT NULL,
+  budget_min    numeric DEFAULT NULL,
+  budget_max    numeric DEFAULT NULL,
+  deadline_from date    DEFAULT NULL,
+  deadline_to   date    DEFAULT NULL
+)
+RETURNS bigint
+LANGUAGE plpgsql STABLE
+AS $$
+DECLARE
+  plan json;
+BEGIN
+  EXECUTE 'EXPLAIN (FORMAT JSON) SELECT 1 FROM tenders WHERE '
+          || public.tenders_filter_sql(statuses, regions, cpv, budget_min, budget_max, deadline_from, deadline_to)
+    INTO plan;
+  RETURN (plan -> 0 -> 'Plan' ->> 'Plan Rows')::bigint;
+END $$;
+
+GRANT EXECUTE ON FUNCTION public.list_tenders(text, text, text, text, boolean, integer, text[], text[], text[], numeric, numeric, date, date) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.tenders_count_estimate(text[], text[], text[], numeric, numeric, date, date) TO anon, authenticated;
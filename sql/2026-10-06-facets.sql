@@ -0,0 +1,93 @@
+-- předpočítané počty pro filtry (status, region, CPV divize, rozpočtové pásmo, týden lhůty)
+-- tender_facet_keys drží klíče, kterými řádek přispívá; refresh_tender_facets aplikuje jen rozdíly
+CREATE TABLE IF NOT EXISTS tender_facets (
+  facet      TEXT NOT NULL,                 -- status | region | cpv_division | budget_bucket | deadline_week
+  value      TEXT NOT NULL,
+  n          BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (facet, value)
+);
+
+CREATE TABLE IF NOT EXISTS tender_facet_keys (
+  source_id   TEXT NOT NULL,
+  external_id TEXT NOT NULL,
+  keys        TEXT[] NOT NULL,              -- 'facet:value'
+  computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (source_id, external_id)
+);
+
+-- facetové klíče jednoho řádku (NULL hodnoty nepřispívají)
+CREATE OR REPLACE FUNCTION public.tender_facet_keys_of(
+  p_status text, p_region text, p_cpv text[], p_budget numeric, p_deadline date
+)
+RETURNS text[]
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$
+  SELECT array_remove(ARRAY[
+      'status:' || lower(trim(p_status)),
+      'region:' || lower(trim(p_region)),
+      'budget_bucket:' || CASE
+          WHEN p_budget IS NULL       THEN NULL
+          WHEN p_budget < 500000      THEN '0-500k'
+          WHEN p_budget < 2000000     THEN '500k-2m'
+          WHEN p_budget < 10000000    THEN '2m-10m'
+          WHEN p_budget < 50000000    THEN '10m-50m'
+          ELSE '50m+' END,
+      'deadline_week:' || to_char(date_trunc('week', p_deadline), 'YYYY-MM-DD')
+    ], NULL)
+    || ARRAY(SELECT DISTINCT 'cpv_division:' || left(c, 2)
+             FROM unnest(coalesce(p_cpv, '{}')) AS c WHERE c ~ '^\d{2}')
+$$;
+
+-- Inkrementální refresh: zpracuje jen řádky změněné od posledního výpočtu klíčů
+-- (volitelně zúžené na zdroj a updated_at >= p_since) a přičte/odečte rozdíly.
+-- Vrací počet přepočítaných řádků. Bez parametrů = dohnání/backfill celé tabulky.
+CREATE OR REPLACE FUNCTION public.refresh_tender_facets(p_source text DEFAULT NULL, p_since timestamptz DEFAULT NULL)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  changed_rows integer;
+BEGIN
+  WITH changed AS (
+    SELECT t.source_id, t.external_id, k.keys AS old_keys,
+           public.tender_facet_keys_of(t.status, t.region, t.cpv, t.budget_value, t.deadline) AS new_keys
+    FROM tenders t
+    LEFT JOIN tender_facet_keys k ON k.source_id = t.source_id AND k.external_id = t.external_id
+    WHERE (p_source IS NULL OR t.source_id = p_source)
+      AND (p_since IS NULL OR t.updated_at >= p_since)
+      AND (k.source_id IS NULL OR k.computed_at < t.updated_at)
+  ), saved AS (
+    INSERT INTO tender_facet_keys (source_id, external_id, keys, computed_at)
+    SELECT source_id, external_id, new_keys, NOW() FROM changed
+    ON CONFLICT (source_id, external_id) DO UPDATE
+      SET keys = EXCLUDED.keys, computed_at = EXCLUDED.computed_at
+    RETURNING 1
+  ), delta AS (
+    SELECT key, sum(d) AS d
+    FROM (
+      SELECT unnest(new_keys) AS key, 1 AS d FROM changed
+      UNION ALL
+      SELECT unnest(old_keys), -1 FROM changed WHERE old_keys IS NOT NULL
+    ) x
+    GROUP BY key
+    HAVING sum(d) <> 0
+  ), applied AS (
+    INSERT INTO tender_facets (facet, value, n, updated_at)
+    SELECT split_part(key, ':', 1), substr(key, strpos(key, ':') + 1), d, NOW()
+    FROM delta
+    ORDER BY 1, 2                               -- stálé pořadí zámků při souběhu zdrojů
+    ON CONFLICT (facet, value) DO UPDATE
+      SET n = tender_facets.n + EXCLUDED.n, updated_at = EXCLUDED.updated_at
+    RETURNING 1
+  )
+  SELECT count(*) INTO changed_rows FROM changed;
+
+  DELETE FROM tender_facets WHERE n <= 0;
+  RETURN changed_rows;
+END $$;
+
+GRANT SELECT ON tender_facets TO anon, authenticated;
+
+-- backfill
+SELECT public.refresh_tender_facets();
@@ -0,0 +1,32 @@
+-- hierarchický CPV filtr: všechny nadřazené prefixy kódů zakázky (core/cpv.py) v jednom indexovaném poli
+-- "celé stavebnictví" = cpv_prefixes && '{45}', "třída 4523" = cpv_prefixes && '{4523}' → jeden GIN lookup
+ALTER TABLE tenders ADD COLUMN IF NOT EXISTS cpv_prefixes TEXT[];   -- NULL = zatím nespočteno
+CREATE INDEX IF NOT EXISTS idx_tenders_cpv_prefixes ON tenders USING GIN (cpv_prefixes);
+
+-- backfill: python scripts/backfill_cpv_prefixes.py (dopočítá řádky s cpv_prefixes IS NULL)
+
+-- filtr výpisu (list_tenders / tenders_count_estimate) přepnut z přesných kódů na prefixy
+CREATE OR REPLACE FUNCTION public.tenders_filter_sql(
+  statuses      text[]  DEFAULT NULL,
+  regions       text[]  DEFAULT NULL,
+  cpv           text[]  DEFAULT NULL,
+  budget_min    numeric DEFAULT NULL,
+  budget_max    numeric DEFAULT NULL,
+  deadline_from date    DEFAULT NULL,
+  deadline_to   date    DEFAULT NULL
+)
+RETURNS text
+LANGUAGE plpgsql IMMUTABLE
+AS $$
+DECLARE
+  w text := 'TRUE';
+BEGIN
+  IF cardinality(statuses) > 0 THEN w := w || format(' AND status = ANY(%L::text[])', statuses); END IF;
+  IF cardinality(regions)  > 0 THEN w := w || format(' AND region = ANY(%L::text[])', regions); END IF;
+  IF cardinality(cpv)      > 0 THEN w := w || format(' AND cpv_prefixes && %L::text[]', cpv); END IF;
+  IF budget_min    IS NOT NULL THEN w := w || format(' AND budget_value >= %L::numeric', budget_min); END IF;
+  IF budget_max    IS NOT NULL THEN w := w || format(' AND budget_value <= %L::numeric', budget_max); END IF;
+  IF deadline_from IS NOT NULL THEN w := w || format(' AND deadline >= %L::date', deadline_from); END IF;
+  IF deadline_to   IS NOT NULL THEN w := w || format(' AND deadline <= %L::date', deadline_to); END IF;
+  RETURN w;
+END $$;
@@ -0,0 +1,152 @@
+-- normalizovaný stav zakázky (enum) + parciální index pro "otevřené, končící brzy"
+DO $$
+BEGIN
+  CREATE TYPE tender_status AS ENUM ('open', 'closed', 'awarded', 'completed', 'cancelled');
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+ALTER TABLE tenders ADD COLUMN IF NOT EXISTS status_norm tender_status;
+
+-- zrcadlo core.normalize._STATUS_MAP (backfill, sync_tenders_from_raw pro starší raw payloady)
+CREATE OR REPLACE FUNCTION public.tender_status_from_label(label text)
+RETURNS tender_status
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$
+  SELECT CASE regexp_replace(lower(trim(label)), '\s+', ' ', 'g')
+    WHEN 'neukončen'       THEN 'open'
+    WHEN 'neukončeno'      THEN 'open'
+    WHEN 'ukončení plnění' THEN 'completed'
+    WHEN 'zadané'          THEN 'awarded'
+    WHEN 'zadán'           THEN 'awarded'
+    WHEN 'zadáno'          THEN 'awarded'
+    WHEN 'zrušené'         THEN 'cancelled'
+    WHEN 'zrušen'          THEN 'cancelled'
+    WHEN 'zrušeno'         THEN 'cancelled'
+    WHEN 'ukončen'         THEN 'closed'
+    WHEN 'ukončeno'        THEN 'closed'
+  END::tender_status
+$$;
+
+-- backfill: label z tenders, jinak z nejnovějšího detailu v raw_data
+UPDATE tenders t
+SET status_norm = s.norm
+FROM (
+  SELECT t2.source_id, t2.external_id,
+         tender_status_from_label(COALESCE(t2.status, (
+           SELECT NULLIF(r.payload->'detail'->>'status', '')
+           FROM raw_data r
+           WHERE r.source_id = t2.source_id AND r.external_id = t2.external_id
+             AND (r.payload->'detail') IS NOT NULL
+           ORDER BY r.last_seen DESC
+           LIMIT 1
+         ))) AS norm
+  FROM tenders t2
+  WHERE t2.status_norm IS NULL
+) s
+WHERE t.source_id = s.source_id AND t.external_id = s.external_id
+  AND s.norm IS NOT NULL;
+
+-- "otevřené zakázky končící brzy": range scan jen přes otevřené (malá část tabulky);
+-- (deadline, external_id) = stejný klíč jako keyset v list_tenders → index-only scan pro kurzor
+CREATE INDEX IF NOT EXISTS idx_tenders_open_deadline
+  ON tenders (deadline, external_id)
+  WHERE status_norm = 'open';
+CREATE INDEX IF NOT EXISTS idx_tenders_status_norm ON tenders (status_norm);
+
+-- filtr výpisu: stav podle status_norm (UI posílá hodnoty enumu)
+CREATE OR REPLACE FUNCTION public.tenders_filter_sql(
+  statuses      text[]  DEFAULT NULL,
+  regions       text[]  DEFAULT NULL,
+  cpv           text[]  DEFAULT NULL,
+  budget_min    numeric DEFAULT NULL,
+  budget_max    numeric DEFAULT NULL,
+  deadline_from date    DEFAULT NULL,
+  deadline_to   date    DEFAULT NULL
+)
+RETURNS text
+LANGUAGE plpgsql IMMUTABLE
+AS $$
+DECLARE
+  w text := 'TRUE';
+BEGIN
+  IF cardinality(statuses) > 0 THEN w := w || format(' AND status_norm = ANY(%L::tender_status[])', statuses); END IF;
+  IF cardinality(regions)  > 0 THEN w := w || format(' AND region = ANY(%L::text[])', regions); END IF;
+  IF cardinality(cpv)      > 0 THEN w := w || format(' AND cpv_prefixes && %L::text[]', cpv); END IF;
+  IF budget_min    IS NOT NULL THEN w := w || format(' AND budget_value >= %L::numeric', budget_min); END IF;
+  IF budget_max    IS NOT NULL THEN w := w || format(' AND budget_value <= %L::numeric', budget_max); END IF;
+  IF deadline_from IS NOT NULL THEN w := w || format(' AND deadline >= %L::date', deadline_from); END IF;
+  IF deadline_to   IS NOT NULL THEN w := w || format(' AND deadline <= %L::date', deadline_to); END IF;
+  RETURN w;
+END $$;
+
+-- facety: stav podle status_norm → přepočet všech klíčů
+CREATE OR REPLACE FUNCTION public.tender_facet_keys_of(
+  p_status text, p_region text, p_cpv text[], p_budget numeric, p_deadline date
+)
+RETURNS text[]
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$
+  SELECT array_remove(ARRAY[
+      'status:' || p_status,
+      'region:' || lower(trim(p_region)),
+      'budget_bucket:' || CASE
+          WHEN p_budget IS NULL       THEN NULL
+          WHEN p_budget < 500000      THEN '0-500k'
+          WHEN p_budget < 2000000     THEN '500k-2m'
+          WHEN p_budget < 10000000    THEN '2m-10m'
+          WHEN p_budget < 50000000    THEN '10m-50m'
+          ELSE '50m+' END,
+      'deadline_week:' || to_char(date_trunc('week', p_deadline), 'YYYY-MM-DD')
+    ], NULL)
+    || ARRAY(SELECT DISTINCT 'cpv_division:' || left(c, 2)
+             FROM unnest(coalesce(p_cpv, '{}')) AS c WHERE c ~ '^\d{2}')
+$$;
+
+CREATE OR REPLACE FUNCTION public.refresh_tender_facets(p_source text DEFAULT NULL, p_since timestamptz DEFAULT NULL)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  changed_rows integer;
+BEGIN
+  WITH changed AS (
+    SELECT t.source_id, t.external_id, k.keys AS old_keys,
+           public.tender_facet_keys_of(t.status_norm::text, t.region, t.cpv, t.budget_value, t.deadline) AS new_keys
+    FROM tenders t
+    LEFT JOIN tender_facet_keys k ON k.source_id = t.source_id AND k.external_id = t.external_id
+    WHERE (p_source IS NULL OR t.source_id = p_source)
+      AND (p_since IS NULL OR t.updated_at >= p_since)
+      AND (k.source_id IS NULL OR k.computed_at < t.updated_at)
+  ), saved AS (
+    INSERT INTO tender_facet_keys (source_id, external_id, keys, computed_at)
+    SELECT source_id, external_id, new_keys, NOW() FROM changed
+    ON CONFLICT (source_id, external_id) DO UPDATE
+      SET keys = EXCLUDED.keys, computed_at = EXCLUDED.computed_at
+    RETURNING 1
+  ), delta AS (
+    SELECT key, sum(d) AS d
+    FROM (
+      SELECT unnest(new_keys) AS key, 1 AS d FROM changed
+      UNION ALL
+      SELECT unnest(old_keys), -1 FROM changed WHERE old_keys IS NOT NULL
+    ) x
+    GROUP BY key
+    HAVING sum(d) <> 0
+  ), applied AS (
+    INSERT INTO tender_facets (facet, value, n, updated_at)
+    SELECT split_part(key, ':', 1), substr(key, strpos(key, ':') + 1), d, NOW()
+    FROM delta
+    ORDER BY 1, 2                               -- stálé pořadí zámků při souběhu zdrojů
+    ON CONFLICT (facet, value) DO UPDATE
+      SET n = tender_facets.n + EXCLUDED.n, updated_at = EXCLUDED.updated_at
+    RETURNING 1
+  )
+  SELECT count(*) INTO changed_rows FROM changed;
+
+  DELETE FROM tender_facets WHERE n <= 0;
+  RETURN changed_rows;
+END $$;
+
+-- klíče se změnily → facety postavit znovu
+TRUNCATE tender_facets, tender_facet_keys;
+SELECT public.refresh_tender_facets();
@@ -0,0 +1,147 @@
+-- rozpočet přepočtený na CZK (core/fx.py, kurzy z config/fx_rates.csv) → rozsahové filtry a řazení
+-- po B-tree indexu bez přepočtu v dotazu; budget_value/currency zůstávají v původní měně
+ALTER TABLE tenders ADD COLUMN IF NOT EXISTS budget_czk NUMERIC;   -- NULL = bez rozpočtu / neznámá měna
+
+-- CZK (a bez měny – ingest ji doplňuje jako CZK) přímo; ostatní měny: python scripts/backfill_budget_czk.py
+UPDATE tenders SET budget_czk = budget_value
+WHERE budget_czk IS NULL AND budget_value IS NOT NULL AND coalesce(currency, 'CZK') = 'CZK';
+
+CREATE INDEX IF NOT EXISTS idx_tenders_budget_czk_ext ON tenders (budget_czk, external_id);
+DROP INDEX IF EXISTS idx_tenders_budget_ext;
+
+-- filtr výpisu: rozpočet podle budget_czk (status_norm, cpv_prefixes beze změny)
+CREATE OR REPLACE FUNCTION public.tenders_filter_sql(
+  statuses      text[]  DEFAULT NULL,
+  regions       text[]  DEFAULT NULL,
+  cpv           text[]  DEFAULT NULL,
+  budget_min    numeric DEFAULT NULL,
+  budget_max    numeric DEFAULT NULL,
+  deadline_from date    DEFAULT NULL,
+  deadline_to   date    DEFAULT NULL
+)
+RETURNS text
+LANGUAGE plpgsql IMMUTABLE
+AS $$
+DECLARE
+  w text := 'TRUE';
+BEGIN
+  IF cardinality(statuses) > 0 THEN w := w || format(' AND status_norm = ANY(%L::tender_status[])', statuses); END IF;
+  IF cardinality(regions)  > 0 THEN w := w || format(' AND region = ANY(%L::text[])', regions); END IF;
+  IF cardinality(cpv)      > 0 THEN w := w || format(' AND cpv_prefixes && %L::text[]', cpv); END IF;
+  IF budget_min    IS NOT NULL THEN w := w || format(' AND budget_czk >= %L::numeric', budget_min); END IF;
+  IF budget_max    IS NOT NULL THEN w := w || format(' AND budget_czk <= %L::numeric', budget_max); END IF;
+  IF deadline_from IS NOT NULL THEN w := w || format(' AND deadline >= %L::date', deadline_from); END IF;
+  IF deadline_to   IS NOT NULL THEN w := w || format(' AND deadline <= %L::date', deadline_to); END IF;
+  RETURN w;
+END $$;
+
+-- řazení podle rozpočtu přes budget_czk (index (budget_czk, external_id)); kurzor nese budget_czk
+-- Jedna stránka výpisu. Kurzor = (after_value, after_id) posledního řádku předchozí stránky;
+-- řádky s NULL v řadicím sloupci jdou na konec (after_null = kurzor už je mezi nimi).
+-- Nejdřív seek přes ne-NULL hodnoty, zbytek stránky se doplní z NULL části – obojí po indexu (sloupec, external_id).
+CREATE OR REPLACE FUNCTION public.list_tenders(
+  sort_field    text    DEFAULT 'created_at',
+  sort_dir      text    DEFAULT 'desc',
+  after_value   text    DEFAULT NULL,
+  after_id      text    DEFAULT NULL,
+  after_null    boolean DEFAULT false,
+  lim           integer DEFAULT 30,
+  statuses      text[]  DEFAULT NULL,
+  regions       text[]  DEFAULT NULL,
+  cpv           text[]  DEFAULT NULL,
+  budget_min    numeric DEFAULT NULL,
+  budget_max    numeric DEFAULT NULL,
+  deadline_from date    DEFAULT NULL,
+  deadline_to   date    DEFAULT NULL
+)
+RETURNS SETOF tenders
+LANGUAGE plpgsql STABLE
+AS $$
+DECLARE
+  col   text;
+  typ   text;
+  dir   text := CASE WHEN lower(sort_dir) = 'asc' THEN 'ASC' ELSE 'DESC' END;
+  cmp   text := CASE WHEN lower(sort_dir) = 'asc' THEN '>' ELSE '<' END;
+  filt  text := public.tenders_filter_sql(statuses, regions, cpv, budget_min, budget_max, deadline_from, deadline_to);
+  got   integer := 0;
+BEGIN
+  CASE sort_field
+    WHEN 'deadline'     THEN col := 'deadline';     typ := 'date';
+    WHEN 'budget_value' THEN col := 'budget_czk';   typ := 'numeric';  -- řazení podle hodnoty v CZK
+    ELSE                     col := 'created_at';   typ := 'timestamptz';
+  END CASE;
+  lim := least(greatest(coalesce(lim, 30), 1), 200);
+
+  IF NOT after_null THEN
+    RETURN QUERY EXECUTE format(
+      'SELECT * FROM tenders WHERE %s AND %I IS NOT NULL %s ORDER BY %I %s, external_id %s LIMIT %s',
+      filt, col,
+      CASE WHEN after_id IS NULL THEN ''
+           ELSE format('AND (%I, external_id) %s (%L::%s, %L)', col, cmp, after_value, typ, after_id) END,
+      col, dir, dir, lim);
+    GET DIAGNOSTICS got = ROW_COUNT;
+    IF got >= lim THEN
+      RETURN;
+    END IF;
+    after_id := NULL;  -- NULL část od začátku
+  END IF;
+
+  RETURN QUERY EXECUTE format(
+    'SELECT * FROM tenders WHERE %s AND %I IS NULL %s ORDER BY external_id %s LIMIT %s',
+    filt, col,
+    CASE WHEN after_id IS NULL THEN '' ELSE format('AND external_id %s %L', cmp, after_id) END,
+    dir, lim - got);
+END $$;
+
+-- facety: rozpočtové pásmo podle budget_czk
+-- zámek 'tender_facets' sdílí s tier_tenders (sql/2026-10-14-tiering.sql): souběžný přesun do archivu
+-- by jinak mohl znovu vložit tender_facet_keys archivovaného řádku nebo odečíst jeho klíče dvakrát
+CREATE OR REPLACE FUNCTION public.refresh_tender_facets(p_source text DEFAULT NULL, p_since timestamptz DEFAULT NULL)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  changed_rows integer;
+BEGIN
+  PERFORM pg_advisory_xact_lock(hashtext('tender_facets'));
+  WITH changed AS (
+    SELECT t.source_id, t.external_id, k.keys AS old_keys,
+           public.tender_facet_keys_of(t.status_norm::text, t.region, t.cpv, t.budget_czk, t.deadline) AS new_keys
+    FROM tenders t
+    LEFT JOIN tender_facet_keys k ON k.source_id = t.source_id AND k.external_id = t.external_id
+    WHERE (p_source IS NULL OR t.source_id = p_source)
+      AND (p_since IS NULL OR t.updated_at >= p_since)
+      AND (k.source_id IS NULL OR k.computed_at < t.updated_at)
+  ), saved AS (
+    INSERT INTO tender_facet_keys (source_id, external_id, keys, computed_at)
+    SELECT source_id, external_id, new_keys, NOW() FROM changed
+    ON CONFLICT (source_id, external_id) DO UPDATE
+      SET keys = EXCLUDED.keys, computed_at = EXCLUDED.computed_at
+    RETURNING 1
+  ), delta AS (
+    SELECT key, sum(d) AS d
+    FROM (
+      SELECT unnest(new_keys) AS key, 1 AS d FROM changed
+      UNION ALL
+      SELECT unnest(old_keys), -1 FROM changed WHERE old_keys IS NOT NULL
+    ) x
+    GROUP BY key
+    HAVING sum(d) <> 0
+  ), applied AS (
+    INSERT INTO tender_facets (facet, value, n, updated_at)
+    SELECT split_part(key, ':', 1), substr(key, strpos(key, ':') + 1), d, NOW()
+    FROM delta
+    ORDER BY 1, 2                               -- stálé pořadí zámků při souběhu zdrojů
+    ON CONFLICT (facet, value) DO UPDATE
+      SET n = tender_facets.n + EXCLUDED.n, updated_at = EXCLUDED.updated_at
+    RETURNING 1
+  )
+  SELECT count(*) INTO changed_rows FROM changed;
+
+  DELETE FROM tender_facets WHERE n <= 0;
+  RETURN changed_rows;
+END $$;
+
+-- pásma se změnila → facety postavit znovu
+TRUNCATE tender_facets, tender_facet_keys;
+SELECT public.refresh_tender_facets();
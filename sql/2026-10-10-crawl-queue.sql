@@ -0,0 +1,25 @@
+-- fronta detailů pro distribuované workery (core/worker.py): producent vloží řádky seznamu,
+-- workery si berou dávky přes FOR UPDATE SKIP LOCKED s leasem; po vypršení leasu se job vrátí do fronty
+CREATE TABLE IF NOT EXISTS crawl_jobs (
+  id            BIGSERIAL PRIMARY KEY,
+  source_id     TEXT NOT NULL,
+  external_id   TEXT NOT NULL,
+  url           TEXT,                                   -- detail (NULL = jen řádek seznamu)
+  payload       JSONB NOT NULL,                         -- řádek seznamu pro adapter.fetch_record()
+  status        TEXT NOT NULL DEFAULT 'pending'
+                CHECK (status IN ('pending', 'running', 'done', 'failed')),
+  attempts      INTEGER NOT NULL DEFAULT 0,
+  max_attempts  INTEGER NOT NULL DEFAULT 5,
+  available_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),     -- backoff po chybě
+  locked_by     TEXT,                                   -- worker (host:pid)
+  lease_until   TIMESTAMPTZ,
+  last_error    TEXT,
+  created_at    TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  updated_at    TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  UNIQUE (source_id, external_id)
+);
+
+-- claim: jen čekající joby v pořadí id (malý parciální index, done/failed ho nenafukují)
+CREATE INDEX IF NOT EXISTS idx_crawl_jobs_pending ON crawl_jobs (source_id, id) WHERE status = 'pending';
+-- reaper: běžící joby s vypršelým leasem
+CREATE INDEX IF NOT EXISTS idx_crawl_jobs_lease ON crawl_jobs (lease_until) WHERE status = 'running';
@@ -0,0 +1,29 @@
+-- hlídací psi: uložená hledání a shody s novými/změněnými zakázkami (párování v core/alerts.py)
+CREATE TABLE IF NOT EXISTS alert_subscriptions (
+  id          BIGSERIAL PRIMARY KEY,
+  owner       TEXT NOT NULL,                    -- e-mail / id uživatele pro notifikace
+  name        TEXT,
+  cpv         TEXT[],                           -- CPV prefixy nebo celé kódy ("45", "4523", "45233140-2")
+  regions     TEXT[],
+  budget_min  NUMERIC,                          -- CZK (tenders.budget_czk)
+  budget_max  NUMERIC,
+  keywords    TEXT[],                           -- fráze; slova fráze musí být v názvu/popisu všechna
+  active      BOOLEAN NOT NULL DEFAULT TRUE,
+  created_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  updated_at  TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_alert_subscriptions_owner ON alert_subscriptions (owner);
+
+CREATE TABLE IF NOT EXISTS alert_matches (
+  subscription_id BIGINT NOT NULL REFERENCES alert_subscriptions(id) ON DELETE CASCADE,
+  source_id       TEXT NOT NULL,
+  external_id     TEXT NOT NULL,
+  matched_at      TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  notified_at     TIMESTAMPTZ,                  -- NULL = čeká na odeslání
+  PRIMARY KEY (subscription_id, source_id, external_id)
+);
+
+-- odesílání notifikací: neodeslané shody podle odběru
+CREATE INDEX IF NOT EXISTS idx_alert_matches_pending
+  ON alert_matches (subscription_id, matched_at) WHERE notified_at IS NULL;
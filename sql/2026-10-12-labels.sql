@@ -0,0 +1,22 @@
+-- kategorie zakázek (core/labeler.py, taxonomie config/labels.yaml)
+CREATE TABLE IF NOT EXISTS tender_labels (
+  source_id     TEXT NOT NULL,
+  external_id   TEXT NOT NULL,
+  labels        TEXT[] NOT NULL DEFAULT '{}',  -- klíče kategorií podle skóre (prázdné = nic nad prahem)
+  scores        JSONB NOT NULL DEFAULT '{}',   -- {kategorie: skóre}
+  hash_id       TEXT NOT NULL,                 -- tenders.hash_id v době štítkování
+  text_fp       TEXT NOT NULL,                 -- md5 title|description|cpv (tender_label_fp)
+  model_version TEXT NOT NULL,                 -- otisk labels.yaml
+  labeled_at    TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (source_id, external_id)
+);
+
+-- filtr/facety podle kategorie
+CREATE INDEX IF NOT EXISTS idx_tender_labels_labels ON tender_labels USING GIN (labels);
+
+-- otisk textu, ze kterého se štítkuje; stejný výraz v load_label_pending i při zápisu
+CREATE OR REPLACE FUNCTION tender_label_fp(title TEXT, description TEXT, cpv TEXT[])
+RETURNS TEXT LANGUAGE sql IMMUTABLE AS $$
+  SELECT md5(coalesce(title, '') || '|' || coalesce(description, '') || '|'
+             || coalesce(array_to_string(cpv, ','), ''));
+$$;
@@ -0,0 +1,84 @@
+-- outbox změn zakázek: trigger zapíše v téže transakci jako upsert_tenders / sync_tenders_from_raw
+-- kompaktní událost (které sledované sloupce se změnily + jejich nové hodnoty); konzumenti
+-- čtou dávky přes core/outbox.py s kurzorem v outbox_cursors
+CREATE TABLE IF NOT EXISTS tender_events (
+  id             BIGSERIAL PRIMARY KEY,
+  txid           XID8 NOT NULL DEFAULT pg_current_xact_id(),  -- pořadí čtení (txid, id), viz read_tender_events
+  source_id      TEXT NOT NULL,
+  external_id    TEXT NOT NULL,
+  hash_id        TEXT,
+  op             CHAR(1) NOT NULL,              -- I = nová zakázka, U = změna
+  changed_fields TEXT[] NOT NULL,               -- u I všechny vyplněné sledované sloupce
+  changes        JSONB,                         -- U: {sloupec: nová hodnota}; I: NULL (řádek je v tenders)
+  created_at     TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_tender_events_order ON tender_events (txid, id);
+CREATE INDEX IF NOT EXISTS idx_tender_events_created ON tender_events (created_at);
+
+CREATE TABLE IF NOT EXISTS outbox_cursors (
+  consumer   TEXT PRIMARY KEY,
+  last_txid  XID8 NOT NULL DEFAULT '0',
+  last_id    BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- sledované sloupce = obsah zakázky; odvozené (cpv_prefixes, budget_czk, dedup_cluster_id, updated_at)
+-- události negenerují, takže backfilly a fill_* nezahlcují konzumenty.
+--   INSERT: vždy (přesun tieringem funkce odbyde hned na začátku přes tenders.tiering)
+--   UPDATE: jen UPDATE OF sledovaných sloupců a jen když se opravdu liší (WHEN), jinak by každý
+--           UPDATE (fill_*, touch last_seen) počítal to_jsonb celého starého i nového řádku
+CREATE OR REPLACE FUNCTION public.tender_events_emit()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  tracked CONSTANT text[] := ARRAY['title', 'buyer', 'cpv', 'country', 'region', 'procedure_type',
+                                   'budget_value', 'currency', 'deadline', 'notice_url', 'attachments',
+                                   'status', 'status_norm', 'description', 'hash_id'];
+  n jsonb;
+  o jsonb;
+  fields text[];
+  diff jsonb;
+BEGIN
+  IF current_setting('tenders.tiering', true) = 'on' THEN
+    RETURN NULL;
+  END IF;
+  -- to_jsonb celých řádků až po levné kontrole
+  n := to_jsonb(NEW);
+  o := CASE WHEN TG_OP = 'UPDATE' THEN to_jsonb(OLD) END;
+  SELECT coalesce(array_agg(k ORDER BY k), '{}'), jsonb_object_agg(k, n -> k)
+    INTO fields, diff
+  FROM unnest(tracked) AS k
+  WHERE CASE WHEN o IS NULL THEN jsonb_typeof(n -> k) <> 'null'
+             ELSE (o -> k) IS DISTINCT FROM (n -> k) END;
+
+  IF o IS NOT NULL AND cardinality(fields) = 0 THEN
+    RETURN NULL;
+  END IF;
+  INSERT INTO tender_events (source_id, external_id, hash_id, op, changed_fields, changes)
+  VALUES (NEW.source_id, NEW.external_id, NEW.hash_id,
+          CASE WHEN o IS NULL THEN 'I' ELSE 'U' END, fields,
+          CASE WHEN o IS NULL THEN NULL ELSE diff END);
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_tender_events ON tenders;
+CREATE TRIGGER trg_tender_events
+  AFTER INSERT ON tenders
+  FOR EACH ROW EXECUTE FUNCTION public.tender_events_emit();
+
+DROP TRIGGER IF EXISTS trg_tender_events_upd ON tenders;
+CREATE TRIGGER trg_tender_events_upd
+  AFTER UPDATE OF title, buyer, cpv, country, region, procedure_type, budget_value, currency, deadline,
+                  notice_url, attachments, status, status_norm, description, hash_id ON tenders
+  FOR EACH ROW
+  WHEN ((OLD.title, OLD.buyer, OLD.cpv, OLD.country, OLD.region, OLD.procedure_type, OLD.budget_value,
+         OLD.currency, OLD.deadline, OLD.notice_url, OLD.attachments, OLD.status, OLD.status_norm,
+         OLD.description, OLD.hash_id)
+        IS DISTINCT FROM
+        (NEW.title, NEW.buyer, NEW.cpv, NEW.country, NEW.region, NEW.procedure_type, NEW.budget_value,
+         NEW.currency, NEW.deadline, NEW.notice_url, NEW.attachments, NEW.status, NEW.status_norm,
+         NEW.description, NEW.hash_id))
+  EXECUTE FUNCTION public.tender_events_emit();
@@ -0,0 +1,129 @@
+-- hot/cold tiering: uzavřené a dávno prošlé zakázky z tenders (hot, indexy v paměti)
+-- do tenders_archive (cold, jen PK + deadline/updated_at/hash_id); historické dotazy přes view tenders_all.
+-- Přesun dělá tier_tenders() (volá core/runner.py → DatabaseStorage.tier_tenders),
+-- upsert_tenders zapisuje do té vrstvy, kde řádek právě je.
+--
+-- POZOR: nový sloupec v tenders přidat i do tenders_archive a znovu vytvořit tenders_all.
+CREATE TABLE IF NOT EXISTS tenders_archive (
+  LIKE tenders INCLUDING DEFAULTS INCLUDING GENERATED,
+  PRIMARY KEY (source_id, external_id)
+);
+CREATE INDEX IF NOT EXISTS idx_tenders_archive_deadline ON tenders_archive (deadline);
+CREATE INDEX IF NOT EXISTS idx_tenders_archive_hash_id ON tenders_archive (hash_id);
+CREATE INDEX IF NOT EXISTS idx_tenders_archive_updated_at ON tenders_archive (updated_at);
+
+CREATE OR REPLACE VIEW tenders_all AS
+  SELECT *, 'hot'::text AS tier FROM tenders
+  UNION ALL
+  SELECT *, 'archive'::text AS tier FROM tenders_archive;
+
+GRANT SELECT ON tenders_all TO anon, authenticated;
+
+-- outbox: změny archivovaných řádků (upsert do archivu) jsou také události; samotný přesun
+-- mezi vrstvami ne (tier_tenders nastaví tenders.tiering = on jen pro svou transakci, viz
+-- tender_events_emit v sql/2026-10-13-outbox.sql); stejné triggery jako na tenders
+DROP TRIGGER IF EXISTS trg_tender_events ON tenders_archive;
+CREATE TRIGGER trg_tender_events
+  AFTER INSERT ON tenders_archive
+  FOR EACH ROW EXECUTE FUNCTION public.tender_events_emit();
+
+DROP TRIGGER IF EXISTS trg_tender_events_upd ON tenders_archive;
+CREATE TRIGGER trg_tender_events_upd
+  AFTER UPDATE OF title, buyer, cpv, country, region, procedure_type, budget_value, currency, deadline,
+                  notice_url, attachments, status, status_norm, description, hash_id ON tenders_archive
+  FOR EACH ROW
+  WHEN ((OLD.title, OLD.buyer, OLD.cpv, OLD.country, OLD.region, OLD.procedure_type, OLD.budget_value,
+         OLD.currency, OLD.deadline, OLD.notice_url, OLD.attachments, OLD.status, OLD.status_norm,
+         OLD.description, OLD.hash_id)
+        IS DISTINCT FROM
+        (NEW.title, NEW.buyer, NEW.cpv, NEW.country, NEW.region, NEW.procedure_type, NEW.budget_value,
+         NEW.currency, NEW.deadline, NEW.notice_url, NEW.attachments, NEW.status, NEW.status_norm,
+         NEW.description, NEW.hash_id))
+  EXECUTE FUNCTION public.tender_events_emit();
+
+-- Jedna dávka tieringu:
+--   archivace: lhůta prošlá před víc než p_grace_days dny, nebo konečný stav
+--              (closed/awarded/completed/cancelled) beze změny p_grace_days dní;
+--              facety (tender_facet_keys/tender_facets) se o přesunuté řádky rovnou sníží
+--   obnova:    archivovaný řádek změněný v posledních p_grace_days dnech (upsert do archivu),
+--              znovu otevřený a s lhůtou v okně → zpět do hot; facety dopočítá refresh_tender_facets
+--   úklid:     řádek, který souběžný upsert založil v hot během přesunu, vyhrává nad archivem
+-- Vrací (archived, restored); archived = p_batch → zbývá další dávka.
+-- Dávka drží zámek 'tender_facets' (jako refresh_tender_facets), facety se tak nepočítají souběžně.
+CREATE OR REPLACE FUNCTION public.tier_tenders(p_grace_days integer DEFAULT 30, p_batch integer DEFAULT 5000)
+RETURNS TABLE (archived integer, restored integer)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  cols text;
+  upd  text;
+BEGIN
+  PERFORM pg_advisory_xact_lock(hashtext('tender_facets'));
+  PERFORM set_config('tenders.tiering', 'on', true);
+  -- generované sloupce (search_tsv) se při vložení dopočítají
+  SELECT string_agg(quote_ident(column_name), ', ' ORDER BY ordinal_position) INTO cols
+  FROM information_schema.columns
+  WHERE table_schema = 'public' AND table_name = 'tenders' AND is_generated = 'NEVER';
+  SELECT string_agg(format('%1$I = EXCLUDED.%1$I', column_name), ', ') INTO upd
+  FROM information_schema.columns
+  WHERE table_schema = 'public' AND table_name = 'tenders' AND is_generated = 'NEVER'
+    AND column_name NOT IN ('source_id', 'external_id');
+
+  EXECUTE format($f$
+    WITH cand AS (
+      SELECT source_id, external_id FROM tenders
+      WHERE deadline < current_date - $1
+         OR (status_norm IN ('closed', 'awarded', 'completed', 'cancelled')
+             AND updated_at < NOW() - make_interval(days => $1))
+      LIMIT $2
+      FOR UPDATE SKIP LOCKED
+    ), moved AS (
+      DELETE FROM tenders t USING cand c
+      WHERE t.source_id = c.source_id AND t.external_id = c.external_id
+      RETURNING t.*
+    ), ins AS (
+      -- hot je novější než případná stará kopie v archivu
+      INSERT INTO tenders_archive (%1$s) SELECT %1$s FROM moved
+      ON CONFLICT (source_id, external_id) DO UPDATE SET %2$s
+      RETURNING 1
+    ), gone AS (
+      DELETE FROM tender_facet_keys k USING moved m
+      WHERE k.source_id = m.source_id AND k.external_id = m.external_id
+      RETURNING k.keys
+    ), delta AS (
+      SELECT key, count(*) AS d FROM gone, unnest(gone.keys) AS key GROUP BY key
+    ), applied AS (
+      UPDATE tender_facets f SET n = f.n - delta.d, updated_at = NOW()
+      FROM delta
+      WHERE f.facet = split_part(delta.key, ':', 1) AND f.value = substr(delta.key, strpos(delta.key, ':') + 1)
+      RETURNING 1
+    )
+    SELECT count(*)::int FROM moved
+  $f$, cols, upd) INTO archived USING p_grace_days, p_batch;
+
+  EXECUTE format($f$
+    WITH back AS (
+      DELETE FROM tenders_archive a
+      WHERE a.updated_at >= NOW() - make_interval(days => $1)
+        AND (a.deadline IS NULL OR a.deadline >= current_date - $1)
+        AND (a.status_norm IS NULL OR a.status_norm = 'open')
+      RETURNING a.*
+    ), ins AS (
+      INSERT INTO tenders (%1$s) SELECT %1$s FROM back
+      ON CONFLICT (source_id, external_id) DO NOTHING
+      RETURNING 1
+    )
+    SELECT count(*)::int FROM ins
+  $f$, cols) INTO restored USING p_grace_days;
+
+  DELETE FROM tenders_archive a
+  USING tenders t
+  WHERE t.created_at >= NOW() - interval '2 days'
+    AND a.source_id = t.source_id AND a.external_id = t.external_id;
+
+  DELETE FROM tender_facets WHERE n <= 0;
+  IF restored > 0 THEN
+    PERFORM public.refresh_tender_facets();
+  END IF;
+  RETURN NEXT;
+END $$;
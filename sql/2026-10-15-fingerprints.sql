@@ -0,0 +1,24 @@
+-- otisky obsahu zakázek pro klientský snapshot (DatabaseStorage.load_fingerprints):
+-- content_fp = otisk posledního upsertovaného obsahu (core/storage.py _tender_fp), last_seen = kdy
+-- zdroj zakázku naposledy vydal (i beze změny). Nezměněné řádky runner vůbec neposílá, jen jim
+-- hromadně posune last_seen; raw_data.last_seen už existuje (viz insert_raw_batch).
+--
+-- Řádky z doby před migrací mají content_fp NULL → první běh je pošle celé a upsert jim otisk doplní
+-- (bez posunu updated_at a bez události v outboxu – sledované sloupce se nemění).
+ALTER TABLE tenders ADD COLUMN IF NOT EXISTS content_fp TEXT;
+ALTER TABLE tenders ADD COLUMN IF NOT EXISTS last_seen TIMESTAMPTZ;
+ALTER TABLE tenders_archive ADD COLUMN IF NOT EXISTS content_fp TEXT;
+ALTER TABLE tenders_archive ADD COLUMN IF NOT EXISTS last_seen TIMESTAMPTZ;
+
+-- nové sloupce → view znovu (SELECT * se rozbalí při vytvoření, viz sql/2026-10-14-tiering.sql)
+DROP VIEW IF EXISTS tenders_all;
+CREATE VIEW tenders_all AS
+  SELECT *, 'hot'::text AS tier FROM tenders
+  UNION ALL
+  SELECT *, 'archive'::text AS tier FROM tenders_archive;
+
+GRANT SELECT ON tenders_all TO anon, authenticated;
+
+-- pro DISTINCT ON (external_id) … ORDER BY last_seen DESC v load_fingerprints
+CREATE INDEX IF NOT EXISTS idx_raw_data_source_external_seen
+  ON raw_data (source_id, external_id, last_seen DESC);
@@ -0,0 +1,45 @@
+-- region ve facetách je lower(trim(region)) (tender_facet_keys_of); filtr výpisu porovnával surový
+-- sloupec → klik na facet regionu nevracel nic. Obě strany teď porovnávají region_norm.
+-- POZOR (sql/2026-10-14-tiering.sql): sloupec i do tenders_archive a znovu vytvořit tenders_all.
+ALTER TABLE tenders ADD COLUMN IF NOT EXISTS region_norm TEXT
+  GENERATED ALWAYS AS (lower(trim(region))) STORED;
+ALTER TABLE tenders_archive ADD COLUMN IF NOT EXISTS region_norm TEXT
+  GENERATED ALWAYS AS (lower(trim(region))) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_tenders_region_norm ON tenders (region_norm);
+
+DROP VIEW IF EXISTS tenders_all;
+CREATE VIEW tenders_all AS
+  SELECT *, 'hot'::text AS tier FROM tenders
+  UNION ALL
+  SELECT *, 'archive'::text AS tier FROM tenders_archive;
+
+GRANT SELECT ON tenders_all TO anon, authenticated;
+
+-- filtr výpisu: region přes region_norm (vstup normalizovaný stejně jako facety)
+CREATE OR REPLACE FUNCTION public.tenders_filter_sql(
+  statuses      text[]  DEFAULT NULL,
+  regions       text[]  DEFAULT NULL,
+  cpv           text[]  DEFAULT NULL,
+  budget_min    numeric DEFAULT NULL,
+  budget_max    numeric DEFAULT NULL,
+  deadline_from date    DEFAULT NULL,
+  deadline_to   date    DEFAULT NULL
+)
+RETURNS text
+LANGUAGE plpgsql IMMUTABLE
+AS $$
+DECLARE
+  w text := 'TRUE';
+BEGIN
+  IF cardinality(statuses) > 0 THEN w := w || format(' AND status_norm = ANY(%L::tender_status[])', statuses); END IF;
+  IF cardinality(regions)  > 0 THEN
+    w := w || format(' AND region_norm = ANY(%L::text[])', ARRAY(SELECT lower(trim(r)) FROM unnest(regions) AS r));
+  END IF;
+  IF cardinality(cpv)      > 0 THEN w := w || format(' AND cpv_prefixes && %L::text[]', cpv); END IF;
+  IF budget_min    IS NOT NULL THEN w := w || format(' AND budget_czk >= %L::numeric', budget_min); END IF;
+  IF budget_max    IS NOT NULL THEN w := w || format(' AND budget_czk <= %L::numeric', budget_max); END IF;
+  IF deadline_from IS NOT NULL THEN w := w || format(' AND deadline >= %L::date', deadline_from); END IF;
+  IF deadline_to   IS NOT NULL THEN w := w || format(' AND deadline <= %L::date', deadline_to); END IF;
+  RETURN w;
+END $$;
@@ -0,0 +1,24 @@
+-- watermark inkrementálního refreshe facet per zdroj: posune se jen v transakci úspěšného refreshe,
+-- takže řádky běhu, jehož refresh selhal, dožene příští refresh (dřív se `since` bral ze startu běhu
+-- a po chybě se ztratil). Volá DatabaseStorage.refresh_source_facets (runner, worker).
+CREATE TABLE IF NOT EXISTS tender_facet_watermarks (
+  source_id    TEXT PRIMARY KEY,
+  refreshed_at TIMESTAMPTZ NOT NULL
+);
+
+-- rezerva na transakce ingestu, které začaly před watermarkem a commitly až po něm; už
+-- započtené řádky znovu nepřepočítá podmínka computed_at < updated_at v refresh_tender_facets
+CREATE OR REPLACE FUNCTION public.refresh_source_facets(p_source text, p_overlap interval DEFAULT '10 minutes')
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_since timestamptz;
+  n integer;
+BEGIN
+  SELECT refreshed_at INTO v_since FROM tender_facet_watermarks WHERE source_id = p_source FOR UPDATE;
+  n := public.refresh_tender_facets(p_source, v_since - p_overlap);  -- bez watermarku celý zdroj
+  INSERT INTO tender_facet_watermarks (source_id, refreshed_at) VALUES (p_source, NOW())
+  ON CONFLICT (source_id) DO UPDATE SET refreshed_at = EXCLUDED.refreshed_at;
+  RETURN n;
+END $$;
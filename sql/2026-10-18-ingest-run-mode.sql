@@ -0,0 +1,6 @@
+-- režim běhu (full | poll, core/daemon.py): malé inkrementální polly nesmí tvořit baseline
+-- regresního reportu plných běhů (core/ledger.py porovnává jen běhy stejného režimu)
+ALTER TABLE ingest_runs ADD COLUMN IF NOT EXISTS mode TEXT NOT NULL DEFAULT 'full';
+
+CREATE INDEX IF NOT EXISTS idx_ingest_runs_source_mode_started
+  ON ingest_runs (source_id, mode, started_at DESC);
@@ -0,0 +1,13 @@
+-- oprava cpv_prefixes kódů na úrovni oddílu končícího nulou (30000000, 50000000, 60000000, 70000000,
+-- 80000000, 90000000): core/cpv.py dřív z "80000000" ořezal nuly až na "8" a vrátil žádné prefixy,
+-- takže filtr cpv_prefixes && '{80}' tyto zakázky nenašel.
+-- Dotčené řádky se vrátí na NULL (= nespočteno) a dopočítá je
+--   python scripts/backfill_cpv_prefixes.py
+-- (nebo fill_cpv_prefixes v dalším běhu). Opakované spuštění je bezpečné: opravené řádky už oddíl mají.
+UPDATE tenders t SET cpv_prefixes = NULL
+WHERE t.cpv_prefixes IS NOT NULL
+  AND EXISTS (
+    SELECT 1 FROM unnest(t.cpv) AS c
+    WHERE btrim(c) ~ '^[0-9]0{7}(-[0-9])?$'
+      AND NOT (left(btrim(c), 2) = ANY (t.cpv_prefixes))
+  );
@@ -13,7 +13,12 @@ CREATE TABLE IF NOT EXISTS raw_data (
     source_id TEXT NOT NULL REFERENCES sources(id),
     external_id TEXT NOT NULL,
     fetched_at TIMESTAMPTZ DEFAULT NOW(),
-    payload JSONB NOT NULL
+    payload JSONB NOT NULL,
+    payload_kind TEXT,
+    payload_hash TEXT NOT NULL,
+    first_seen TIMESTAMPTZ DEFAULT NOW(),
+    last_seen TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE (source_id, external_id, payload_hash)
 );
 
 -- Tabulka normalizovaných zakázek
@@ -32,8 +37,11 @@ CREATE TABLE IF NOT EXISTS tenders (
     deadline DATE,
     notice_url TEXT,
     attachments JSONB DEFAULT '[]',
+    status TEXT,
+    description TEXT,
     created_at TIMESTAMPTZ DEFAULT NOW(),
-    updated_at TIMESTAMPTZ DEFAULT NOW()
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE (source_id, external_id)
 );
 
 -- Indexy pro výkon
@@ -10,9 +10,9 @@ export type TenderSort =
 
 export type TenderFilters = {
   q?: string;
-  statuses?: string[];
+  statuses?: string[];      // status_norm: "open" | "closed" | "awarded" | "completed" | "cancelled"
   regions?: string[];
-  cpv?: string[];           // očekává text[] sloupec (nebo uprav níž)
+  cpv?: string[];           // CPV prefixy (oddíl "45", třída "4523", …) nebo celé kódy
   budgetMin?: number;
   budgetMax?: number;
   deadlineFrom?: string;    // "YYYY-MM-DD"
@@ -21,35 +21,36 @@ export type TenderFilters = {
 
 const PAGE_SIZE = 30;
 
-function baseSelect() {
-  // Vyber si sloupce; "*" je nejjednodušší.
+function baseSelect(f: TenderFilters) {
+  // fulltext: RPC search_tenders (tsvector + unaccent, fallback trigram) vrací řádky tenders
+  // seřazené podle relevance; další filtry se aplikují na výsledek stejně jako u tabulky
+  const s = f.q?.trim();
+  if (s) return supabase.rpc("search_tenders", { q: s }, { count: "exact" }).select("*");
   return supabase.from("tenders").select("*", { count: "exact" });
 }
 
-function applyFilters(query: ReturnType<typeof baseSelect>, f: TenderFilters) {
-  let q = query;
+type TenderQuery = ReturnType<typeof baseSelect>;
 
-  // fulltext jednoduchý přes ilike title/buyer (OR)
-  if (f.q && f.q.trim()) {
-    const s = f.q.trim();
-    q = q.or(`title.ilike.%${s}%,buyer.ilike.%${s}%`);
-  }
+function applyFilters(query: TenderQuery, f: TenderFilters) {
+  let q = query;
 
+  // stav: hodnoty enumu status_norm (open | closed | awarded | completed | cancelled)
   if (f.statuses && f.statuses.length) {
-    q = q.in("status", f.statuses.map((s) => s.toLowerCase()));
+    q = q.in("status_norm", f.statuses);
   }
+  // region: region_norm = lower(trim(region)), stejná hodnota jako ve facetách (sql/2026-10-16-region-norm.sql)
   if (f.regions && f.regions.length) {
-    q = q.in("region", f.regions.map((s) => s.toLowerCase()));
+    q = q.in("region_norm", f.regions.map((s) => s.trim().toLowerCase()));
   }
 
-  // CPV: pokud máš v DB sloupec cpv (text[]), overlaps je ideál.
-  // Když máš string, přepni to na or(ilike) podle svých prefixů.
+  // CPV: prefixy libovolné úrovně ("45", "4523", celý kód) → cpv_prefixes (GIN, viz core/cpv.py)
   if (f.cpv && f.cpv.length) {
-    q = q.overlaps("cpv", f.cpv);
+    q = q.overlaps("cpv_prefixes", f.cpv);
   }
 
-  if (typeof f.budgetMin === "number") q = q.gte("budget_value", f.budgetMin);
-  if (typeof f.budgetMax === "number") q = q.lte("budget_value", f.budgetMax);
+  // rozpočet: budget_czk = budget_value přepočtená na CZK při ingestu (B-tree index, EUR řádky srovnatelné)
+  if (typeof f.budgetMin === "number") q = q.gte("budget_czk", f.budgetMin);
+  if (typeof f.budgetMax === "number") q = q.lte("budget_czk", f.budgetMax);
 
   if (f.deadlineFrom) q = q.gte("deadline", f.deadlineFrom);
   if (f.deadlineTo) q = q.lte("deadline", f.deadlineTo);
@@ -57,45 +58,113 @@ function applyFilters(query: ReturnType<typeof baseSelect>, f: TenderFilters) {
   return q;
 }
 
-function applySort(query: ReturnType<typeof baseSelect>, sort: TenderSort) {
-  if (sort.field === "created_at") {
-    return query.order("created_at", { ascending: sort.direction === "asc", nullsFirst: false });
-  }
-  if (sort.field === "deadline") {
-    return query.order("deadline", { ascending: sort.direction === "asc", nullsFirst: true });
-  }
-  if (sort.field === "budget_value") {
-    return query.order("budget_value", { ascending: sort.direction === "asc", nullsFirst: true });
-  }
-  return query.order("created_at", { ascending: false });
+// sloupec, podle kterého list_tenders skutečně řadí (rozpočet v CZK, ne v původní měně)
+const SORT_COLUMN: Record<TenderSort["field"], string> = {
+  created_at: "created_at",
+  deadline: "deadline",
+  budget_value: "budget_czk",
+};
+
+// kurzor keyset stránkování: řadicí hodnota + external_id posledního řádku
+type ListCursor = { value: string | null; id: string; isNull: boolean };
+type PageParam = { offset: number; cursor: ListCursor | null };
+
+type TendersPage = {
+  data: Tender[];
+  count?: number;          // jen první stránka
+  countEstimated?: boolean;
+  next?: PageParam;
+};
+
+function rpcFilters(f: TenderFilters) {
+  const arr = (xs?: string[], lower = false) =>
+    xs && xs.length ? (lower ? xs.map((s) => s.trim().toLowerCase()) : xs) : null;
+  return {
+    statuses: arr(f.statuses),
+    regions: arr(f.regions, true),
+    cpv: arr(f.cpv),
+    budget_min: typeof f.budgetMin === "number" ? f.budgetMin : null,
+    budget_max: typeof f.budgetMax === "number" ? f.budgetMax : null,
+    deadline_from: f.deadlineFrom || null,
+    deadline_to: f.deadlineTo || null,
+  };
+}
+
+// výpis bez hledání: RPC list_tenders (keyset na (sort sloupec, external_id)) + odhad počtu z plánovače
+async function fetchListPage(filters: TenderFilters, sort: TenderSort, page: PageParam): Promise<TendersPage> {
+  const f = rpcFilters(filters);
+  const c = page.cursor;
+  const [list, count] = await Promise.all([
+    supabase.rpc("list_tenders", {
+      sort_field: sort.field,
+      sort_dir: sort.direction,
+      after_value: c?.value ?? null,
+      after_id: c?.id ?? null,
+      after_null: c?.isNull ?? false,
+      lim: PAGE_SIZE,
+      ...f,
+    }),
+    c ? Promise.resolve(null) : supabase.rpc("tenders_count_estimate", f),
+  ]);
+  if (list.error) throw list.error;
+  if (count?.error) throw count.error;
+
+  const data = (list.data ?? []) as Tender[];
+  const last = data[data.length - 1] as (Tender & Record<string, unknown>) | undefined;
+  const value = last?.[SORT_COLUMN[sort.field]];
+  return {
+    data,
+    count: count ? Number(count.data ?? 0) : undefined,
+    countEstimated: true,
+    next: last && data.length === PAGE_SIZE
+      ? { offset: 0, cursor: { value: value == null ? null : String(value), id: last.external_id, isNull: value == null } }
+      : undefined,
+  };
+}
+
+// hledání: řazení podle relevance z RPC search_tenders → offset (výsledky jsou malé a omezené indexem)
+async function fetchSearchPage(filters: TenderFilters, page: PageParam): Promise<TendersPage> {
+  const q = applyFilters(baseSelect(filters), filters);
+  const { data, error, count } = await q.range(page.offset, page.offset + PAGE_SIZE - 1);
+  if (error) throw error;
+  const rows = (data ?? []) as Tender[];
+  const loaded = page.offset + rows.length;
+  return {
+    data: rows,
+    count: count ?? 0,
+    next: loaded < (count ?? 0) ? { offset: loaded, cursor: null } : undefined,
+  };
 }
 
 export function useInfiniteTenders(filters: TenderFilters, sort: TenderSort) {
   return useInfiniteQuery({
     queryKey: ["tenders", filters, sort],
-    initialPageParam: 0,
-    queryFn: async ({ pageParam }) => {
-      const offset = pageParam as number;
+    initialPageParam: { offset: 0, cursor: null } as PageParam,
+    queryFn: ({ pageParam }) =>
+      filters.q?.trim() ? fetchSearchPage(filters, pageParam) : fetchListPage(filters, sort, pageParam),
+    getNextPageParam: (lastPage) => lastPage.next,
+    refetchOnWindowFocus: false,
+    staleTime: 30_000,
+  });
+}
 
-      let q = baseSelect();
-      q = applyFilters(q, filters);
-      q = applySort(q, sort);
+export type FacetCounts = Record<string, { value: string; n: number }[]>;
 
-      const { data, error, count } = await q.range(offset, offset + PAGE_SIZE - 1);
+// předpočítané počty pro filtry (tender_facets, plní refresh_tender_facets po ingestu)
+export function useTenderFacets() {
+  return useQuery({
+    queryKey: ["tenders", "facets"],
+    queryFn: async () => {
+      const { data, error } = await supabase
+        .from("tender_facets")
+        .select("facet,value,n")
+        .order("n", { ascending: false });
       if (error) throw error;
-
-      return {
-        data: (data ?? []) as Tender[],
-        count: count ?? 0,
-        nextOffset: offset + PAGE_SIZE,
-      };
+      const out: FacetCounts = {};
+      for (const r of data ?? []) (out[r.facet] ??= []).push({ value: r.value, n: Number(r.n) });
+      return out;
     },
-    getNextPageParam: (lastPage, allPages) => {
-      const loaded = allPages.reduce((acc, p) => acc + p.data.length, 0);
-      return loaded < (lastPage.count ?? 0) ? lastPage.nextOffset : undefined;
-    },
-    refetchOnWindowFocus: false,
-    staleTime: 30_000,
+    staleTime: 5 * 60_000,
   });
 }
 
@@ -104,8 +173,9 @@ export function useTenderDetail(externalId?: string) {
     queryKey: ["tenders", "detail", externalId],
     enabled: !!externalId,
     queryFn: async () => {
+      // detail i pro archivované zakázky (hot + tenders_archive, sql/2026-10-14-tiering.sql)
       const { data, error } = await supabase
-        .from("tenders")
+        .from("tenders_all")
         .select("*")
         .eq("external_id", externalId!)
         .maybeSingle();
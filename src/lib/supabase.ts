@@ -22,18 +22,15 @@ export async function fetchTendersPage(params: {
   const sortField = "created_at"; // V1 server sort by created_at; others can be client-side
   const ascending = sort?.direction === "asc";
 
-  let query = supabase
-    .from("tenders")
-    .select("*", { count: includeCount ? "exact" : undefined })
+  // fulltext q over title + buyer + description (RPC search_tenders, see sql/2026-10-04-search.sql)
+  const q = filters?.q?.trim();
+  const count = includeCount ? "exact" : undefined;
+  let query = (q
+    ? supabase.rpc("search_tenders", { q }, { count }).select("*")
+    : supabase.from("tenders").select("*", { count }))
     .order(sortField, { ascending })
     .limit(PAGE_SIZE);
 
-  // fulltext q over title + buyer
-  if (filters?.q && filters.q.trim()) {
-    const q = filters.q.trim();
-    query = query.or(`title.ilike.%${q}%,buyer.ilike.%${q}%`);
-  }
-
   // cursor pagination by created_at
   if (cursor) {
     query = ascending ? query.gt("created_at", cursor) : query.lt("created_at", cursor);
@@ -5,7 +5,7 @@ import { ExternalLink, Globe, Info, Loader2, LoaderCircle, MapPin, Timer } from
 import { Drawer } from "vaul";
 
 import type { Tender } from "@/types/tender";
-import { useInfiniteTenders, type TenderFilters, type TenderSort } from "@/hooks/useTenders";
+import { useInfiniteTenders, useTenderFacets, type TenderFilters, type TenderSort } from "@/hooks/useTenders";
 import { useFilterStore, type Filters } from "@/lib/store";
 import { cn, formatCZK, parseDeadline } from "@/lib/utils";
 
@@ -230,6 +230,7 @@ namespace TendersPage {
 
     const allItems = useMemo(() => (data?.pages || []).flatMap((p) => p.data), [data?.pages]);
     const total = data?.pages?.[0]?.count ?? 0;
+    const totalApprox = data?.pages?.[0]?.countEstimated ? "cca " : "";
 
     // ⚠️ Když řadíme podle rozpočtu, vyřadíme záznamy s NULL rozpočtem (nechceme je v tomto režimu)
     const itemsToRender = useMemo(() => {
@@ -273,7 +274,7 @@ namespace TendersPage {
 
           <div className="text-sm text-slate-500">
             {status === "pending" && "Načítám…"}
-            {status === "success" && `${total.toLocaleString("cs-CZ")} záznamů`}
+            {status === "success" && `${totalApprox}${total.toLocaleString("cs-CZ")} záznamů`}
           </div>
 
           <div className="flex-1" />
@@ -314,9 +315,50 @@ namespace TendersPage {
     );
   }
 
+  // --- Nejčastější hodnoty facety s počty (z tender_facets) ---
+  const STATUS_OPTIONS = ["open", "awarded", "closed", "completed", "cancelled"];
+  const STATUS_LABELS: Record<string, string> = {
+    open: "Neukončené",
+    awarded: "Zadané",
+    closed: "Ukončené",
+    completed: "Ukončení plnění",
+    cancelled: "Zrušené",
+  };
+
+  const toggle = (xs: string[], v: string) => (xs.includes(v) ? xs.filter((x) => x !== v) : [...xs, v]);
+
+  function FacetChips(props: {
+    items?: { value: string; n: number }[];
+    selected: string[];
+    onToggle: (v: string) => void;
+    label?: (v: string) => string;
+  }) {
+    if (!props.items?.length) return null;
+    return (
+      <div className="flex flex-wrap gap-1">
+        {props.items.slice(0, 12).map((f) => (
+          <button
+            key={f.value}
+            type="button"
+            onClick={() => props.onToggle(f.value)}
+            className={cn(
+              "rounded-full border px-2 py-0.5 text-xs",
+              props.selected.includes(f.value)
+                ? "border-slate-900 bg-slate-900 text-white dark:border-slate-100 dark:bg-slate-100 dark:text-slate-900"
+                : "border-slate-300 dark:border-slate-700 hover:bg-slate-50 dark:hover:bg-slate-800",
+            )}
+          >
+            {props.label ? props.label(f.value) : f.value} <span className="opacity-60">{f.n.toLocaleString("cs-CZ")}</span>
+          </button>
+        ))}
+      </div>
+    );
+  }
+
   // --- Šuplík filtrů (vaul) ---
   function FiltersSheet() {
     const { sheetOpen, openSheet, statuses, regions, cpv, budgetMin, budgetMax, deadlineFrom, deadlineTo, set, syncToUrl } = useFilterStore();
+    const { data: facets } = useTenderFacets();
 
     const onApply = () => {
       syncToUrl();
@@ -331,20 +373,15 @@ namespace TendersPage {
             <h2 className="text-lg font-semibold">Filtry</h2>
 
             <div className="grid gap-2">
-              <label className="text-sm">Status (čárkou oddělené)</label>
-              <input
-                className="h-9 rounded-md border border-slate-300 dark:border-slate-700 bg-transparent px-2 text-sm"
-                value={statuses.join(",")}
-                onChange={(e) =>
-                  set({
-                    statuses: e.target.value
-                      .split(",")
-                      .map((s) => s.trim())
-                      .filter(Boolean)
-                      .map((s) => s.toLowerCase()),
-                  })
-                }
-                placeholder="Neukončen,Zadán,Zrušen…"
+              <label className="text-sm">Stav</label>
+              <FacetChips
+                items={STATUS_OPTIONS.map((value) => ({
+                  value,
+                  n: facets?.status?.find((f) => f.value === value)?.n ?? 0,
+                }))}
+                label={(v) => STATUS_LABELS[v] ?? v}
+                selected={statuses}
+                onToggle={(v) => set({ statuses: toggle(statuses, v) })}
               />
             </div>
 
@@ -364,6 +401,7 @@ namespace TendersPage {
                 }
                 placeholder="Praha, Jihomoravský kraj…"
               />
+              <FacetChips items={facets?.region} selected={regions} onToggle={(v) => set({ regions: toggle(regions, v) })} />
             </div>
 
             <div className="grid gap-2">
@@ -381,6 +419,7 @@ namespace TendersPage {
                 }
                 placeholder="4523, 3021…"
               />
+              <FacetChips items={facets?.cpv_division} selected={cpv} onToggle={(v) => set({ cpv: toggle(cpv, v) })} />
             </div>
 
             <div className="grid grid-cols-2 gap-2">
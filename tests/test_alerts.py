@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from core.alerts import AlertIndex, Subscription, _IntervalTree
+from core.models import TenderUnit
+
+
+def _unit(title="Zakázka", **kw):
+    return TenderUnit(source_id="TEST", external_id="1", title=title, country="CZ", **kw)
+
+
+def _stab(tree, x):
+    out = set()
+    tree.stab(x, out)
+    return out
+
+
+def test_interval_tree_matches_brute_force():
+    rnd = random.Random(7)
+    intervals = []
+    for i in range(300):
+        lo = rnd.choice([float("-inf"), rnd.uniform(0, 1000)])
+        hi = rnd.choice([float("inf"), lo + rnd.uniform(0, 300) if lo != float("-inf") else rnd.uniform(0, 1000)])
+        intervals.append((lo, hi, i))
+    tree = _IntervalTree(intervals)
+    for x in [rnd.uniform(-100, 1400) for _ in range(500)] + [lo for lo, _, _ in intervals[:50]]:
+        assert _stab(tree, x) == {i for lo, hi, i in intervals if lo <= x <= hi}
+
+
+def test_interval_tree_inclusive_bounds():
+    tree = _IntervalTree([(100.0, 200.0, 1), (200.0, 300.0, 2), (500.0, 500.0, 3)])
+    assert _stab(tree, 200.0) == {1, 2}
+    assert _stab(tree, 500.0) == {3}
+    assert _stab(tree, 99.99) == set()
+
+
+def test_budget_ranges_in_czk():
+    index = AlertIndex([
+        Subscription(id=1, budget_min=1_000_000),
+        Subscription(id=2, budget_max=500_000),
+        Subscription(id=3, budget_min=100_000, budget_max=2_000_000),
+        Subscription(id=4, budget_min=100_000, budget_max=2_000_000),  # stejné pásmo
+    ])
+    assert sorted(index.match(_unit(budget_value=1_500_000, currency="CZK"))) == [1, 3, 4]
+    assert sorted(index.match(_unit(budget_value=200_000))) == [2, 3, 4]
+    assert index.match(_unit()) == []  # bez rozpočtu
+
+
+def test_all_filled_criteria_must_match():
+    index = AlertIndex([Subscription(id=1, cpv=["45000000-7"], regions=["Praha"], keywords=["most"])])
+    base = dict(cpv=["45233140-2"], region="praha")
+    assert index.match(_unit("Oprava mostu", **base)) == [1]
+    assert index.match(_unit("Oprava silnice", **base)) == []
+    assert index.match(_unit("Oprava mostu", cpv=["45233140-2"], region="Brno")) == []
+    assert index.match(_unit("Oprava mostu", cpv=["71000000-8"], region="Praha")) == []
+
+
+@pytest.mark.parametrize("sub_cpv, unit_cpv, hit", [
+    ("80000000-4", "80100000-5", True),   # oddíl končící nulou
+    ("80", "80000000-4", True),
+    ("4523", "45233140-2", True),
+    ("45230000", "45233140-2", True),
+    ("45233000", "45230000-8", False),    # užší odběr nematchuje širší kód
+])
+def test_cpv_prefix_match(sub_cpv, unit_cpv, hit):
+    index = AlertIndex([Subscription(id=1, cpv=[sub_cpv])])
+    assert index.match(_unit(cpv=[unit_cpv])) == ([1] if hit else [])
+
+
+def test_keywords_stem_prefix_and_phrases():
+    index = AlertIndex([
+        Subscription(id=1, keywords=["mosty"]),
+        Subscription(id=2, keywords=["čistírna odpadních vod"]),
+        Subscription(id=3, keywords=["IT"]),
+    ])
+    assert index.match(_unit("Rekonstrukce mostů")) == [1]
+    assert index.match(_unit("Nová čistírna", description="odpadních vod obce")) == [2]
+    assert index.match(_unit("Nová čistírna kalů")) == []  # fráze = všechna slova
+    assert index.match(_unit("Dodávka IT techniky")) == [3]
+    assert index.match(_unit("Itinerář zájezdu")) == []  # krátký kmen jen celé slovo
+
+
+def test_empty_subscription_is_ignored():
+    index = AlertIndex([Subscription(id=1), Subscription(id=2, regions=[" "])])
+    assert len(index) == 0
+    assert index.match(_unit("Cokoli", region="Praha")) == []
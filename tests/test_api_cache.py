@@ -0,0 +1,126 @@
+import gzip
+import http.client
+import threading
+
+import pytest
+
+from core import api
+from core.api import APIServer, CachedResponse, ReadAPI, ResponseCache
+
+
+class FakeStorage:
+    def __init__(self, on_query=None):
+        self.facet_rows = [{"facet": "region", "value": "Praha", "n": 3}]
+        self.queries = 0
+        self.on_query = on_query
+
+    def load_tender_facets(self):
+        self.queries += 1
+        if self.on_query:
+            self.on_query()
+        return list(self.facet_rows)
+
+    def get_tender(self, source_id, external_id):
+        return None
+
+
+def _entry(payload="x", ttl=60.0):
+    return CachedResponse.build(200, {"v": payload}, ttl)
+
+
+def test_etag_depends_on_body_only():
+    a, b = _entry("a"), _entry("a", ttl=1)
+    assert a.etag == b.etag and a.etag.startswith('"') and a.etag.endswith('"')
+    assert _entry("b").etag != a.etag
+
+
+def test_gzip_only_for_large_bodies():
+    assert _entry("small").gz is None
+    big = _entry("x" * api.MIN_GZIP_BYTES)
+    assert gzip.decompress(big.gz) == big.body
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(api.time, "monotonic", lambda: now[0])
+    cache = ResponseCache(ttl=10)
+    cache.put("k", _entry(ttl=10), cache.generation)
+    assert cache.get("k") is not None
+    now[0] += 10
+    assert cache.get("k") is None
+    assert cache.stats() == {"entries": 0, "generation": 0, "hits": 1, "misses": 1, "invalidations": 0}
+
+
+def test_lru_eviction():
+    cache = ResponseCache(max_entries=2)
+    for k in "ab":
+        cache.put(k, _entry(k), cache.generation)
+    cache.get("a")  # a je teď nejnovější
+    cache.put("c", _entry("c"), cache.generation)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_put_from_stale_generation_is_dropped():
+    cache = ResponseCache()
+    generation = cache.generation
+    cache.invalidate("test")
+    cache.put("k", _entry(), generation)
+    assert cache.get("k") is None
+    cache.put("k", _entry(), cache.generation)
+    assert cache.get("k") is not None
+
+
+def test_cached_hit_and_miss():
+    storage = FakeStorage()
+    read = ReadAPI(storage, ResponseCache())
+    first, outcome = read.cached("/api/facets", {}, "/api/facets?")
+    assert outcome == "miss"
+    second, outcome = read.cached("/api/facets", {}, "/api/facets?")
+    assert outcome == "hit" and second is first
+    assert storage.queries == 1
+
+
+def test_invalidation_during_query_is_not_cached():
+    cache = ResponseCache()
+    read = ReadAPI(FakeStorage(on_query=lambda: cache.invalidate("commit")), cache)
+    read.cached("/api/facets", {}, "/api/facets?")
+    assert cache.get("/api/facets?", count=False) is None
+
+
+def test_errors_are_not_cached():
+    cache = ResponseCache()
+    entry, _ = ReadAPI(FakeStorage(), cache).cached("/api/tenders/NEN/1", {}, "/api/tenders/NEN/1?")
+    assert entry.status == 404
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.fixture
+def server():
+    srv = APIServer(("127.0.0.1", 0), ReadAPI(FakeStorage(), ResponseCache()))
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _get(srv, path, headers=None):
+    conn = http.client.HTTPConnection(*srv.server_address, timeout=5)
+    conn.request("GET", path, headers=headers or {})
+    resp = conn.getresponse()
+    body = resp.read()
+    conn.close()
+    return resp, body
+
+
+def test_if_none_match_returns_304(server):
+    resp, body = _get(server, "/api/facets")
+    assert resp.status == 200 and body
+    etag = resp.getheader("ETag")
+    resp, body = _get(server, "/api/facets", {"If-None-Match": etag})
+    assert resp.status == 304 and body == b""
+    server.api.cache.invalidate("test")
+    server.api.storage.facet_rows.append({"facet": "region", "value": "Brno", "n": 1})
+    resp, _ = _get(server, "/api/facets", {"If-None-Match": etag})
+    assert resp.status == 200 and resp.getheader("ETag") != etag
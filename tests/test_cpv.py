@@ -0,0 +1,44 @@
+import pytest
+
+from core.alerts import _cpv_key
+from core.cpv import cpv_ancestors, cpv_prefixes
+
+
+@pytest.mark.parametrize("code, division", [
+    ("30000000-9", "30"),
+    ("50000000-5", "50"),
+    ("60000000-8", "60"),
+    ("70000000-1", "70"),
+    ("80000000-4", "80"),
+    ("90000000-7", "90"),
+    ("45000000-7", "45"),
+])
+def test_division_level_code_keeps_two_digit_division(code, division):
+    assert cpv_ancestors(code) == [division, code[:8]]
+
+
+def test_full_hierarchy():
+    assert cpv_ancestors("45233140-2") == ["45", "452", "4523", "45233", "452331", "4523314", "45233140"]
+    assert cpv_ancestors("80100000-5") == ["80", "801", "80100000"]
+
+
+@pytest.mark.parametrize("code", ["", None, "4523", "45233140-22", "00000000", "99000000"])
+def test_invalid_or_unknown_division(code):
+    assert cpv_ancestors(code) == []
+
+
+def test_prefixes_union_sorted():
+    assert cpv_prefixes(["80000000-4", "80100000-5", "bad"]) == ["80", "80000000", "801", "80100000"]
+
+
+@pytest.mark.parametrize("code, key", [
+    ("30000000", "30"),
+    ("80000000-4", "80"),
+    ("45000000-7", "45"),
+    ("45230000", "4523"),
+    ("4523", "4523"),
+    ("00000000", None),
+    ("x", None),
+])
+def test_alert_cpv_key(code, key):
+    assert _cpv_key(code) == key
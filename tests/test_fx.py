@@ -0,0 +1,59 @@
+import os
+from datetime import date
+
+from core.fx import FxTable, rates, to_czk
+
+CSV = """# currency,valid_from,czk_per_unit
+currency,valid_from,czk_per_unit
+EUR,2026-01-01,24.32
+EUR,2026-07-01,"25,10"
+usd,,22.5
+GBP,2026-01-01,0
+XYZ,2026-01-01,abc
+"""
+
+
+def _table(tmp_path, text=CSV):
+    path = tmp_path / "fx_rates.csv"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_rate_by_validity_date(tmp_path):
+    table = FxTable.load(_table(tmp_path))
+    assert table.rate("EUR", date(2026, 3, 1)) == 24.32
+    assert table.rate("EUR", date(2026, 7, 1)) == 25.10
+    assert table.rate("eur ", date(2027, 1, 1)) == 25.10
+    assert table.rate("EUR", date(2025, 12, 31)) is None  # před prvním kurzem
+
+
+def test_undated_rate_and_invalid_rows(tmp_path):
+    table = FxTable.load(_table(tmp_path))
+    assert table.rate("USD", date(1990, 1, 1)) == 22.5
+    assert table.currencies() == ["EUR", "USD"]  # nulový / nečíselný kurz vynechán
+
+
+def test_to_czk(tmp_path):
+    table = FxTable.load(_table(tmp_path))
+    assert to_czk(1000, "EUR", date(2026, 3, 1), table=table) == 24320.0
+    assert to_czk(0.333, "USD", table=table) == 7.49
+    assert to_czk(1500, None, table=table) == 1500.0  # bez měny = CZK
+    assert to_czk(1500, "CZK", table=table) == 1500.0
+    assert to_czk(1500, "GBP", table=table) is None
+    assert to_czk(None, "EUR", table=table) is None
+
+
+def test_rates_reload_on_mtime_change(tmp_path):
+    path = _table(tmp_path)
+    first = rates(path)
+    assert rates(path) is first
+    path.write_text("currency,valid_from,czk_per_unit\nEUR,,30\n", encoding="utf-8")
+    st = os.stat(path)
+    os.utime(path, (st.st_atime, st.st_mtime + 10))
+    assert rates(path).rate("EUR") == 30.0
+
+
+def test_rates_missing_file(tmp_path):
+    table = rates(tmp_path / "missing.csv")
+    assert table.currencies() == []
+    assert to_czk(10, "CZK", table=table) == 10.0
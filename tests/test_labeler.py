@@ -0,0 +1,96 @@
+import pytest
+
+from core.labeler import Labeler, LabelModel, terms
+
+SPEC = {
+    "threshold": 0.3,
+    "max_labels": 2,
+    "cpv_weight": 0.35,
+    "labels": {
+        "stavby": {"terms": ["most", "silnice", "rekonstrukce"], "cpv": ["45"]},
+        "it": {"terms": ["software", "server", "licence"], "cpv": ["48", "72"]},
+        "skoleni": {"terms": ["školení", "kurz"], "cpv": ["80"]},
+        "uklid": {"terms": ["úklid", "rekonstrukce"]},
+    },
+}
+
+
+@pytest.fixture
+def model():
+    return LabelModel(SPEC, version="test")
+
+
+def test_terms_fold_and_stem():
+    assert terms("Rekonstrukce MOSTŮ a silnic") == ["rekonstrukc", "most", "silnic"]
+    assert terms(None) == []
+
+
+def test_text_match(model):
+    res = model.score("Oprava mostu a silnice", None, None)
+    assert res.labels == ["stavby"]
+    assert res.scores["stavby"] == pytest.approx(1.0, abs=0.2)
+
+
+def test_no_match_below_threshold(model):
+    assert model.score("Dodávka nábytku", "židle a stoly", []).labels == []
+
+
+def test_cpv_boost_division_ending_in_zero(model):
+    # 80000000-4 = oddíl "80": boost se dřív nepřičetl (prefix "8")
+    res = model.score("Dodávka", None, ["80000000-4"])
+    assert res.labels == ["skoleni"]
+    assert res.scores["skoleni"] == pytest.approx(0.35)
+
+
+def test_cpv_boost_on_subcode(model):
+    assert model.score("Kurz", None, ["45233140-2"]).scores["stavby"] == pytest.approx(0.35)
+
+
+def test_max_labels_and_ordering(model):
+    res = model.score("Rekonstrukce mostu, software a školení", None, ["72000000-5", "45000000-7"])
+    assert len(res.labels) == 2
+    assert res.labels == sorted(res.scores, key=res.scores.get, reverse=True)
+
+
+def test_shared_term_weighs_less(model):
+    assert model.idf["rekonstrukc"] < model.idf["most"]
+
+
+def test_load_bundled_taxonomy():
+    m = LabelModel.load()
+    assert m.keys and len(m.version) == 12
+    assert LabelModel.load().version == m.version
+
+
+class FakeStorage:
+    def __init__(self, rows):
+        self.rows = rows
+        self.saved = []
+
+    def load_label_pending(self, version, after, limit, source_id=None):
+        rest = [r for r in self.rows if (r["source_id"], r["external_id"]) > after]
+        return rest[:limit]
+
+    def save_tender_labels(self, rows, version):
+        self.saved.append((version, rows))
+
+
+def _rows(n):
+    return [{"source_id": "TEST", "external_id": f"{i:03d}", "hash_id": f"h{i}", "text_fp": f"fp{i}",
+             "title": "Oprava mostu" if i % 2 else "Nábytek", "description": None, "cpv": []}
+            for i in range(n)]
+
+
+def test_labeler_batches(model):
+    storage = FakeStorage(_rows(5))
+    stats = Labeler(storage, model=model, batch_size=2).run()
+    assert stats == {"processed": 5, "labeled": 2, "unlabeled": 3}
+    assert [len(rows) for _, rows in storage.saved] == [2, 2, 1]
+    assert storage.saved[0][1][1]["labels"] == ["stavby"]
+
+
+def test_labeler_limit_and_dry_run(model):
+    storage = FakeStorage(_rows(5))
+    stats = Labeler(storage, model=model, batch_size=2).run(limit=3, dry_run=True)
+    assert stats["processed"] == 3
+    assert storage.saved == []
@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+from core.worker import CrawlWorker
+
+
+class FakeStorage:
+    def __init__(self, jobs, fail_upsert=False, fail_claims=0):
+        self.jobs = jobs
+        self.fail_upsert = fail_upsert
+        self.fail_claims = fail_claims
+        self.failed, self.completed = [], []
+
+    def requeue_expired_crawl_jobs(self, source_id):
+        return 0
+
+    def claim_crawl_jobs(self, source_id, worker_id, batch_size, lease_seconds):
+        if self.fail_claims:
+            self.fail_claims -= 1
+            raise ConnectionError("db down")
+        jobs, self.jobs = self.jobs, []
+        return jobs
+
+    def insert_raw_batch(self, raws):
+        return len(raws)
+
+    def upsert_tenders(self, units, changed=None):
+        if self.fail_upsert:
+            raise ConnectionError("db down")
+        return len(units), 0
+
+    def fail_crawl_job(self, job_id, worker_id, error, retry_delay):
+        self.failed.append((job_id, retry_delay))
+
+    def complete_crawl_jobs(self, job_ids, worker_id):
+        self.completed.extend(job_ids)
+        return len(job_ids)
+
+    def crawl_queue_depth(self, source_id):
+        return {"pending": len(self.jobs)}
+
+    def refresh_source_facets(self, source_id, overlap=None):
+        return 0
+
+
+class FakeAdapter:
+    source_id = "TEST"
+
+    def fetch_record(self, payload):
+        return SimpleNamespace(), SimpleNamespace()
+
+
+def _jobs(n):
+    return [{"id": i, "external_id": f"x{i}", "payload": {}, "attempts": 1, "max_attempts": 3}
+            for i in range(1, n + 1)]
+
+
+def test_store_error_releases_claimed_jobs():
+    storage = FakeStorage(_jobs(3), fail_upsert=True)
+    stats = CrawlWorker(FakeAdapter(), storage, retry_delay=10).run_batch()
+    assert stats["retried"] == 3 and stats["done"] == 0
+    assert storage.failed == [(1, 10), (2, 10), (3, 10)]
+    assert storage.completed == []
+
+
+def test_run_survives_db_error():
+    storage = FakeStorage(_jobs(2), fail_claims=1)
+    total = CrawlWorker(FakeAdapter(), storage, idle_sleep=0).run(until_empty=True)
+    assert total["done"] == 2
+    assert storage.completed == [1, 2]